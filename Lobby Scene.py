@@ -16,6 +16,7 @@ import random
 from sys import exit
 import importlib.util
 import os
+import threading
 
 pygame.init()
 clock = pygame.time.Clock()
@@ -313,6 +314,10 @@ DOG_TRIGGER_CHANCE_ON_ENTRY = 0.40
 dog_rolled_this_visit = False
 dog_cleared_this_visit = False
 
+# The dog minigame's images and sound load on a worker thread during
+# DOG_DELAY; run_dog_minigame then finds them cached.
+DOG_WINDOW_SIZE = (1200, 800)
+
 # Scene 3: Maze (20%)
 MAZE_X = 520
 MAZE_Y = 420
@@ -329,6 +334,10 @@ MAZE_TRIGGER_CHANCE_ON_ENTRY = 0.20
 maze_rolled_this_visit = False
 maze_cleared_this_visit = False
 
+# The level is generated and pre-rendered in the background while the icon
+# waits and zooms, so the minigame starts without a setup pause.
+maze_preparation = None
+
 # Scene 4: Jumpers (40%) using card.png
 JUMP_X = 430
 JUMP_Y = 350
@@ -369,18 +378,20 @@ def begin_dog_sequence():
     dog_triggered = True
     dog_started = False
     dog_anim_start = pygame.time.get_ticks()
+    threading.Thread(target=dogminigame.preload_dog_assets, args=(DOG_WINDOW_SIZE,), daemon=True).start()
 
     return_scene = currentscene
     return_player_x = characteranimation.player_x
 
 
 def begin_maze_sequence():
-    global maze_triggered, maze_anim_start, maze_started
+    global maze_triggered, maze_anim_start, maze_started, maze_preparation
     global return_scene, return_player_x
 
     maze_triggered = True
     maze_started = False
     maze_anim_start = pygame.time.get_ticks()
+    maze_preparation = maze_minigame.start_maze_preparation(window_size=(1200, 800), level=maze_level)
 
     return_scene = currentscene
     return_player_x = characteranimation.player_x
@@ -608,8 +619,10 @@ while True:
                     result = maze_minigame.run_maze_minigame(
                         window_size=(1200, 800),
                         caption="Maze Minigame",
-                        level=maze_level
+                        level=maze_level,
+                        bundle=maze_preparation.result() if maze_preparation else None
                     )
+                    maze_preparation = None
 
                     if result == "win":
                         maze_level += 1
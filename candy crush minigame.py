@@ -1,13 +1,20 @@
+import os
 import random
+import sys
+import time
 import pygame
 import math
 from collections import deque
 
+import text_cache
+from text_cache import get_font, render_text, wrap_text
+
 # ============================================================
 # Match-3 Fish Minigame
 # Entry point: run_match3_minigame(level=1) -> "win" or "lose"
 #
 # Needs files (same folder):
+#   match3 atlas <TILE>.png  (baked from the sprites below, see bake_tile_atlas)
 #   fish blue.png
 #   fish green.png
 #   fish pink.png
@@ -59,11 +66,34 @@ HINT_COOLDOWN_SECONDS = 2.0
 RAINBOW_CONVERT_RATIO = 0.30      # 30% of board
 RAINBOW_STEP_SECONDS = 1.0        # stop 1 second per tile conversion
 
+# Fast effects mode (F key): staged effects run this much faster and may
+# batch several steps into one frame, within a per-frame time budget.
+FAST_EFFECT_SCALE = 0.004           # 1 s step -> 4 ms, about 4 steps per 60 FPS frame
+EFFECT_MAX_STEPS_PER_FRAME = 16
+EFFECT_FRAME_BUDGET_MS = 2.0
+
 ARROW_COLOR = (255, 255, 255)
 
+FISH_SPRITE_FILES = [
+    "fish blue.png",
+    "fish green.png",
+    "fish pink.png",
+    "fish purple.png",
+    "fish white.png",
+    "fish yellow.png",
+]
+TRASH_SPRITE_FILE = "trash bag.png"
+ATLAS_FILE_PATTERN = "match3 atlas {tile}.png"
+
 BOARD_RECT = pygame.Rect(0, TOP_BAR, BOARD_W, BOARD_H)
 SIDE_RECT = pygame.Rect(BOARD_W, 0, SIDE_PANEL_W, HEIGHT)
 
+# Large boards: anything bigger than this many cells is shown through a
+# scrolling viewport instead of growing the window.
+VIEW_MAX_COLS, VIEW_MAX_ROWS = 8, 8
+SCROLL_SPEED_PX = 720.0
+WHEEL_SCROLL_PX = TILE
+
 
 # -----------------------------
 # Tile helpers
@@ -75,8 +105,11 @@ def tile_kind(t): return t[0]
 def tile_color(t): return t[1]
 def tile_extra(t): return t[2]
 
-def in_bounds(x, y):
-    return 0 <= x < GRID_W and 0 <= y < GRID_H
+def grid_size(grid):
+    return len(grid[0]), len(grid)
+
+def in_bounds(x, y, w=GRID_W, h=GRID_H):
+    return 0 <= x < w and 0 <= y < h
 
 def are_adjacent(a, b):
     ax, ay = a
@@ -90,20 +123,9 @@ def rand_normal():
     return make_tile("normal", rand_color(), None)
 
 def cell_to_px(x, y):
+    """Board position in world pixels (the viewport camera is applied at draw time)."""
     return x * TILE, TOP_BAR + y * TILE
 
-def screen_to_cell(mx, my):
-    if mx < 0 or mx >= BOARD_W:
-        return None
-    my -= TOP_BAR
-    if my < 0 or my >= BOARD_H:
-        return None
-    x = mx // TILE
-    y = my // TILE
-    if in_bounds(x, y):
-        return (x, y)
-    return None
-
 def striped_mode(extra):
     if not extra:
         return "row"
@@ -193,6 +215,76 @@ class Animator:
         return out
 
 
+# -----------------------------
+# Viewport (camera over large boards)
+# -----------------------------
+class Viewport:
+    """
+    Which part of the board is on screen. Small boards fit entirely and the
+    camera never moves; larger boards scroll, and only visible cells are drawn.
+    World pixels come from cell_to_px; screen = world - camera.
+    """
+    def __init__(self, grid_w, grid_h, max_cols=VIEW_MAX_COLS, max_rows=VIEW_MAX_ROWS):
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        cols = min(grid_w, max_cols)
+        rows = min(grid_h, max_rows)
+        self.board_rect = pygame.Rect(0, TOP_BAR, cols * TILE, rows * TILE)
+        self.width = self.board_rect.w + SIDE_PANEL_W
+        self.height = TOP_BAR + self.board_rect.h
+        self.side_rect = pygame.Rect(self.board_rect.w, 0, SIDE_PANEL_W, self.height)
+        self.max_cam_x = grid_w * TILE - self.board_rect.w
+        self.max_cam_y = grid_h * TILE - self.board_rect.h
+        self.cam_x = 0.0
+        self.cam_y = 0.0
+
+    def is_scrollable(self):
+        return self.max_cam_x > 0 or self.max_cam_y > 0
+
+    def scroll(self, dx, dy):
+        self.cam_x = max(0.0, min(self.max_cam_x, self.cam_x + dx))
+        self.cam_y = max(0.0, min(self.max_cam_y, self.cam_y + dy))
+
+    def reveal_cell(self, x, y):
+        """Scroll the least amount needed to get cell (x, y) fully on screen."""
+        px, py = x * TILE, y * TILE
+        if px < self.cam_x:
+            self.cam_x = px
+        elif px + TILE > self.cam_x + self.board_rect.w:
+            self.cam_x = px + TILE - self.board_rect.w
+        if py < self.cam_y:
+            self.cam_y = py
+        elif py + TILE > self.cam_y + self.board_rect.h:
+            self.cam_y = py + TILE - self.board_rect.h
+        self.scroll(0, 0)
+
+    def to_screen(self, px, py):
+        return int(px - self.cam_x), int(py - self.cam_y)
+
+    def screen_to_cell(self, mx, my):
+        if not self.board_rect.collidepoint(mx, my):
+            return None
+        x = int((mx + self.cam_x) // TILE)
+        y = int((my - TOP_BAR + self.cam_y) // TILE)
+        if in_bounds(x, y, self.grid_w, self.grid_h):
+            return (x, y)
+        return None
+
+    def visible_cells(self):
+        """(x0, y0, x1, y1) cell range touching the screen, end exclusive."""
+        x0 = int(self.cam_x // TILE)
+        y0 = int(self.cam_y // TILE)
+        x1 = min(self.grid_w, int((self.cam_x + self.board_rect.w - 1) // TILE) + 1)
+        y1 = min(self.grid_h, int((self.cam_y + self.board_rect.h - 1) // TILE) + 1)
+        return x0, y0, x1, y1
+
+    def overlaps(self, px, py):
+        """True if a tile drawn at world (px, py) would be at least partly visible."""
+        sx, sy = self.to_screen(px, py)
+        r = self.board_rect
+        return sx + TILE > r.left and sx < r.right and sy + TILE > r.top and sy < r.bottom
+
+
 # -----------------------------
 # Loading sprites
 # -----------------------------
@@ -201,29 +293,163 @@ def load_sprite(path):
     return pygame.transform.smoothscale(img, (TILE - 16, TILE - 16))
 
 def load_assets():
-    fish = [
-        load_sprite("fish blue.png"),
-        load_sprite("fish green.png"),
-        load_sprite("fish pink.png"),
-        load_sprite("fish purple.png"),
-        load_sprite("fish white.png"),
-        load_sprite("fish yellow.png"),
-    ]
-    trash = load_sprite("trash bag.png")
+    fish = [load_sprite(path) for path in FISH_SPRITE_FILES]
+    trash = load_sprite(TRASH_SPRITE_FILE)
     return fish, trash
 
 
+# -----------------------------
+# Baked tile atlas
+# -----------------------------
+# Every tile look (fish colour x normal / striped row / striped col / bomb,
+# plus trash and the rainbow ball) is rendered once, at the configured TILE,
+# into one packed sheet. At runtime each tile is a single blit from it.
+#
+# Bake ahead of time with:
+#   python "candy crush minigame.py" --bake
+#
+# If the sheet is missing, stale (older than the source PNGs) or baked for a
+# different TILE, it is rebaked on first use and written back to disk.
+def atlas_path(tile=TILE):
+    return ATLAS_FILE_PATTERN.format(tile=tile)
+
+def atlas_key(tile):
+    k = tile_kind(tile)
+    if k in ("trash", "rainbow"):
+        return (k, None, None)
+    if k == "striped":
+        return (k, tile_color(tile), striped_mode(tile_extra(tile)))
+    return (k, tile_color(tile), None)
+
+def atlas_layout():
+    """(key, col, row) for every cell of the atlas, in a fixed order."""
+    out = []
+    for c in range(CANDY_TYPES):
+        out.append((("normal", c, None), c, 0))
+        out.append((("striped", c, "row"), c, 1))
+        out.append((("striped", c, "col"), c, 2))
+        out.append((("bomb", c, None), c, 3))
+    out.append((("trash", None, None), 0, 4))
+    out.append((("rainbow", None, None), 1, 4))
+    return out
+
+def atlas_size(sprite_size):
+    cols = max(col for _, col, _ in atlas_layout()) + 1
+    rows = max(row for _, _, row in atlas_layout()) + 1
+    return cols * sprite_size, rows * sprite_size
+
+def render_tile_sprite(surf, fish_sprites, trash_sprite, key, rect):
+    """Draw one finished tile look into rect (sprite, overlay, outline)."""
+    kind, color, orient = key
+
+    if kind == "trash":
+        surf.blit(trash_sprite, rect.topleft)
+        pygame.draw.rect(surf, (0, 0, 0), rect, 2, border_radius=10)
+        return
+
+    if kind == "rainbow":
+        draw_rainbow_ball(surf, rect)
+        return
+
+    surf.blit(fish_sprites[color], rect.topleft)
+    if kind == "striped":
+        extra = (0, 1) if orient == "col" else (1, 0)
+        draw_special_overlay(surf, make_tile("striped", color, extra), rect)
+    elif kind == "bomb":
+        draw_special_overlay(surf, make_tile("bomb", color, None), rect)
+    pygame.draw.rect(surf, (0, 0, 0), rect, 2, border_radius=10)
+
+def bake_tile_atlas(tile=TILE, path=None):
+    """Render every tile look into one sheet. Writes it to path if given."""
+    fish_sprites, trash_sprite = load_assets()
+    size = tile - 16
+    sheet = pygame.Surface(atlas_size(size), pygame.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+
+    for key, col, row in atlas_layout():
+        rect = pygame.Rect(col * size, row * size, size, size)
+        prev_clip = sheet.get_clip()
+        sheet.set_clip(rect)
+        render_tile_sprite(sheet, fish_sprites, trash_sprite, key, rect)
+        sheet.set_clip(prev_clip)
+
+    if path is not None:
+        pygame.image.save(sheet, path)
+    return sheet
+
+def atlas_is_stale(path):
+    if not os.path.exists(path):
+        return True
+    baked_at = os.path.getmtime(path)
+    for src in FISH_SPRITE_FILES + [TRASH_SPRITE_FILE]:
+        if os.path.exists(src) and os.path.getmtime(src) > baked_at:
+            return True
+    return False
+
+class TileAtlas:
+    def __init__(self, sheet, sprite_size):
+        self.sheet = sheet
+        self.sprite_size = sprite_size
+        self.rects = {}
+        for key, col, row in atlas_layout():
+            self.rects[key] = pygame.Rect(col * sprite_size, row * sprite_size, sprite_size, sprite_size)
+
+    def blit(self, surf, tile, pos):
+        surf.blit(self.sheet, pos, self.rects[atlas_key(tile)])
+
+_atlas_cache = {}
+
+def load_tile_atlas(tile=TILE):
+    """Baked atlas for this TILE, cached for the rest of the process."""
+    if tile in _atlas_cache:
+        return _atlas_cache[tile]
+
+    size = tile - 16
+    path = atlas_path(tile)
+    sheet = None
+    if not atlas_is_stale(path):
+        sheet = pygame.image.load(path).convert_alpha()
+        if sheet.get_size() != atlas_size(size):
+            sheet = None
+
+    if sheet is None:
+        sheet = bake_tile_atlas(tile)
+        try:
+            pygame.image.save(sheet, path)
+        except (pygame.error, OSError):
+            pass  # read-only install: keep the in-memory bake
+
+    atlas = TileAtlas(sheet, size)
+    _atlas_cache[tile] = atlas
+    return atlas
+
+
 # -----------------------------
 # Matching / specials / clears
 # -----------------------------
-def find_runs(grid):
+def find_runs(grid, cells=None):
+    """
+    Runs of 3+ same-colour fish.
+
+    With cells given, only the rows and columns through those cells are
+    scanned. On a board that had no runs before the change, every new run
+    has to pass through a changed cell, so this is the same result as a
+    full scan at a cost that does not grow with the board.
+    """
+    w, h = grid_size(grid)
+    if cells is None:
+        rows, cols = range(h), range(w)
+    else:
+        rows = sorted({y for _, y in cells})
+        cols = sorted({x for x, _ in cells})
+
     matched = set()
     horiz_runs = []
     vert_runs = []
 
-    for y in range(GRID_H):
+    for y in rows:
         run = [(0, y)]
-        for x in range(1, GRID_W):
+        for x in range(1, w):
             c1 = base_match_color(grid[y][x])
             c0 = base_match_color(grid[y][x - 1])
             if c1 is not None and c1 == c0:
@@ -237,9 +463,9 @@ def find_runs(grid):
             horiz_runs.append(run[:])
             matched.update(run)
 
-    for x in range(GRID_W):
+    for x in cols:
         run = [(x, 0)]
-        for y in range(1, GRID_H):
+        for y in range(1, h):
             c1 = base_match_color(grid[y][x])
             c0 = base_match_color(grid[y - 1][x])
             if c1 is not None and c1 == c0:
@@ -255,39 +481,44 @@ def find_runs(grid):
 
     return matched, horiz_runs, vert_runs
 
-def make_grid_no_initial_matches():
-    g = [[rand_normal() for _ in range(GRID_W)] for _ in range(GRID_H)]
+def make_grid_no_initial_matches(w=GRID_W, h=GRID_H):
+    g = [[rand_normal() for _ in range(w)] for _ in range(h)]
+    dirty = None
     while True:
-        m, _, _ = find_runs(g)
+        m, _, _ = find_runs(g, dirty)
         if not m:
             break
         for (x, y) in m:
             g[y][x] = rand_normal()
+        dirty = m
     return g
 
 def place_three_trash_at_top(grid):
-    cols = list(range(GRID_W))
+    cols = list(range(len(grid[0])))
     random.shuffle(cols)
     for x in cols[:3]:
         grid[0][x] = make_tile("trash", None, None)
 
 def trash_in_bottom_positions(grid):
-    y = GRID_H - 1
+    w, h = grid_size(grid)
+    y = h - 1
     out = []
-    for x in range(GRID_W):
+    for x in range(w):
         t = grid[y][x]
         if t is not None and tile_kind(t) == "trash":
             out.append((x, y))
     return out
 
-def has_holes(grid):
-    for y in range(GRID_H):
-        for x in range(GRID_W):
+def has_holes(grid, cols=None):
+    w, h = grid_size(grid)
+    for x in (range(w) if cols is None else cols):
+        for y in range(h):
             if grid[y][x] is None:
                 return True
     return False
 
 def special_expansion_cells_for_one_tile(grid, pos):
+    w, h = grid_size(grid)
     x, y = pos
     t = grid[y][x]
     if t is None:
@@ -300,11 +531,11 @@ def special_expansion_cells_for_one_tile(grid, pos):
         out = set()
         mode = striped_mode(tile_extra(t))
         if mode == "row":
-            for xx in range(GRID_W):
+            for xx in range(w):
                 if grid[y][xx] is not None and tile_kind(grid[y][xx]) != "trash":
                     out.add((xx, y))
         else:
-            for yy in range(GRID_H):
+            for yy in range(h):
                 if grid[yy][x] is not None and tile_kind(grid[yy][x]) != "trash":
                     out.add((x, yy))
         return out
@@ -313,7 +544,7 @@ def special_expansion_cells_for_one_tile(grid, pos):
         out = set()
         for yy in range(y - 1, y + 2):
             for xx in range(x - 1, x + 2):
-                if in_bounds(xx, yy):
+                if in_bounds(xx, yy, w, h):
                     if grid[yy][xx] is not None and tile_kind(grid[yy][xx]) != "trash":
                         out.add((xx, yy))
         return out
@@ -409,25 +640,53 @@ def choose_specials_from_matches_for_cascade(grid, horiz_runs, vert_runs):
 
     return special_map, protected
 
+def plan_match_clear(grid, cells=None):
+    """
+    One cascade step, without touching the grid.
+    Returns (cells to clear, specials to place); both empty when nothing matched.
+    """
+    matched, horiz_runs, vert_runs = find_runs(grid, cells)
+    if not matched:
+        return set(), {}
+    special_map, protected = choose_specials_from_matches_for_cascade(grid, horiz_runs, vert_runs)
+    expanded = compute_clear_set_with_specials_chain(grid, set(matched) - set(protected))
+    return expanded, special_map
+
+def apply_match_clear(grid, expanded, special_map):
+    """Place specials, then clear."""
+    for (x, y), new_tile in special_map.items():
+        if grid[y][x] is not None and tile_kind(grid[y][x]) == "trash":
+            continue
+        grid[y][x] = new_tile
+    clear_cells(grid, expanded)
+
 
 # -----------------------------
 # Gravity: clear first, then drop one-by-one
 # -----------------------------
-def build_drop_plan(grid):
+def build_drop_plan(grid, cols=None):
+    """
+    Gravity for the given columns (all when None). Columns without holes are
+    left out of the plan. Returns ({x: new column top-to-bottom}, moves).
+    """
+    w, h = grid_size(grid)
     moves = []
-    new_grid = [[None for _ in range(GRID_W)] for _ in range(GRID_H)]
+    new_cols = {}
 
-    for x in range(GRID_W):
+    for x in (range(w) if cols is None else sorted(cols)):
         existing = []
-        for y in range(GRID_H - 1, -1, -1):
+        for y in range(h - 1, -1, -1):
             if grid[y][x] is not None:
                 existing.append((grid[y][x], y))
+        if len(existing) == h:
+            continue
 
-        write_y = GRID_H - 1
+        column = [None] * h
+        write_y = h - 1
         started = 0
 
         for t, old_y in existing:
-            new_grid[write_y][x] = t
+            column[write_y] = t
             if old_y != write_y:
                 sx, sy = cell_to_px(x, old_y)
                 ex, ey = cell_to_px(x, write_y)
@@ -440,7 +699,7 @@ def build_drop_plan(grid):
         for i in range(spawn_count):
             target_y = write_y - i
             t = rand_normal()
-            new_grid[target_y][x] = t
+            column[target_y] = t
 
             ex, ey = cell_to_px(x, target_y)
             start_y = TOP_BAR - (spawn_count - i) * TILE
@@ -449,51 +708,92 @@ def build_drop_plan(grid):
             moves.append((t, (sx, start_y), (ex, ey), delay, (x, target_y)))
             started += 1
 
-    return new_grid, moves
+        new_cols[x] = column
 
-def drop_with_animation(grid, animator):
-    new_grid, moves = build_drop_plan(grid)
-    for y in range(GRID_H):
-        for x in range(GRID_W):
-            grid[y][x] = new_grid[y][x]
+    return new_cols, moves
+
+def drop_with_animation(grid, animator, cols=None):
+    """Apply gravity and queue the drop animations. Returns the cells that changed."""
+    new_cols, moves = build_drop_plan(grid, cols)
+    for x, column in new_cols.items():
+        for y, t in enumerate(column):
+            grid[y][x] = t
+    changed = set()
     for t, start_xy, end_xy, delay, dest_cell in moves:
         animator.add_drop(t, start_xy, end_xy, DROP_SPEED_PX, delay=delay, dest_cell=dest_cell, easing=DROP_EASING)
+        changed.add(dest_cell)
+    return changed
 
 
 # -----------------------------
 # Trash disposal when reaching bottom
 # -----------------------------
 def dispose_bottom_trash(grid, animator):
-    disposed = 0
+    """Drop bottom-row trash off the board. Returns the cells it left empty."""
     bottoms = trash_in_bottom_positions(grid)
     if not bottoms:
-        return 0
+        return []
     bottoms.sort(key=lambda p: p[0])
+    h = len(grid)
+    emptied = []
 
     for (x, y) in bottoms:
         t = grid[y][x]
         if t is None or tile_kind(t) != "trash":
             continue
         start_px = cell_to_px(x, y)
-        end_px = (start_px[0], TOP_BAR + GRID_H * TILE + TILE)
+        end_px = (start_px[0], TOP_BAR + h * TILE + TILE)
         animator.add_drop(t, start_px, end_px, speed_px=1600.0, delay=0.0, dest_cell=None, easing="smooth")
         grid[y][x] = None
-        disposed += 1
-    return disposed
+        emptied.append((x, y))
+    return emptied
 
 
 # -----------------------------
 # Move availability + shuffle (keeps trash fixed)
 # -----------------------------
+def has_match_at(grid, x, y):
+    """True if the tile at (x, y) is part of a run of 3+ (local check only)."""
+    c = base_match_color(grid[y][x])
+    if c is None:
+        return False
+    w, h = grid_size(grid)
+
+    run = 1
+    xx = x - 1
+    while xx >= 0 and base_match_color(grid[y][xx]) == c:
+        run += 1
+        xx -= 1
+    xx = x + 1
+    while xx < w and base_match_color(grid[y][xx]) == c:
+        run += 1
+        xx += 1
+    if run >= 3:
+        return True
+
+    run = 1
+    yy = y - 1
+    while yy >= 0 and base_match_color(grid[yy][x]) == c:
+        run += 1
+        yy -= 1
+    yy = y + 1
+    while yy < h and base_match_color(grid[yy][x]) == c:
+        run += 1
+        yy += 1
+    return run >= 3
+
 def is_match_after_swap(grid, a, b):
+    # Only valid on a settled board (no runs anywhere), which is the only
+    # time moves are looked for; then any new run must touch a or b.
     swap_in_grid(grid, a, b)
-    matched, _, _ = find_runs(grid)
+    ok = has_match_at(grid, *a) or has_match_at(grid, *b)
     swap_in_grid(grid, a, b)
-    return bool(matched)
+    return ok
 
 def find_any_valid_move(grid):
-    for y in range(GRID_H):
-        for x in range(GRID_W):
+    w, h = grid_size(grid)
+    for y in range(h):
+        for x in range(w):
             a = (x, y)
             t = grid[y][x]
             if t is None:
@@ -501,14 +801,14 @@ def find_any_valid_move(grid):
             if tile_kind(t) in ("trash", "rainbow"):
                 continue
 
-            if x + 1 < GRID_W:
+            if x + 1 < w:
                 b = (x + 1, y)
                 tb = grid[y][x + 1]
                 if tb is not None and tile_kind(tb) not in ("trash", "rainbow"):
                     if is_match_after_swap(grid, a, b):
                         return (a, b)
 
-            if y + 1 < GRID_H:
+            if y + 1 < h:
                 b = (x, y + 1)
                 tb = grid[y + 1][x]
                 if tb is not None and tile_kind(tb) not in ("trash", "rainbow"):
@@ -520,11 +820,12 @@ def has_any_valid_move(grid):
     return find_any_valid_move(grid) is not None
 
 def shuffle_board_keep_trash(grid):
+    w, h = grid_size(grid)
     trash_positions = {}
     pool = []
 
-    for y in range(GRID_H):
-        for x in range(GRID_W):
+    for y in range(h):
+        for x in range(w):
             t = grid[y][x]
             if t is None:
                 continue
@@ -536,8 +837,8 @@ def shuffle_board_keep_trash(grid):
     for _ in range(120):
         random.shuffle(pool)
         idx = 0
-        for y in range(GRID_H):
-            for x in range(GRID_W):
+        for y in range(h):
+            for x in range(w):
                 if (x, y) in trash_positions:
                     grid[y][x] = trash_positions[(x, y)]
                 else:
@@ -601,9 +902,8 @@ def build_rainbow_plan(grid, rainbow_pos, other_pos):
         return None
 
     candidates = []
-    for y in range(GRID_H):
-        for x in range(GRID_W):
-            t = grid[y][x]
+    for y, row in enumerate(grid):
+        for x, t in enumerate(row):
             if t is None:
                 continue
             k = tile_kind(t)
@@ -634,26 +934,97 @@ def build_rainbow_plan(grid, rainbow_pos, other_pos):
         "mode": mode,
     }
 
+def rainbow_converted_tile(template):
+    if tile_kind(template) == "normal":
+        return make_tile("normal", tile_color(template), None)
+    return clone_tile_as_template(template)
+
+def plan_rainbow_final_clear(grid, plan):
+    """
+    Work out the rainbow's final clear before any tile is converted, on a
+    copy of the board with every conversion already applied. Nothing else
+    touches the board while the conversion plays, so this is exactly what
+    the last step clears.
+    Returns (cells to clear, {cell: tile} as they will be when cleared).
+    """
+    sim = [row[:] for row in grid]
+    tile = rainbow_converted_tile(plan["template"])
+    for (x, y) in plan["chosen"]:
+        sim[y][x] = tile
+
+    if plan["mode"] == "normal":
+        # Clear converted set plus rainbow and other
+        clear_set = set(plan["chosen"])
+    else:
+        # For special tiles, activate via chain expansion starting from converted set
+        clear_set = compute_clear_set_with_specials_chain(sim, set(plan["chosen"]))
+    clear_set.add(plan["rainbow_pos"])
+    clear_set.add(plan["other_pos"])
+
+    clear_tiles = {}
+    for (x, y) in clear_set:
+        if sim[y][x] is not None:
+            clear_tiles[(x, y)] = sim[y][x]
+    return clear_set, clear_tiles
+
 
 # -----------------------------
-# UI helpers
+# Effect scheduler (staged board effects)
 # -----------------------------
-def wrap_text(text, max_width, fnt):
-    words = text.split(" ")
-    lines = []
-    cur = ""
-    for w in words:
-        test = (cur + " " + w).strip()
-        if fnt.size(test)[0] <= max_width:
-            cur = test
-        else:
-            if cur:
-                lines.append(cur)
-            cur = w
-    if cur:
-        lines.append(cur)
-    return lines
+class EffectScheduler:
+    """
+    Queue of timed effect steps. A step is (duration, payload): once the
+    board has waited `duration` seconds the payload is handed back from
+    update() for the main loop to apply.
+
+    Normal mode runs at most one step per frame. Fast mode shrinks every
+    duration by FAST_EFFECT_SCALE and hands back as many due steps as fit
+    in EFFECT_MAX_STEPS_PER_FRAME / EFFECT_FRAME_BUDGET_MS, so long chains
+    finish quickly without any one frame doing all of them.
+    """
+    def __init__(self):
+        self.steps = deque()
+        self.timer = 0.0
+        self.fast = False
+
+    def add(self, duration, payload):
+        self.steps.append((duration, payload))
 
+    def clear(self):
+        self.steps.clear()
+        self.timer = 0.0
+
+    def is_busy(self):
+        return len(self.steps) > 0
+
+    def step_duration(self, duration):
+        return duration * FAST_EFFECT_SCALE if self.fast else duration
+
+    def update(self, dt):
+        if not self.steps:
+            return []
+        self.timer += dt
+        due = []
+        deadline = time.perf_counter() + EFFECT_FRAME_BUDGET_MS / 1000.0
+        while self.steps:
+            duration = self.step_duration(self.steps[0][0])
+            if self.timer < duration:
+                break
+            self.timer -= duration
+            due.append(self.steps.popleft()[1])
+            if not self.fast:
+                self.timer = 0.0
+                break
+            if len(due) >= EFFECT_MAX_STEPS_PER_FRAME or time.perf_counter() >= deadline:
+                # Out of budget: carry at most one step's worth of time over
+                self.timer = min(self.timer, self.step_duration(self.steps[0][0]) if self.steps else 0.0)
+                break
+        return due
+
+
+# -----------------------------
+# UI helpers
+# -----------------------------
 def task_color(done):
     return DONE_GREEN if done else SUBTEXT
 
@@ -709,35 +1080,17 @@ def draw_rainbow_ball(surf, rect):
     # outline
     pygame.draw.circle(surf, (0, 0, 0), (cx, cy), r, 2)
 
-def draw_tile(surf, fish_sprites, trash_sprite, tile, px, py):
-    rect = pygame.Rect(px + 8, py + 8, TILE - 16, TILE - 16)
-    k = tile_kind(tile)
-
-    if k == "trash":
-        surf.blit(trash_sprite, rect.topleft)
-        pygame.draw.rect(surf, (0, 0, 0), rect, 2, border_radius=10)
-        return
-
-    if k == "rainbow":
-        draw_rainbow_ball(surf, rect)
-        return
-
-    surf.blit(fish_sprites[tile_color(tile)], rect.topleft)
-    if k in ("striped", "bomb"):
-        draw_special_overlay(surf, tile, rect)
-    pygame.draw.rect(surf, (0, 0, 0), rect, 2, border_radius=10)
+def draw_tile(surf, atlas, tile, px, py):
+    atlas.blit(surf, tile, (px + 8, py + 8))
 
-def draw_tasks_panel(surface, font, score, score_goal, cleared_color_count, color_goal, color_name, trash_disposed, trash_total=3):
-    panel_x = BOARD_W + 14
-    panel_y = 14
-    panel_w = SIDE_PANEL_W - 28
-    panel_h = HEIGHT - 28
-    rect = pygame.Rect(panel_x, panel_y, panel_w, panel_h)
+def draw_tasks_panel(surface, font, score, score_goal, cleared_color_count, color_goal, color_name, trash_disposed,
+                     trash_total=3, side_rect=SIDE_RECT, scroll_tip=False):
+    rect = side_rect.inflate(-28, -28)
 
     pygame.draw.rect(surface, (18, 20, 28), rect, border_radius=14)
     pygame.draw.rect(surface, (0, 0, 0), rect, 2, border_radius=14)
 
-    surface.blit(font.render("Tasks", True, TEXT), (rect.x + 12, rect.y + 10))
+    surface.blit(render_text(font, "Tasks", TEXT), (rect.x + 12, rect.y + 10))
 
     t1 = score >= score_goal
     t2 = cleared_color_count >= color_goal
@@ -752,41 +1105,54 @@ def draw_tasks_panel(surface, font, score, score_goal, cleared_color_count, colo
     y = rect.y + 42
     for left, right, done in lines:
         col = DONE_GREEN if done else SUBTEXT
-        surface.blit(font.render(left, True, col), (rect.x + 12, y))
-        surface.blit(font.render(right, True, col), (rect.right - 12 - font.size(right)[0], y))
+        right_surf = render_text(font, right, col)
+        surface.blit(render_text(font, left, col), (rect.x + 12, y))
+        surface.blit(right_surf, (rect.right - 12 - right_surf.get_width(), y))
         y += 26
 
     y += 10
     tip = "No moves => shuffle. Press ESC to exit."
-    surface.blit(font.render(tip, True, SUBTEXT), (rect.x + 12, y))
+    surface.blit(render_text(font, tip, SUBTEXT), (rect.x + 12, y))
+    y += 26
+    tip = "F toggles fast effects."
+    surface.blit(render_text(font, tip, SUBTEXT), (rect.x + 12, y))
+
+    if scroll_tip:
+        y += 26
+        tip = "Arrows / WASD / wheel scroll the board."
+        surface.blit(render_text(font, tip, SUBTEXT), (rect.x + 12, y))
 
-def draw_all(screen, fish_sprites, trash_sprite, font, big, grid, selected, score, message,
+def draw_all(screen, atlas, font, big, grid, selected, score, message,
              animator, cleared_set, score_goal, cleared_color_count, color_goal, color_name,
-             trash_disposed):
+             trash_disposed, view, show_profile=False):
     screen.fill(BG)
+    board_rect = view.board_rect
 
-    pygame.draw.rect(screen, PANEL, (0, 0, BOARD_W, TOP_BAR))
-    screen.blit(big.render(f"Score: {score}", True, TEXT), (16, 16))
+    pygame.draw.rect(screen, PANEL, (0, 0, board_rect.w, TOP_BAR))
+    screen.blit(render_text(big, f"Score: {score}", TEXT), (16, 16))
 
-    msg_area_w = BOARD_W - 32
+    msg_area_w = board_rect.w - 32
     lines = wrap_text(message, msg_area_w, font)
     y = 62
     for ln in lines[:2]:
-        screen.blit(font.render(ln, True, SUBTEXT), (16, y))
+        screen.blit(render_text(font, ln, SUBTEXT), (16, y))
         y += 24
 
-    pygame.draw.rect(screen, (10, 12, 16), SIDE_RECT)
-    draw_tasks_panel(screen, font, score, score_goal, cleared_color_count, color_goal, color_name, trash_disposed, trash_total=3)
+    pygame.draw.rect(screen, (10, 12, 16), view.side_rect)
+    draw_tasks_panel(screen, font, score, score_goal, cleared_color_count, color_goal, color_name, trash_disposed,
+                     trash_total=3, side_rect=view.side_rect, scroll_tip=view.is_scrollable())
 
     prev_clip = screen.get_clip()
-    screen.set_clip(BOARD_RECT)
-    pygame.draw.rect(screen, GRID_BG, BOARD_RECT)
+    screen.set_clip(board_rect)
+    pygame.draw.rect(screen, GRID_BG, board_rect)
 
     hidden = animator.dest_cells_in_flight()
 
-    for yy in range(GRID_H):
-        for xx in range(GRID_W):
-            px, py = cell_to_px(xx, yy)
+    # Culling: only the cells under the viewport are drawn
+    x0, y0, x1, y1 = view.visible_cells()
+    for yy in range(y0, y1):
+        for xx in range(x0, x1):
+            px, py = view.to_screen(*cell_to_px(xx, yy))
             pygame.draw.rect(screen, GRID_LINE, (px, py, TILE, TILE), 1)
 
             if (xx, yy) in cleared_set:
@@ -797,24 +1163,41 @@ def draw_all(screen, fish_sprites, trash_sprite, font, big, grid, selected, scor
             t = grid[yy][xx]
             if t is None:
                 continue
-            draw_tile(screen, fish_sprites, trash_sprite, t, px, py)
+            draw_tile(screen, atlas, t, px, py)
 
     for t, ax, ay in animator.draw_overrides():
-        draw_tile(screen, fish_sprites, trash_sprite, t, ax, ay)
+        if view.overlaps(ax, ay):
+            draw_tile(screen, atlas, t, *view.to_screen(ax, ay))
 
     if selected:
         sx, sy = selected
-        px, py = cell_to_px(sx, sy)
+        px, py = view.to_screen(*cell_to_px(sx, sy))
         pygame.draw.rect(screen, (255, 255, 255), (px + 3, py + 3, TILE - 6, TILE - 6), 3, border_radius=10)
 
     screen.set_clip(prev_clip)
+
+    if show_profile:
+        # Rendered directly (not through the cache) so it does not count itself
+        st = text_cache.last_frame_stats
+        info = (f"text: {st['renders']} renders, {st['hits']} hits | "
+                f"wrap: {st['wrap_layouts']} layouts, {st['wrap_hits']} hits")
+        screen.blit(font.render(info, True, ARROW_COLOR, PANEL), (16, TOP_BAR - 20))
+
     pygame.display.flip()
 
 
 # -----------------------------
 # Public entry point
 # -----------------------------
-def run_match3_minigame(level=1):
+def run_match3_minigame(level=1, board=None):
+    """
+    board: (w, h) in cells, default GRID_W x GRID_H. Boards larger than
+    VIEW_MAX_COLS x VIEW_MAX_ROWS ("marathon" boards) scroll inside a
+    fixed-size viewport instead of growing the window.
+    """
+    board_w, board_h = board if board is not None else (GRID_W, GRID_H)
+    view = Viewport(board_w, board_h)
+
     score_goal = 500 + (max(0, level - 1) * 200)
     color_goal = 20
 
@@ -829,16 +1212,16 @@ def run_match3_minigame(level=1):
     color_names = ["Blue", "Green", "Pink", "Purple", "White", "Yellow"]
     color_name = color_names[target_color]
 
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    screen = pygame.display.set_mode((view.width, view.height))
     pygame.display.set_caption(f"Match-Three (Level {level})")
 
     clock = pygame.time.Clock()
-    font = pygame.font.SysFont(None, 24)
-    big = pygame.font.SysFont(None, 38)
+    font = get_font(None, 24)
+    big = get_font(None, 38)
 
-    fish_sprites, trash_sprite = load_assets()
+    atlas = load_tile_atlas()
 
-    grid = make_grid_no_initial_matches()
+    grid = make_grid_no_initial_matches(board_w, board_h)
     place_three_trash_at_top(grid)
 
     animator = Animator()
@@ -857,17 +1240,22 @@ def run_match3_minigame(level=1):
 
     pause_timer = 0.0
 
+    # Cells changed since the board last settled. Match and hole checks only
+    # look at the lines through these, so resolving stays flat on big boards.
+    dirty = set()
+
     # idle help timers
     idle_seconds = 0.0
     hint_cooldown = 0.0
 
     # rainbow staged plan state
+    effects = EffectScheduler()
     rainbow_plan = None
-    rainbow_queue = []
-    rainbow_step_timer = 0.0
-    rainbow_converted = []  # positions converted (for final clear)
+    rainbow_converted = 0
     rainbow_message_prefix = ""
 
+    show_profile = False  # F3 toggles the text cache counters
+
     running = True
     while running:
         dt = clock.tick(FPS) / 1000.0
@@ -891,6 +1279,8 @@ def run_match3_minigame(level=1):
             if idle_seconds >= IDLE_HELP_SECONDS:
                 mv = find_any_valid_move(grid)
                 if mv is not None:
+                    view.reveal_cell(*mv[0])
+                    view.reveal_cell(*mv[1])
                     play_hint_swap_animation(grid, animator, mv)
                     message = "Hint: try swapping the highlighted pair."
                     idle_seconds = 0.0
@@ -903,6 +1293,14 @@ def run_match3_minigame(level=1):
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return "lose"
+                if event.key == pygame.K_F3:
+                    show_profile = not show_profile
+                if event.key == pygame.K_f:
+                    effects.fast = not effects.fast
+                    message = "Fast effects on." if effects.fast else "Fast effects off."
+
+            if event.type == pygame.MOUSEWHEEL:
+                view.scroll(-event.x * WHEEL_SCROLL_PX, -event.y * WHEEL_SCROLL_PX)
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 # Any click resets idle timers
@@ -911,7 +1309,7 @@ def run_match3_minigame(level=1):
 
                 if state != "idle" or animator.is_busy():
                     continue
-                cell = screen_to_cell(*event.pos)
+                cell = view.screen_to_cell(*event.pos)
                 if cell is None:
                     continue
 
@@ -940,12 +1338,21 @@ def run_match3_minigame(level=1):
                         animator.add_swap(ta, a_px, b_px, SWAP_DURATION)
                         animator.add_swap(tb, b_px, a_px, SWAP_DURATION)
                         swap_in_grid(grid, swap_a, swap_b)
+                        dirty = {swap_a, swap_b}
 
                         state = "swapping"
                         selected = None
                     else:
                         selected = cell
 
+        # Camera scroll (large boards only)
+        if view.is_scrollable():
+            keys = pygame.key.get_pressed()
+            sx = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a])
+            sy = (keys[pygame.K_DOWN] or keys[pygame.K_s]) - (keys[pygame.K_UP] or keys[pygame.K_w])
+            if sx or sy:
+                view.scroll(sx * SCROLL_SPEED_PX * dt, sy * SCROLL_SPEED_PX * dt)
+
         # Swap finished
         if state == "swapping" and not animator.is_busy():
             ax, ay = swap_a
@@ -965,7 +1372,7 @@ def run_match3_minigame(level=1):
                 plan = build_rainbow_plan(grid, rainbow_pos, other_pos)
                 if plan is None:
                     # fallback: treat as normal swap resolution
-                    matched, _, _ = find_runs(grid)
+                    matched, _, _ = find_runs(grid, dirty)
                     if matched:
                         state = "resolving"
                         pause_timer = 0.0
@@ -980,12 +1387,16 @@ def run_match3_minigame(level=1):
                         state = "idle"
                         message = "No match. Swap reverted."
                 else:
-                    # start staged conversion
+                    # start staged conversion; the final clear is known up front
                     rainbow_plan = plan
-                    rainbow_queue = plan["chosen"][:]
-                    random.shuffle(rainbow_queue)  # optional: random order
-                    rainbow_step_timer = 0.0
-                    rainbow_converted = []
+                    rainbow_plan["clear_set"], rainbow_plan["clear_tiles"] = plan_rainbow_final_clear(grid, plan)
+                    order = plan["chosen"][:]
+                    random.shuffle(order)  # optional: random order
+                    effects.clear()
+                    for pos in order:
+                        effects.add(RAINBOW_STEP_SECONDS, ("convert", pos))
+                    effects.add(RAINBOW_STEP_SECONDS, ("rainbow_clear", None))
+                    rainbow_converted = 0
                     templ = plan["template"]
                     k = tile_kind(templ)
                     if k == "normal":
@@ -997,7 +1408,7 @@ def run_match3_minigame(level=1):
 
             else:
                 # 2) normal match flow
-                matched, _, _ = find_runs(grid)
+                matched, _, _ = find_runs(grid, dirty)
                 if matched:
                     state = "resolving"
                     pause_timer = 0.0
@@ -1012,73 +1423,43 @@ def run_match3_minigame(level=1):
                     state = "idle"
                     message = "No match. Swap reverted."
 
-        # Staged rainbow conversion: convert one tile, then pause 1 second
-        if state == "rainbow_converting":
-            if animator.is_busy():
-                pass
-            else:
-                rainbow_step_timer += dt
-                if rainbow_step_timer >= RAINBOW_STEP_SECONDS:
-                    rainbow_step_timer = 0.0
-
-                    if rainbow_queue:
-                        x, y = rainbow_queue.pop(0)
-                        templ = rainbow_plan["template"]
-
-                        # Convert this tile now
-                        if tile_kind(templ) == "normal":
-                            grid[y][x] = make_tile("normal", tile_color(templ), None)
-                        else:
-                            grid[y][x] = clone_tile_as_template(templ)
-
-                        rainbow_converted.append((x, y))
-                        message = f"{rainbow_message_prefix} ({len(rainbow_converted)}/{len(rainbow_plan['chosen'])})"
-                    else:
-                        # Conversion finished, now apply elimination/activation
-                        templ = rainbow_plan["template"]
-                        rainbow_pos = rainbow_plan["rainbow_pos"]
-                        other_pos = rainbow_plan["other_pos"]
-
-                        if tile_kind(templ) == "normal":
-                            # Clear converted set plus rainbow and other
-                            clear_set = set(rainbow_converted)
-                            clear_set.add(rainbow_pos)
-                            clear_set.add(other_pos)
-
-                        else:
-                            # For special tiles, activate via chain expansion starting from converted set
-                            clear_set = compute_clear_set_with_specials_chain(grid, set(rainbow_converted))
-                            clear_set.add(rainbow_pos)
-                            clear_set.add(other_pos)
-
-                        # Count target hits BEFORE clearing
-                        target_hits = 0
-                        for (cx, cy) in clear_set:
-                            t = grid[cy][cx]
-                            if t is None:
-                                continue
-                            if tile_kind(t) in ("trash", "rainbow"):
-                                continue
-                            if tile_color(t) == target_color:
-                                target_hits += 1
+        # Staged rainbow conversion: one tile per step (1 second each, or
+        # batched several per frame in fast mode), then the precomputed clear
+        if state == "rainbow_converting" and not animator.is_busy():
+            for kind, pos in effects.update(dt):
+                if kind == "convert":
+                    x, y = pos
+                    grid[y][x] = rainbow_converted_tile(rainbow_plan["template"])
+                    rainbow_converted += 1
+                    message = f"{rainbow_message_prefix} ({rainbow_converted}/{len(rainbow_plan['chosen'])})"
+
+                elif kind == "rainbow_clear":
+                    clear_set = rainbow_plan["clear_set"]
+
+                    # Count target hits BEFORE clearing
+                    target_hits = 0
+                    for t in rainbow_plan["clear_tiles"].values():
+                        if tile_kind(t) in ("trash", "rainbow"):
+                            continue
+                        if tile_color(t) == target_color:
+                            target_hits += 1
 
-                        clear_cells(grid, clear_set)
+                    clear_cells(grid, clear_set)
 
-                        score_delta = len(clear_set) * 10
-                        score += score_delta
-                        cleared_target_color += target_hits
+                    score_delta = len(clear_set) * 10
+                    score += score_delta
+                    cleared_target_color += target_hits
 
-                        cleared_set = set(clear_set)
-                        message = f"Rainbow activated: cleared {len(clear_set)} (+{score_delta})"
-                        pause_timer = CLEAR_PAUSE
+                    cleared_set = set(clear_set)
+                    dirty = set(clear_set)
+                    message = f"Rainbow activated: cleared {len(clear_set)} (+{score_delta})"
+                    pause_timer = CLEAR_PAUSE
 
-                        # reset rainbow state
-                        rainbow_plan = None
-                        rainbow_queue = []
-                        rainbow_converted = []
-                        rainbow_step_timer = 0.0
+                    # reset rainbow state
+                    rainbow_plan = None
+                    rainbow_converted = 0
 
-                        state = "resolving"
+                    state = "resolving"
 
         # Resolving
         if state == "resolving":
@@ -1090,18 +1471,15 @@ def run_match3_minigame(level=1):
                 pass
             else:
                 # 1) dispose trash at bottom
-                disposed_now = dispose_bottom_trash(grid, animator)
-                if disposed_now > 0:
-                    trash_disposed += disposed_now
+                emptied = dispose_bottom_trash(grid, animator)
+                if emptied:
+                    trash_disposed += len(emptied)
+                    dirty.update(emptied)
                     message = f"Trash disposed: {trash_disposed}/3"
                 else:
                     # 2) clear matches (count target BEFORE clearing)
-                    matched, horiz_runs, vert_runs = find_runs(grid)
-                    if matched:
-                        special_map, protected = choose_specials_from_matches_for_cascade(grid, horiz_runs, vert_runs)
-                        matched_to_clear = set(matched) - set(protected)
-                        expanded = compute_clear_set_with_specials_chain(grid, matched_to_clear)
-
+                    expanded, special_map = plan_match_clear(grid, dirty)
+                    if expanded:
                         # Count target color before clearing
                         target_hits = 0
                         for (x, y) in expanded:
@@ -1113,13 +1491,9 @@ def run_match3_minigame(level=1):
                             if tile_color(t) == target_color:
                                 target_hits += 1
 
-                        # Place specials, then clear
-                        for (x, y), new_tile in special_map.items():
-                            if grid[y][x] is not None and tile_kind(grid[y][x]) == "trash":
-                                continue
-                            grid[y][x] = new_tile
-
-                        clear_cells(grid, expanded)
+                        apply_match_clear(grid, expanded, special_map)
+                        # Added to, not replaced: emptied trash cells wait here for gravity too
+                        dirty |= set(expanded) | set(special_map)
 
                         score_delta = len(expanded) * 10
                         score += score_delta
@@ -1131,8 +1505,9 @@ def run_match3_minigame(level=1):
 
                     else:
                         # 3) gravity if holes exist
-                        if has_holes(grid):
-                            drop_with_animation(grid, animator)
+                        hole_cols = {x for x, _ in dirty}
+                        if has_holes(grid, hole_cols):
+                            dirty = drop_with_animation(grid, animator, hole_cols)
                         else:
                             # 4) no matches and no holes => check moves or shuffle
                             if not has_any_valid_move(grid):
@@ -1141,12 +1516,12 @@ def run_match3_minigame(level=1):
                                 if not ok:
                                     message = "Shuffled, but still no moves. Exiting."
                                     return "lose"
+                            dirty = set()
                             state = "idle"
 
         draw_all(
             screen=screen,
-            fish_sprites=fish_sprites,
-            trash_sprite=trash_sprite,
+            atlas=atlas,
             font=font,
             big=big,
             grid=grid,
@@ -1159,17 +1534,124 @@ def run_match3_minigame(level=1):
             cleared_color_count=cleared_target_color,
             color_goal=color_goal,
             color_name=color_name,
-            trash_disposed=trash_disposed
+            trash_disposed=trash_disposed,
+            view=view,
+            show_profile=show_profile
         )
+        text_cache.end_frame()
 
     return "lose"
 
 
+# -----------------------------
+# Benchmark (headless)
+# -----------------------------
+def resolve_until_settled(grid, animator, dirty):
+    """Engine-only cascade (no pauses, animations dropped). Returns cells cleared."""
+    cleared = 0
+    while True:
+        emptied = dispose_bottom_trash(grid, animator)
+        if emptied:
+            if dirty is not None:
+                dirty.update(emptied)
+            continue
+        expanded, special_map = plan_match_clear(grid, dirty)
+        if expanded:
+            apply_match_clear(grid, expanded, special_map)
+            cleared += len(expanded)
+            if dirty is not None:
+                dirty |= set(expanded) | set(special_map)
+            continue
+        hole_cols = None if dirty is None else {x for x, _ in dirty}
+        if has_holes(grid, hole_cols):
+            changed = drop_with_animation(grid, animator, hole_cols)
+            animator.active.clear()
+            if dirty is not None:
+                dirty = changed
+            continue
+        return cleared
+
+def check_dirty_settling(boards=((8, 8), (5, 9)), seeds=range(10), moves=200):
+    """
+    Plays seeded boards with dirty-line tracking and fails if one settles
+    with a hole (a cell gravity never refilled).
+    """
+    for w, h in boards:
+        for seed in seeds:
+            random.seed(seed)
+            grid = make_grid_no_initial_matches(w, h)
+            place_three_trash_at_top(grid)
+            animator = Animator()
+            for move in range(moves):
+                mv = find_any_valid_move(grid)
+                if mv is None:
+                    shuffle_board_keep_trash(grid)
+                    continue
+                a, b = mv
+                swap_in_grid(grid, a, b)
+                resolve_until_settled(grid, animator, {a, b})
+                assert not has_holes(grid), f"{w}x{h} seed {seed}: hole after move {move}"
+
+def benchmark_board_sizes(sizes=((8, 8), (16, 16), (32, 32)), moves=200, seed=1, screen=None, frames=120):
+    """
+    Mean time per player move (swap -> settled board -> next move found),
+    with dirty-line tracking and with the old full-board rescans, plus the
+    mean draw_all time through the viewport when a screen is given.
+    """
+    import time
+    rows = []
+    for w, h in sizes:
+        row = {"board": f"{w}x{h}"}
+        for label, tracked in (("dirty_ms", True), ("full_ms", False)):
+            random.seed(seed)
+            grid = make_grid_no_initial_matches(w, h)
+            place_three_trash_at_top(grid)
+            animator = Animator()
+            t0 = time.perf_counter()
+            for _ in range(moves):
+                mv = find_any_valid_move(grid)
+                if mv is None:
+                    shuffle_board_keep_trash(grid)
+                    continue
+                a, b = mv
+                swap_in_grid(grid, a, b)
+                resolve_until_settled(grid, animator, {a, b} if tracked else None)
+            row[label] = (time.perf_counter() - t0) * 1000.0 / moves
+
+        if screen is not None:
+            view = Viewport(w, h)
+            atlas = load_tile_atlas()
+            font = get_font(None, 24)
+            big = get_font(None, 38)
+            t0 = time.perf_counter()
+            for i in range(frames):
+                view.scroll(3, 3)
+                draw_all(screen, atlas, font, big, grid, None, 0, "Benchmark", Animator(), set(),
+                         500, 0, 20, "Yellow", 0, view)
+            row["draw_ms"] = (time.perf_counter() - t0) * 1000.0 / frames
+        rows.append(row)
+    return rows
+
+
 # Optional quick test runner:
+#   python "candy crush minigame.py"          play level 1
+#   python "candy crush minigame.py" --bake   (re)bake the tile atlas
+#   python "candy crush minigame.py" --bench  board-size benchmark (checks dirty tracking first)
 if __name__ == "__main__":
     pygame.init()
     try:
-        result = run_match3_minigame(level=1)
-        print("Result:", result)
+        if "--bake" in sys.argv[1:]:
+            pygame.display.set_mode((1, 1))
+            bake_tile_atlas(TILE, atlas_path(TILE))
+            print("Baked:", atlas_path(TILE))
+        elif "--bench" in sys.argv[1:]:
+            check_dirty_settling()
+            bench_screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            for r in benchmark_board_sizes(screen=bench_screen):
+                print(f"{r['board']:>6}  resolve/move: {r['dirty_ms']:7.3f} ms (dirty lines)  "
+                      f"{r['full_ms']:7.3f} ms (full rescans)  draw: {r['draw_ms']:6.3f} ms")
+        else:
+            result = run_match3_minigame(level=1)
+            print("Result:", result)
     finally:
         pygame.quit()
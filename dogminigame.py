@@ -1,6 +1,19 @@
 import pygame
 import random
 import math
+import sys
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # packs fall back to lists of Dog / ThiefCat
+    np = None
+
+import flow_grid
+from flow_grid import FlowGrid
+from spatial_hash import SpatialHash
+from text_cache import get_font
 
 # ----------------------------------
 # CONSTANTS & SIZES
@@ -11,12 +24,22 @@ DOG_SIZE = 300
 THIEF_WIDTH = 80
 THIEF_HEIGHT = 120
 
-DOG_DANGER_RADIUS = 120         # Dog catches cat at this distance
+# Packs: level 1 is one dog and one thief, more join every few levels
+DOGS_EVERY_LEVELS = 3
+THIEVES_EVERY_LEVELS = 4
+MAX_DOGS = 6
+MAX_THIEVES = 4
+
 CHASE_RADIUS = 260              # Dog starts chasing cat
 CHASE_LOSE_RADIUS = 330         # Dog stops chasing when cat escapes
 
-BASE_DOG_SPEED_BASE = 2.0
-MAX_EXTRA_SPEED_BASE = 3.0
+# Speeds are in pixels per second (the old per-frame values at 60 FPS);
+# movement is integrated with the measured frame time
+CAT_SPEED_BASE = 240
+CAT_SPEED_PER_LEVEL = 60
+BASE_DOG_SPEED_BASE = 120
+MAX_EXTRA_SPEED_BASE = 180
+DOG_SPEED_PER_LEVEL = 30
 TIME_TO_MAX = 120000            # 2 minutes for dog to reach max speed
 
 CHASE_MULTIPLIER = 1.6
@@ -24,16 +47,59 @@ CHASE_MULTIPLIER = 1.6
 FISH_STEAL_TIME_BASE = 8000
 # FISH_ROT_TIME is no longer fixed; time limit now scales with level
 FISH_ROT_TIME_BASE = 60000      # 60 seconds base (1 minute)
-FISH_PICKUP_RADIUS_BASE = 50
+THIEF_STEAL_RADIUS = 12
+
+THIEF_WANDER_SPEED = 90
+THIEF_CHASE_SPEED = 150
+THIEF_TARGET_COOLDOWN = 3000
+
+# Fish and threats (dog, thief) live in spatial hashes with this cell size,
+# so pickups and catches only test what is near the cat.
+GRID_CELL = 128
+# Farthest centre distance at which the cat's rect can touch a thief's or a
+# fish's: the broad phase before the rect and pixel mask tests
+THIEF_TOUCH_RADIUS = math.hypot((CAT_SIZE + THIEF_WIDTH) / 2, (CAT_SIZE + THIEF_HEIGHT) / 2)
+FISH_TOUCH_RADIUS = math.hypot(CAT_SIZE + FISH_SIZE, CAT_SIZE + FISH_SIZE) / 2
+
+# Longest frame step, in seconds: after a stall (window drag, breakpoint)
+# entities move as if the frame took this long instead of jumping
+MAX_DT = 0.1
+
+# Obstacles: one layout per level, cycling. Each is (kind, centre x, centre
+# y), the centre as a fraction of the arena size.
+BIN_SIZE = (70, 70)
+CRATE_SIZE = (120, 90)
+OBSTACLE_LAYOUTS = (
+    (("bin", 0.35, 0.25), ("bin", 0.35, 0.75), ("crate", 0.6, 0.5)),
+    (("crate", 0.3, 0.5), ("crate", 0.55, 0.25), ("crate", 0.55, 0.75), ("bin", 0.8, 0.2)),
+    (("bin", 0.25, 0.3), ("bin", 0.25, 0.7), ("crate", 0.5, 0.5), ("bin", 0.75, 0.3), ("bin", 0.75, 0.7)),
+)
+CRATE_COLOR = (150, 105, 60)
+CRATE_EDGE_COLOR = (95, 62, 32)
+
+# Against obstacles, bodies are circles at the sprite centre (smaller than
+# the sprites, which have a lot of transparent margin)
+CAT_BODY_RADIUS = 28
+DOG_BODY_RADIUS = 80
+THIEF_BODY_RADIUS = 40
+
+# Cell size of the flow grids chasers use to path around obstacles
+FLOW_CELL = 25
 
 # ----------------------------------
 # HELPER FUNCTIONS
 # ----------------------------------
 
-def distance(a, b):
+def distance_sq(a, b):
+    """Squared distance between rect centres (compare against radius ** 2)."""
     ax, ay = a.center
     bx, by = b.center
-    return math.hypot(ax - bx, ay - by)
+    return (ax - bx) ** 2 + (ay - by) ** 2
+
+def sprites_touch(rect_a, mask_a, rect_b, mask_b):
+    """Pixel-precise overlap of two sprites drawn at their rects' top-lefts."""
+    return (rect_a.colliderect(rect_b)
+            and mask_a.overlap(mask_b, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None)
 
 def rps_result(player, cpu):
     if player == cpu:
@@ -42,16 +108,140 @@ def rps_result(player, cpu):
     return "win" if win[player] == cpu else "lose"
 
 
+# ----------------------------------
+# ARENA (obstacles)
+# ----------------------------------
+# Bodies move by their centre point. For a body radius, the walls are the
+# obstacle rects grown by that radius, and the flow grid over those walls
+# gives chasers of that size their way around; the grid also leaves out
+# the screen edges a sprite's centre can't reach. Both are built on first
+# use and kept for the game.
+
+class Arena:
+    def __init__(self, width, height, obstacles):
+        self.width = width
+        self.height = height
+        self.obstacles = obstacles  # list of (kind, Rect)
+        self._walls = {}
+        self._flows = {}
+
+    def walls(self, radius):
+        walls = self._walls.get(radius)
+        if walls is None:
+            walls = self._walls[radius] = [r.inflate(2 * radius, 2 * radius) for _, r in self.obstacles]
+        return walls
+
+    def flow(self, radius, sprite_size):
+        key = radius, tuple(sprite_size)
+        flow = self._flows.get(key)
+        if flow is None:
+            w, h = sprite_size
+            # Where the sprite's centre can be while the sprite is on screen
+            bounds = pygame.Rect(w // 2, h // 2, self.width - w + 1, self.height - h + 1)
+            flow = self._flows[key] = FlowGrid(self.width, self.height, FLOW_CELL, self.walls(radius), bounds)
+        return flow
+
+    def is_free(self, x, y, radius):
+        return not any(r.left < x < r.right and r.top < y < r.bottom for r in self.walls(radius))
+
+    def random_spot(self, x_range, y_range, size, radius, tries=50):
+        """Random top-left in the ranges whose centre a body of radius can reach (or the last try)."""
+        for _ in range(tries):
+            x, y = random.randint(*x_range), random.randint(*y_range)
+            if self.is_free(x + size[0] / 2, y + size[1] / 2, radius):
+                break
+        return x, y
+
+
+def make_arena(level, width, height):
+    layout = OBSTACLE_LAYOUTS[(max(1, int(level)) - 1) % len(OBSTACLE_LAYOUTS)]
+    obstacles = []
+    for kind, fx, fy in layout:
+        rect = pygame.Rect((0, 0), BIN_SIZE if kind == "bin" else CRATE_SIZE)
+        rect.center = (int(fx * width), int(fy * height))
+        obstacles.append((kind, rect))
+    return Arena(width, height, obstacles)
+
+
 # ----------------------------------
 # CLASSES
 # ----------------------------------
 
-class Cat:
-    def __init__(self, x, y, speed):
-        self.rect = pygame.Rect(x, y, CAT_SIZE, CAT_SIZE)
+class Entity:
+    """
+    Float position (top-left) and velocity in px/s, integrated with the
+    frame's measured dt. rect is derived from pos after every move and is
+    only for drawing and collision. With an arena, the body (radius around
+    the centre) slides along its obstacles and chases through its flow grid.
+    """
+
+    def __init__(self, x, y, w, h, arena=None, radius=0):
+        self.pos = pygame.Vector2(x, y)
+        self.vel = pygame.Vector2(0, 0)
+        self.rect = pygame.Rect(x, y, w, h)
+        self.walls = arena.walls(radius) if arena else ()
+        self.flow = arena.flow(radius, (w, h)) if arena else None
+
+    def center(self):
+        return self.pos.x + self.rect.w / 2, self.pos.y + self.rect.h / 2
+
+    def in_wall(self):
+        cx, cy = self.center()
+        return any(r.left < cx < r.right and r.top < cy < r.bottom for r in self.walls)
+
+    def move(self, dx, dy):
+        """Move one axis at a time, so the body slides along walls; returns (blocked in x, blocked in y)."""
+        if not self.walls:
+            self.pos.x += dx
+            self.pos.y += dy
+            return False, False
+        # A body already inside (wrapped or spawned there) may always move
+        stuck = self.in_wall()
+        self.pos.x += dx
+        hit_x = not stuck and self.in_wall()
+        if hit_x:
+            self.pos.x -= dx
+        self.pos.y += dy
+        hit_y = not stuck and self.in_wall()
+        if hit_y:
+            self.pos.y -= dy
+        return hit_x, hit_y
+
+    def sync_rect(self):
+        self.rect.x = round(self.pos.x)
+        self.rect.y = round(self.pos.y)
+
+    def clamp(self, width, height):
+        self.pos.x = max(0, min(width - self.rect.w, self.pos.x))
+        self.pos.y = max(0, min(height - self.rect.h, self.pos.y))
+
+    def steer(self, target, speed, dt):
+        """Move the centre toward target at speed: along the flow grid, or straight in its cell."""
+        cx, cy = self.center()
+        way = self.flow.direction(cx, cy, *target) if self.flow else None
+        if way is None:
+            dx, dy = target[0] - cx, target[1] - cy
+            dist = math.hypot(dx, dy)
+            if dist == 0:
+                return
+            way = dx / dist, dy / dist
+        self.vel.update(speed * way[0], speed * way[1])
+        self.move(self.vel.x * dt, self.vel.y * dt)
+
+    def bounce(self, direction, width, height):
+        """Flip direction's components for the walls the entity is past."""
+        if self.pos.x < 0 or self.pos.x + self.rect.w > width:
+            direction.x *= -1
+        if self.pos.y < 0 or self.pos.y + self.rect.h > height:
+            direction.y *= -1
+
+
+class Cat(Entity):
+    def __init__(self, x, y, speed, arena=None):
+        super().__init__(x, y, CAT_SIZE, CAT_SIZE, arena, CAT_BODY_RADIUS)
         self.speed = speed
 
-    def update(self, keys, width, height):
+    def update(self, keys, width, height, dt):
         dx = dy = 0
         if keys[pygame.K_LEFT]:
             dx -= self.speed
@@ -62,200 +252,627 @@ class Cat:
         if keys[pygame.K_DOWN]:
             dy += self.speed
 
-        self.rect.x += dx
-        self.rect.y += dy
+        self.vel.update(dx, dy)
+        self.move(dx * dt, dy * dt)
 
         # Horizontal wrap-around
-        if self.rect.right < 0:
-            self.rect.left = width
-        elif self.rect.left > width:
-            self.rect.right = 0
+        if self.pos.x + self.rect.w < 0:
+            self.pos.x = width
+        elif self.pos.x > width:
+            self.pos.x = -self.rect.w
 
         # Vertical clamp only
-        if self.rect.top < 0:
-            self.rect.top = 0
-        if self.rect.bottom > height:
-            self.rect.bottom = height
+        self.pos.y = max(0, min(height - self.rect.h, self.pos.y))
+        self.sync_rect()
 
 
-class Dog:
-    def __init__(self, x, y, base_speed, max_extra_speed):
-        self.rect = pygame.Rect(x, y, DOG_SIZE, DOG_SIZE)
+class Dog(Entity):
+    def __init__(self, x, y, base_speed, max_extra_speed, now, arena=None):
+        super().__init__(x, y, DOG_SIZE, DOG_SIZE, arena, DOG_BODY_RADIUS)
         self.mode = "wander"
         self.wander_dir = pygame.Vector2(1, 0)
         self.change_dir_timer = 0
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = now
         self.base_speed = base_speed
         self.max_extra_speed = max_extra_speed
 
-    def current_base_speed(self):
-        t = (pygame.time.get_ticks() - self.spawn_time) / TIME_TO_MAX
+    def current_base_speed(self, now):
+        t = (now - self.spawn_time) / TIME_TO_MAX
         t = max(0, min(1, t))
         return self.base_speed + t * self.max_extra_speed
 
-    def update(self, cat_rect, width, height):
-        dist = distance(self.rect, cat_rect)
+    def update(self, cat_rect, width, height, now, dt):
+        dist_sq = distance_sq(self.rect, cat_rect)
 
         # Switch to chase mode when cat is close
-        if dist < CHASE_RADIUS:
+        if dist_sq < CHASE_RADIUS ** 2:
             self.mode = "chase"
 
         # Return to wander mode if cat escapes
-        elif dist > CHASE_LOSE_RADIUS:
+        elif dist_sq > CHASE_LOSE_RADIUS ** 2:
             self.mode = "wander"
 
         # Perform behavior
         if self.mode == "wander":
-            self.wander(width, height)
+            self.wander(width, height, now, dt)
         else:
-            self.chase(cat_rect, width, height)
+            self.chase(cat_rect, width, height, now, dt)
+        self.sync_rect()
 
-    def wander(self, width, height):
-        speed = self.current_base_speed()
-        now = pygame.time.get_ticks()
+    def wander(self, width, height, now, dt):
+        speed = self.current_base_speed(now)
 
         if now > self.change_dir_timer:
             angle = random.uniform(0, math.pi * 2)
             self.wander_dir = pygame.Vector2(math.cos(angle), math.sin(angle))
             self.change_dir_timer = now + random.randint(1000, 2500)
 
-        self.rect.x += int(self.wander_dir.x * speed)
-        self.rect.y += int(self.wander_dir.y * speed)
+        self.vel = self.wander_dir * speed
+        hit_x, hit_y = self.move(self.vel.x * dt, self.vel.y * dt)
 
-        # Bounce from walls
-        if self.rect.left < 0 or self.rect.right > width:
+        # Bounce from obstacles and walls
+        if hit_x:
             self.wander_dir.x *= -1
-        if self.rect.top < 0 or self.rect.bottom > height:
+        if hit_y:
             self.wander_dir.y *= -1
+        self.bounce(self.wander_dir, width, height)
+        self.clamp(width, height)
 
-        self.rect.clamp_ip(pygame.Rect(0, 0, width, height))
-
-    def chase(self, cat_rect, width, height):
-        speed = self.current_base_speed() * CHASE_MULTIPLIER
-        dx = cat_rect.centerx - self.rect.centerx
-        dy = cat_rect.centery - self.rect.centery
-        dist = math.hypot(dx, dy)
-
-        if dist > 0:
-            self.rect.x += int(speed * dx / dist)
-            self.rect.y += int(speed * dy / dist)
+    def chase(self, cat_rect, width, height, now, dt):
+        speed = self.current_base_speed(now) * CHASE_MULTIPLIER
+        self.steer(cat_rect.center, speed, dt)
 
-        self.rect.clamp_ip(pygame.Rect(0, 0, width, height))
+        self.clamp(width, height)
 
 
-class ThiefCat:
-    def __init__(self, width, height):
-        x = random.randint(50, width - 50)
-        y = random.randint(50, height - 50)
-        self.rect = pygame.Rect(x, y, THIEF_WIDTH, THIEF_HEIGHT)
+class ThiefCat(Entity):
+    def __init__(self, width, height, pos=None, arena=None):
+        if pos is None:
+            pos = (random.randint(50, width - 50), random.randint(50, height - 50))
+        x, y = pos
+        super().__init__(x, y, THIEF_WIDTH, THIEF_HEIGHT, arena, THIEF_BODY_RADIUS)
         self.active = True
         self.target_fish = None
         self.wander_dir = pygame.Vector2(1, 0)
-        self.speed_wander = 1.5
-        self.speed_chase = 2.5
+        self.speed_wander = THIEF_WANDER_SPEED
+        self.speed_chase = THIEF_CHASE_SPEED
         self.change_dir_timer = 0
         self.next_target_time = 0
-        self.target_cooldown = 3000
+        self.target_cooldown = THIEF_TARGET_COOLDOWN
 
     def set_target(self, fish):
         self.target_fish = fish
         fish.is_target = True
 
-    def clear_target(self):
+    def clear_target(self, now):
         if self.target_fish:
             self.target_fish.is_target = False
         self.target_fish = None
-        self.next_target_time = pygame.time.get_ticks() + self.target_cooldown
+        self.next_target_time = now + self.target_cooldown
 
-    def defeat(self):
+    def defeat(self, now):
         self.active = False
-        self.clear_target()
-        self.rect.topleft = (-999, -999)
+        self.clear_target(now)
+        self.pos.update(-999, -999)
+        self.sync_rect()
 
-    def update(self, width, height):
+    def update(self, width, height, now, dt):
         if not self.active:
             return
 
         if self.target_fish and self.target_fish.state != "fresh":
-            self.clear_target()
+            self.clear_target(now)
 
         if self.target_fish:
-            self.chase_target(width, height)
+            self.chase_target(width, height, dt)
         else:
-            self.wander(width, height)
-
-    def wander(self, width, height):
-        now = pygame.time.get_ticks()
+            self.wander(width, height, now, dt)
+        self.sync_rect()
 
+    def wander(self, width, height, now, dt):
         if now > self.change_dir_timer:
             angle = random.uniform(0, math.pi * 2)
             self.wander_dir = pygame.Vector2(math.cos(angle), math.sin(angle))
             self.change_dir_timer = now + random.randint(800, 2500)
 
-        self.rect.x += int(self.wander_dir.x * self.speed_wander)
-        self.rect.y += int(self.wander_dir.y * self.speed_wander)
+        self.vel = self.wander_dir * self.speed_wander
+        hit_x, hit_y = self.move(self.vel.x * dt, self.vel.y * dt)
 
         # Bounce
-        if self.rect.left < 0 or self.rect.right > width:
+        if hit_x:
             self.wander_dir.x *= -1
-        if self.rect.top < 0 or self.rect.bottom > height:
+        if hit_y:
             self.wander_dir.y *= -1
+        self.bounce(self.wander_dir, width, height)
+        self.clamp(width, height)
 
-        self.rect.clamp_ip(pygame.Rect(0, 0, width, height))
-
-    def chase_target(self, width, height):
-        dx = self.target_fish.rect.centerx - self.rect.centerx
-        dy = self.target_fish.rect.centery - self.rect.centery
-        dist = math.hypot(dx, dy)
-
-        if dist > 0:
-            self.rect.x += int(self.speed_chase * dx / dist)
-            self.rect.y += int(self.speed_chase * dy / dist)
+    def chase_target(self, width, height, dt):
+        self.steer(self.target_fish.rect.center, self.speed_chase, dt)
 
-        self.rect.clamp_ip(pygame.Rect(0, 0, width, height))
+        self.clamp(width, height)
 
 
 class Fish:
-    def __init__(self, x, y, rot_time_ms):
+    def __init__(self, x, y, rot_time_ms, now):
         self.rect = pygame.Rect(x, y, FISH_SIZE, FISH_SIZE)
         self.state = "fresh"
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = now
         self.is_target = False
         self.rot_time = rot_time_ms  # per-level rot time
 
-    def update(self):
+    def update(self, now):
         if (
             self.state == "fresh"
-            and pygame.time.get_ticks() - self.spawn_time > self.rot_time
+            and now - self.spawn_time > self.rot_time
         ):
             self.state = "rotten"
 
+# ----------------------------------
+# PACKS (dogs and thieves as arrays)
+# ----------------------------------
+# Higher levels have several dogs and thieves. Their positions, wander
+# directions, modes and turn timers live in NumPy arrays, and one step()
+# moves the whole group: wander, chase and wall bounce for every agent in
+# a few array operations, with the same float positions and px/s speeds
+# as Dog / ThiefCat. Chasers look up their direction in the arena's flow
+# grid: one field per distinct target cell, then one index per agent.
+#
+#   DogPack   update(cat_rect, w, h, now, dt), catches(cat_rect, cat_mask, dog_mask), rects()
+#   ThiefGang update(w, h, now, dt), .thieves: per-thief views with the
+#             ThiefCat attributes the game loop uses
+#
+# Without NumPy, DogList / ThiefList give the same interface over Dog and
+# ThiefCat objects.
+
+if np is not None:
+    _FLOW_STEPS = np.array(flow_grid.STEPS)
+
+
+class AgentGroup:
+    """Same-sized agents: top-left positions and velocities, wander directions, chase flags and turn timers."""
+
+    def __init__(self, positions, size, turn_ms, rng, arena=None, radius=0):
+        self.pos = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        self.count = len(self.pos)
+        self.vel = np.zeros_like(self.pos)     # px/s
+        self.size = np.array(size, dtype=np.float64)
+        self.half = np.floor(self.size / 2)   # rect.center offset
+        self.dir = np.tile(np.array([1.0, 0.0]), (self.count, 1))
+        self.turn_at = np.zeros(self.count)
+        self.turn_ms = turn_ms                 # (min, max) ms between wander turns
+        self.chasing = np.zeros(self.count, dtype=bool)
+        self.active = np.ones(self.count, dtype=bool)
+        self.rng = rng
+        # Walls as rows of (left, top, right, bottom)
+        if arena and arena.obstacles:
+            self.walls = np.array([(r.left, r.top, r.right, r.bottom) for r in arena.walls(radius)],
+                                  dtype=np.float64)
+            self.flow = arena.flow(radius, size)
+            self.snap = np.array(self.flow.snap, dtype=np.intp)
+        else:
+            self.walls = self.flow = None
+
+    def centers(self):
+        return self.pos + self.half
+
+    def in_walls(self, x, y):
+        """Which agents at top-lefts (x, y) have their centre inside a wall."""
+        cx = (x + self.half[0])[:, None]
+        cy = (y + self.half[1])[:, None]
+        walls = self.walls
+        return ((cx > walls[:, 0]) & (cx < walls[:, 2]) & (cy > walls[:, 1]) & (cy < walls[:, 3])).any(axis=1)
+
+    def cells_of(self, points):
+        flow = self.flow
+        cx = np.clip(points[:, 0] // flow.cell, 0, flow.cols - 1).astype(np.intp)
+        cy = np.clip(points[:, 1] // flow.cell, 0, flow.rows - 1).astype(np.intp)
+        return cy * flow.cols + cx
+
+    def follow_flow(self, centers, targets, ways):
+        """
+        Chasers' unit directions toward the centre of their next flow grid
+        cell, in place over ways where the grid has a step.
+        """
+        flow = self.flow
+        cells = self.snap[self.cells_of(centers)]
+        target_cells = self.cells_of(targets)
+        for t in np.unique(target_cells[self.chasing]):
+            rows = np.flatnonzero(self.chasing & (target_cells == t))
+            codes = np.frombuffer(flow.field(int(t)), dtype=np.uint8)[cells[rows]]
+            ok = codes != flow_grid.NO_STEP
+            rows, codes = rows[ok], codes[ok]
+            cy, cx = np.divmod(cells[rows], flow.cols)
+            nxt = (np.column_stack((cx, cy)) + _FLOW_STEPS[codes] + 0.5) * flow.cell - centers[rows]
+            ways[rows] = nxt / np.hypot(nxt[:, 0], nxt[:, 1])[:, None]
+
+    def step(self, targets, wander_speed, chase_speed, width, height, now, dt):
+        """Advance dt seconds: chasing agents head for targets (count x 2), the rest wander and bounce."""
+        wander = ~self.chasing & self.active
+
+        turn = wander & (now > self.turn_at)
+        k = int(np.count_nonzero(turn))
+        if k:
+            angle = self.rng.uniform(0, math.tau, k)
+            self.dir[turn] = np.column_stack((np.cos(angle), np.sin(angle)))
+            self.turn_at[turn] = now + self.rng.integers(self.turn_ms[0], self.turn_ms[1] + 1, k)
+
+        centers = self.centers()
+        d = np.broadcast_to(targets, centers.shape) - centers
+        dist = np.hypot(d[:, 0], d[:, 1])
+        ways = d / np.where(dist > 0, dist, np.inf)[:, None]
+        if self.flow is not None and self.chasing.any():
+            self.follow_flow(centers, np.broadcast_to(targets, centers.shape), ways)
+        chase = ways * np.asarray(chase_speed)[..., None]
+        vel = self.vel
+        vel[:] = np.where(self.chasing[:, None], chase, self.dir * np.asarray(wander_speed)[..., None])
+        vel[~self.active] = 0
+
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        if self.walls is None:
+            self.pos += vel * dt
+        else:
+            # One axis at a time, so bodies slide along obstacles; wanderers
+            # bounce off them. Agents already inside may always move.
+            stuck = self.in_walls(x, y)
+            nx = x + vel[:, 0] * dt
+            hit = ~stuck & self.in_walls(nx, y)
+            x[:] = np.where(hit, x, nx)
+            self.dir[wander & hit, 0] *= -1
+            ny = y + vel[:, 1] * dt
+            hit = ~stuck & self.in_walls(x, ny)
+            y[:] = np.where(hit, y, ny)
+            self.dir[wander & hit, 1] *= -1
+
+        # Bounce from walls (wanderers), then clamp the active ones inside;
+        # inactive agents stay wherever they were parked, off the field
+        w, h = self.size
+        act = self.active
+        self.dir[wander & ((x < 0) | (x + w > width)), 0] *= -1
+        self.dir[wander & ((y < 0) | (y + h > height)), 1] *= -1
+        x[act] = np.clip(x[act], 0, width - w)
+        y[act] = np.clip(y[act], 0, height - h)
+
+    def rect(self, i):
+        x, y = self.pos[i]
+        return pygame.Rect(round(x), round(y), int(self.size[0]), int(self.size[1]))
+
+
+class DogPack(AgentGroup):
+    def __init__(self, positions, base_speed, max_extra_speed, now, rng, arena=None):
+        super().__init__(positions, (DOG_SIZE, DOG_SIZE), (1000, 2500), rng, arena, DOG_BODY_RADIUS)
+        self.spawn_time = now
+        self.base_speed = base_speed
+        self.max_extra_speed = max_extra_speed
+
+    def current_base_speed(self, now):
+        t = (now - self.spawn_time) / TIME_TO_MAX
+        t = max(0, min(1, t))
+        return self.base_speed + t * self.max_extra_speed
+
+    def update(self, cat_rect, width, height, now, dt):
+        cat = np.array(cat_rect.center, dtype=np.float64)
+        d = self.centers() - cat
+        dist_sq = d[:, 0] ** 2 + d[:, 1] ** 2
+        # Chase when the cat is close, wander again once it escapes
+        self.chasing = (dist_sq < CHASE_RADIUS ** 2) | (self.chasing & (dist_sq <= CHASE_LOSE_RADIUS ** 2))
+        speed = self.current_base_speed(now)
+        self.step(cat, speed, speed * CHASE_MULTIPLIER, width, height, now, dt)
+
+    def catches(self, cat_rect, cat_mask, dog_mask):
+        """True if a dog's sprite touches the cat's: rects for the whole pack, masks for the overlaps."""
+        x, y = np.round(self.pos).T
+        w, h = self.size
+        hit = ((x < cat_rect.right) & (x + w > cat_rect.left)
+               & (y < cat_rect.bottom) & (y + h > cat_rect.top) & self.active)
+        for i in np.flatnonzero(hit):
+            if cat_mask.overlap(dog_mask, (int(x[i]) - cat_rect.x, int(y[i]) - cat_rect.y)) is not None:
+                return True
+        return False
+
+    def rects(self):
+        return [self.rect(i) for i in range(self.count)]
+
+
+class ThiefView:
+    """One thief in a ThiefGang, with the ThiefCat attributes the game loop uses."""
+
+    def __init__(self, gang, i):
+        self.gang = gang
+        self.i = i
+        self.target_fish = None
+        self.next_target_time = 0
+
+    @property
+    def rect(self):
+        return self.gang.rect(self.i)
+
+    @property
+    def active(self):
+        return bool(self.gang.active[self.i])
+
+    def set_target(self, fish):
+        self.target_fish = fish
+        fish.is_target = True
+
+    def clear_target(self, now):
+        if self.target_fish:
+            self.target_fish.is_target = False
+        self.target_fish = None
+        self.next_target_time = now + THIEF_TARGET_COOLDOWN
+
+    def defeat(self, now):
+        self.gang.active[self.i] = False
+        self.clear_target(now)
+        self.gang.pos[self.i] = (-999, -999)
+
+
+class ThiefGang(AgentGroup):
+    def __init__(self, positions, rng, arena=None):
+        super().__init__(positions, (THIEF_WIDTH, THIEF_HEIGHT), (800, 2500), rng, arena, THIEF_BODY_RADIUS)
+        self.thieves = [ThiefView(self, i) for i in range(self.count)]
+
+    def update(self, width, height, now, dt):
+        targets = np.zeros((self.count, 2))
+        for t in self.thieves:
+            if t.target_fish and t.target_fish.state != "fresh":
+                t.clear_target(now)
+            if t.target_fish:
+                targets[t.i] = t.target_fish.rect.center
+            self.chasing[t.i] = t.target_fish is not None
+        self.step(targets, THIEF_WANDER_SPEED, THIEF_CHASE_SPEED, width, height, now, dt)
+
+
+class DogList:
+    """DogPack over Dog objects, for when NumPy is missing."""
+
+    def __init__(self, positions, base_speed, max_extra_speed, now, rng=None, arena=None):
+        self.dogs = [Dog(x, y, base_speed, max_extra_speed, now, arena) for x, y in positions]
+        self.count = len(self.dogs)
+
+    def update(self, cat_rect, width, height, now, dt):
+        for dog in self.dogs:
+            dog.update(cat_rect, width, height, now, dt)
+
+    def catches(self, cat_rect, cat_mask, dog_mask):
+        return any(sprites_touch(cat_rect, cat_mask, dog.rect, dog_mask) for dog in self.dogs)
+
+    def rects(self):
+        return [dog.rect for dog in self.dogs]
+
+
+class ThiefList:
+    """ThiefGang over ThiefCat objects, for when NumPy is missing."""
+
+    def __init__(self, positions, rng=None, arena=None):
+        self.thieves = [ThiefCat(0, 0, pos, arena) for pos in positions]
+        self.count = len(self.thieves)
+
+    def update(self, width, height, now, dt):
+        for thief in self.thieves:
+            thief.update(width, height, now, dt)
+
+
+def pack_sizes(level):
+    """(dogs, thieves) for a level."""
+    level = max(1, int(level))
+    dogs = min(MAX_DOGS, 1 + (level - 1) // DOGS_EVERY_LEVELS)
+    thieves = min(MAX_THIEVES, 1 + (level - 1) // THIEVES_EVERY_LEVELS)
+    return dogs, thieves
+
+
+def make_packs(dogs, thieves, width, height, base_speed, max_extra_speed, now, arena=None):
+    """(dog pack, thief gang): the first dog where the single dog always started, the rest on the right."""
+    arena = arena or Arena(width, height, [])
+    dog_size = (DOG_SIZE, DOG_SIZE)
+    thief_size = (THIEF_WIDTH, THIEF_HEIGHT)
+    dog_pos = [(width - 300, height // 2)]
+    if not arena.is_free(width - 300 + DOG_SIZE / 2, height // 2 + DOG_SIZE / 2, DOG_BODY_RADIUS):
+        dog_pos = []
+    while len(dog_pos) < dogs:
+        dog_pos.append(arena.random_spot((width // 2, width - DOG_SIZE), (0, height - DOG_SIZE),
+                                         dog_size, DOG_BODY_RADIUS))
+    thief_pos = [arena.random_spot((50, width - 50), (50, height - 50), thief_size, THIEF_BODY_RADIUS)
+                 for _ in range(thieves)]
+    if np is None:
+        return (DogList(dog_pos, base_speed, max_extra_speed, now, arena=arena),
+                ThiefList(thief_pos, arena=arena))
+    rng = np.random.default_rng(random.getrandbits(64))  # follows random.seed()
+    return (DogPack(dog_pos, base_speed, max_extra_speed, now, rng, arena),
+            ThiefGang(thief_pos, rng, arena))
+
+
+# ----------------------------------
+# ASSETS
+# ----------------------------------
+# Loaded, converted and scaled once per window size, then kept for the rest
+# of the process. preload_dog_assets() is safe to call from a worker thread
+# ahead of the minigame (the lobby does during the encounter delay); a
+# second caller waits for a load in progress instead of starting another.
+# The collision masks are built from the scaled images at the same time.
+
+_assets_cache = {}
+_assets_lock = threading.Lock()
+
+
+def load_scaled(path, size, alpha=True):
+    img = pygame.image.load(path)
+    img = img.convert_alpha() if alpha else img.convert()
+    return pygame.transform.smoothscale(img, size)
+
+
+def make_crate(size):
+    """Wooden crate: planks with a frame and a cross brace."""
+    crate = pygame.Surface(size)
+    crate.fill(CRATE_COLOR)
+    w, h = size
+    for y in range(h // 4, h, h // 4):
+        pygame.draw.line(crate, CRATE_EDGE_COLOR, (0, y), (w, y), 1)
+    pygame.draw.line(crate, CRATE_EDGE_COLOR, (0, 0), (w, h), 6)
+    pygame.draw.line(crate, CRATE_EDGE_COLOR, (0, h), (w, 0), 6)
+    pygame.draw.rect(crate, CRATE_EDGE_COLOR, crate.get_rect(), 6)
+    return crate
+
+
+class DogAssets:
+    def __init__(self, window_size):
+        self.fish = load_scaled("fish.png", (FISH_SIZE, FISH_SIZE))
+        self.fish_target = load_scaled("targetted fish.png", (FISH_SIZE, FISH_SIZE))
+        self.cat = load_scaled("cathead.png", (CAT_SIZE, CAT_SIZE))
+        self.dog = load_scaled("threat minigame symbol.png", (DOG_SIZE, DOG_SIZE))
+        self.thief = load_scaled("thief cat.png", (THIEF_WIDTH, THIEF_HEIGHT))
+        self.scratch = load_scaled("scratch.png", (int(CAT_SIZE * 1.5), int(CAT_SIZE * 1.5)))
+        self.background = load_scaled("dirtyfloor.png", window_size, alpha=False)
+        self.obstacles = {"bin": load_scaled("trash bag.png", BIN_SIZE), "crate": make_crate(CRATE_SIZE)}
+        self.cat_mask = pygame.mask.from_surface(self.cat)
+        self.dog_mask = pygame.mask.from_surface(self.dog)
+        self.thief_mask = pygame.mask.from_surface(self.thief)
+        self.fish_mask = pygame.mask.from_surface(self.fish)
+        self.collect_sound = pygame.mixer.Sound("collect.wav")
+
+
+def preload_dog_assets(window_size):
+    """DogAssets for this window size, loaded on the first call. Needs the display mode set."""
+    key = tuple(window_size)
+    with _assets_lock:
+        assets = _assets_cache.get(key)
+        if assets is None:
+            assets = _assets_cache[key] = DogAssets(key)
+    return assets
+
+
+# ----------------------------------
+# CLOCKS & INPUT
+# ----------------------------------
+# run_dog_minigame reads time only from its clock and the player only from
+# its input source, so a headless run can swap both:
+#
+#   clock     now() -> ms since some start, tick() -> ms since the last tick
+#   controls  poll(state, cat, fish, dogs) -> (events, pressed keys)
+#
+# RealClock / PygameInput are the normal game. SimClock advances a fixed
+# step per frame without waiting and BotInput plays by itself, so
+# simulate_dog_games() runs as fast as the CPU allows.
+
+class RealClock:
+    """Wall-clock time from pygame, capped at fps."""
+
+    def __init__(self, fps=60):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+
+    def now(self):
+        return pygame.time.get_ticks()
+
+    def tick(self):
+        return self.clock.tick(self.fps)
+
+
+class SimClock:
+    """Simulated time: every tick is exactly step_ms, with no waiting."""
+
+    def __init__(self, step_ms=1000 / 60):
+        self.step_ms = step_ms
+        self.t = 0.0
+
+    def now(self):
+        return int(self.t)
+
+    def tick(self):
+        self.t += self.step_ms
+        return self.step_ms
+
+
+class PygameInput:
+    """The keyboard, through pygame's event queue."""
+
+    def poll(self, state, cat, fish, dogs):
+        return pygame.event.get(), pygame.key.get_pressed()
+
+
+class KeySet(frozenset):
+    """Pressed keys, indexable like pygame.key.get_pressed()."""
+
+    __getitem__ = frozenset.__contains__
+
+
+class BotInput:
+    """
+    Plays by itself: walks to the nearest fresh fish (around obstacles, on
+    the cat's flow grid), steers away from dogs inside CHASE_LOSE_RADIUS,
+    throws random RPS hands and presses ENTER at the end.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    def poll(self, state, cat, fish, dogs):
+        if state == "end":
+            return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN)], KeySet()
+        if state == "rps":
+            hand = self.rng.choice((pygame.K_1, pygame.K_2, pygame.K_3))
+            return [pygame.event.Event(pygame.KEYDOWN, key=hand)], KeySet()
+
+        cx, cy = cat.rect.center
+        vx = vy = 0.0
+        nearest = min(fish, key=lambda f: distance_sq(f.rect, cat.rect), default=None)
+        if nearest is not None:
+            way = cat.flow.direction(cx, cy, *nearest.rect.center) if cat.flow else None
+            if way is None:
+                dx, dy = nearest.rect.centerx - cx, nearest.rect.centery - cy
+                d = math.hypot(dx, dy) or 1
+                way = dx / d, dy / d
+            vx, vy = way
+        for rect in dogs.rects():
+            dx, dy = cx - rect.centerx, cy - rect.centery
+            d = math.hypot(dx, dy) or 1
+            if d < CHASE_LOSE_RADIUS:
+                # Push harder the closer the dog is
+                push = 8 * (1 - d / CHASE_LOSE_RADIUS)
+                vx += push * dx / d
+                vy += push * dy / d
+
+        keys = set()
+        if vx < -0.3:
+            keys.add(pygame.K_LEFT)
+        elif vx > 0.3:
+            keys.add(pygame.K_RIGHT)
+        if vy < -0.3:
+            keys.add(pygame.K_UP)
+        elif vy > 0.3:
+            keys.add(pygame.K_DOWN)
+        return [], KeySet(keys)
+
+
 # ----------------------------------
 # MAIN FUNCTION
 # ----------------------------------
 
-def run_dog_minigame(level: int) -> str:
+def run_dog_minigame(level: int, clock=None, controls=None, render=True) -> str:
+    """
+    Play one game and return its result. clock and controls default to
+    RealClock / PygameInput; with render=False nothing is drawn or flipped
+    (the display mode must still be set, for its size and the assets).
+    """
     screen = pygame.display.get_surface()
     if screen is None:
         screen = pygame.display.set_mode((1200, 800))
     WIDTH, HEIGHT = screen.get_size()
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont(None, 24)
+    clock = clock or RealClock(60)
+    controls = controls or PygameInput()
+    font = get_font(None, 24)
 
     # Track when the game starts (for the countdown)
-    game_start_time = pygame.time.get_ticks()
+    game_start_time = clock.now()
 
     # Scaling
-    cat_speed = 4 + (level - 1)
-    base_dog_speed = BASE_DOG_SPEED_BASE + (level - 1) * 0.5
-    max_extra_speed = MAX_EXTRA_SPEED_BASE + (level - 1) * 0.5
+    cat_speed = CAT_SPEED_BASE + (level - 1) * CAT_SPEED_PER_LEVEL
+    base_dog_speed = BASE_DOG_SPEED_BASE + (level - 1) * DOG_SPEED_PER_LEVEL
+    max_extra_speed = MAX_EXTRA_SPEED_BASE + (level - 1) * DOG_SPEED_PER_LEVEL
     fish_steal_time = max(2500, FISH_STEAL_TIME_BASE - (level - 1) * 1500)
 
     # 🔸 Number of fish: start at 5, then +3 per level
     num_fish = 5 + (level - 1) * 3
 
-    pickup_radius = FISH_PICKUP_RADIUS_BASE
-
     # 🔸 Time limit per level:
     # Base 60 s, initial decrease from 60 → 30 s at level 1,
     # then +15 s each level:
@@ -263,44 +880,70 @@ def run_dog_minigame(level: int) -> str:
     time_limit_sec = 30 + (level - 1) * 15
     rot_time_ms = time_limit_sec * 1000
 
-    # Images
-    fish_img = pygame.transform.smoothscale(
-        pygame.image.load("fish.png").convert_alpha(), (FISH_SIZE, FISH_SIZE)
-    )
-    fish_target_img = pygame.transform.smoothscale(
-        pygame.image.load("targetted fish.png").convert_alpha(), (FISH_SIZE, FISH_SIZE)
-    )
-    cat_img = pygame.transform.smoothscale(
-        pygame.image.load("cathead.png").convert_alpha(), (CAT_SIZE, CAT_SIZE)
-    )
-    dog_img = pygame.transform.smoothscale(
-        pygame.image.load("threat minigame symbol.png").convert_alpha(), (DOG_SIZE, DOG_SIZE)
-    )
-    thief_img = pygame.transform.smoothscale(
-        pygame.image.load("thief cat.png").convert_alpha(), (THIEF_WIDTH, THIEF_HEIGHT)
-    )
-    scratch_img = pygame.transform.smoothscale(
-        pygame.image.load("scratch.png").convert_alpha(), (int(CAT_SIZE * 1.5), int(CAT_SIZE * 1.5))
-    )
-    dogminigamebackground = pygame.transform.smoothscale(
-        pygame.image.load("dirtyfloor.png").convert(),
-        (WIDTH, HEIGHT)
-    )
-    collect_sound = pygame.mixer.Sound("collect.wav")
+    # Images (cached; usually preloaded by the lobby)
+    assets = preload_dog_assets((WIDTH, HEIGHT))
+    fish_img = assets.fish
+    fish_target_img = assets.fish_target
+    cat_img = assets.cat
+    dog_img = assets.dog
+    thief_img = assets.thief
+    scratch_img = assets.scratch
+    dogminigamebackground = assets.background
+    collect_sound = assets.collect_sound
+    cat_mask = assets.cat_mask
+    dog_mask = assets.dog_mask
+    thief_mask = assets.thief_mask
+    fish_mask = assets.fish_mask
+
+    # Obstacles, drawn once onto this game's copy of the background
+    arena = make_arena(level, WIDTH, HEIGHT)
+    dogminigamebackground = dogminigamebackground.copy()
+    for kind, rect in arena.obstacles:
+        dogminigamebackground.blit(assets.obstacles[kind], rect)
 
     # Objects
-    cat = Cat(100, 100, cat_speed)
-    dog = Dog(WIDTH - 300, HEIGHT // 2, base_dog_speed, max_extra_speed)
-    thief = ThiefCat(WIDTH, HEIGHT)
+    cat = Cat(100, 100, cat_speed, arena)
+    num_dogs, num_thieves = pack_sizes(level)
+    dogs, gang = make_packs(num_dogs, num_thieves, WIDTH, HEIGHT, base_dog_speed, max_extra_speed,
+                            game_start_time, arena)
+    thieves = gang.thieves
+    fighting = None  # the thief in the current RPS fight
 
     # Safe fish spawn area
     margin_left, margin_top, margin_right, margin_bottom = 30, 30, 30, 70
 
+    # Clear of obstacles by a thief's body, so both cats can reach every fish
     fishes = []
     for _ in range(num_fish):
-        x = random.randint(margin_left, WIDTH - margin_right - FISH_SIZE)
-        y = random.randint(margin_top, HEIGHT - margin_bottom - FISH_SIZE)
-        fishes.append(Fish(x, y, rot_time_ms))
+        x, y = arena.random_spot((margin_left, WIDTH - margin_right - FISH_SIZE),
+                                 (margin_top, HEIGHT - margin_bottom - FISH_SIZE),
+                                 (FISH_SIZE, FISH_SIZE), THIEF_BODY_RADIUS)
+        fishes.append(Fish(x, y, rot_time_ms, game_start_time))
+
+    # Fresh fish only: collected / stolen fish leave both for good
+    active_fish = set(fishes)
+    fish_grid = SpatialHash(GRID_CELL)
+    for f in fishes:
+        fish_grid.insert(f, *f.rect.center)
+    collected = 0
+
+    # Thieves go in a spatial hash; the dogs are tested all at once by the pack
+    threats = SpatialHash(GRID_CELL)
+    for thief in thieves:
+        threats.insert(thief, *thief.rect.center)
+
+    def fish_deadlines():
+        """(first rot time, first time the thief may pick a fish) over the fresh fish."""
+        if not active_fish:
+            return float("inf"), float("inf")
+        return (min(f.spawn_time + f.rot_time for f in active_fish),
+                min(f.spawn_time for f in active_fish) + fish_steal_time)
+
+    def take_fish(f):
+        active_fish.discard(f)
+        fish_grid.remove(f)
+
+    next_rot_at, next_steal_at = fish_deadlines()
 
     # State
     state = "play"
@@ -313,10 +956,12 @@ def run_dog_minigame(level: int) -> str:
     choices = {1: "rock", 2: "paper", 3: "scissors"}
     running = True
     while running:
-        dt = clock.tick(60)
+        dt = min(clock.tick() / 1000, MAX_DT)
+        now = clock.now()
 
         # Events
-        for event in pygame.event.get():
+        events, keys = controls.poll(state, cat, active_fish, dogs)
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 raise SystemExit
@@ -334,88 +979,114 @@ def run_dog_minigame(level: int) -> str:
                     if outcome == "tie":
                         rps_msg = "Tie! Try again."
                     elif outcome == "win":
-                        thief.defeat()
+                        fighting.defeat(now)
+                        fighting = None
                         state = "play"
                     else:
                         reason = "You lost the fight!"
                         result = "lose"
                         state = "end"
 
-        keys = pygame.key.get_pressed()
-
         # GAMEPLAY
         if state == "play":
-            cat.update(keys, WIDTH, HEIGHT)
-            dog.update(cat.rect, WIDTH, HEIGHT)
-            thief.update(WIDTH, HEIGHT)
-
-            now = pygame.time.get_ticks()
+            cat.update(keys, WIDTH, HEIGHT, dt)
+            dogs.update(cat.rect, WIDTH, HEIGHT, now, dt)
+            gang.update(WIDTH, HEIGHT, now, dt)
+            for thief in thieves:
+                if thief.active:
+                    threats.move(thief, *thief.rect.center)
+                else:
+                    threats.remove(thief)
 
-            # Update fish
-            for f in fishes:
-                f.update()
+            # Update fish (only once the first one is due to rot)
+            rotted = False
+            if now >= next_rot_at:
+                for f in active_fish:
+                    f.update(now)
+                    rotted = rotted or f.state == "rotten"
 
             # If any fish has rotted, end the game
-            if any(f.state == "rotten" for f in fishes):
+            if rotted:
                 reason = "The food has rotted!"
                 result = "lose"
                 state = "end"
             else:
-                # Thief selects fish
-                if thief.active and thief.target_fish is None and now >= thief.next_target_time:
-                    candidates = [
-                        f for f in fishes
-                        if f.state == "fresh" and not f.is_target and now - f.spawn_time > fish_steal_time
-                    ]
-                    if candidates:
-                        # Thief chooses *farthest* fish (easier for player)
-                        target = max(candidates, key=lambda f: distance(thief.rect, f.rect))
-                        thief.set_target(target)
-
-                # Thief steals fish
-                if thief.active and thief.target_fish and thief.target_fish.state == "fresh":
-                    if distance(thief.rect, thief.target_fish.rect) < 12:
-                        thief.target_fish.state = "stolen"
-                        thief.clear_target()
-                        reason = "The thief stole your fish!"
-                        result = "lose_thief"
-                        state = "end"
+                for thief in thieves:
+                    # Thief selects fish
+                    if (thief.active and thief.target_fish is None
+                            and now >= thief.next_target_time and now > next_steal_at):
+                        tx, ty = thief.rect.center
+                        target = None
+                        target_d2 = -1
+                        for f in active_fish:
+                            if not f.is_target and now - f.spawn_time > fish_steal_time:
+                                fx, fy = f.rect.center
+                                d2 = (fx - tx) ** 2 + (fy - ty) ** 2
+                                # Thief chooses *farthest* fish (easier for player)
+                                if d2 > target_d2:
+                                    target, target_d2 = f, d2
+                        if target is not None:
+                            thief.set_target(target)
+
+                    # Thief steals fish
+                    if thief.active and thief.target_fish and thief.target_fish.state == "fresh":
+                        if distance_sq(thief.rect, thief.target_fish.rect) < THIEF_STEAL_RADIUS ** 2:
+                            take_fish(thief.target_fish)
+                            thief.target_fish.state = "stolen"
+                            thief.clear_target(now)
+                            reason = "The thief stole your fish!"
+                            result = "lose_thief"
+                            state = "end"
 
                 # Cat collects fish
-                for f in fishes:
-                    if f.state == "fresh" and distance(cat.rect, f.rect) < pickup_radius:
+                cx, cy = cat.rect.center
+                for f in fish_grid.query(cx, cy, FISH_TOUCH_RADIUS):
+                    if sprites_touch(cat.rect, cat_mask, f.rect, fish_mask):
+                        take_fish(f)
+                        collected += 1
                         f.state = "collected"
                         f.is_target = False
-                        collect_sound.play()  
-                        if f is thief.target_fish:
-                            thief.clear_target()
+                        collect_sound.play()
+                        for thief in thieves:
+                            if f is thief.target_fish:
+                                thief.clear_target(now)
+                        next_rot_at, next_steal_at = fish_deadlines()
 
                 # Dog catches cat
-                if distance(cat.rect, dog.rect) < DOG_DANGER_RADIUS:
+                if dogs.catches(cat.rect, cat_mask, dog_mask):
                     cat_damaged = True
                     reason = "The dog has caught you"
                     result = "lose"
                     state = "end"
 
                 # Cat touches thief → RPS fight
-                if thief.active and cat.rect.colliderect(thief.rect):
-                    state = "rps"
-                    rps_info = "1=Rock 2=Paper 3=Scissors"
-                    rps_msg = ""
+                for thief in threats.query(cx, cy, THIEF_TOUCH_RADIUS):
+                    if thief.active and sprites_touch(cat.rect, cat_mask, thief.rect, thief_mask):
+                        fighting = thief
+                        state = "rps"
+                        rps_info = "1=Rock 2=Paper 3=Scissors"
+                        rps_msg = ""
+                        break
 
                 # Win condition
-                if all(f.state == "collected" for f in fishes):
+                if not active_fish and collected == len(fishes):
                     reason = "You collected all the food!"
                     result = "win"
                     state = "end"
 
+        if state == "end":
+            waiting = True
+
+        if not render:
+            continue
+
         # ---------------------
         # DRAW
         # ---------------------
         screen.blit(dogminigamebackground, (0, 0))
 
         # Draw fish
-        for f in fishes:
+        for f in active_fish:
             if f.state == "fresh":
                 if f.is_target:
                     screen.blit(fish_target_img, f.rect)
@@ -427,13 +1098,14 @@ def run_dog_minigame(level: int) -> str:
         if cat_damaged:
             screen.blit(scratch_img, scratch_img.get_rect(center=cat.rect.center))
 
-        # Draw dog & thief
-        screen.blit(dog_img, dog.rect)
-        if thief.active:
-            screen.blit(thief_img, thief.rect)
+        # Draw dogs & thieves
+        for rect in dogs.rects():
+            screen.blit(dog_img, rect)
+        for thief in thieves:
+            if thief.active:
+                screen.blit(thief_img, thief.rect)
 
         # UI – level & food
-        collected = sum(f.state == "collected" for f in fishes)
         ui = font.render(
             f"Dog Minigame | Level {level} | Food: {collected}/{len(fishes)}",
             True, (255, 255, 255)
@@ -441,7 +1113,7 @@ def run_dog_minigame(level: int) -> str:
         screen.blit(ui, (10, 10))
 
         # Rot countdown display (per level time limit)
-        elapsed_total = pygame.time.get_ticks() - game_start_time
+        elapsed_total = now - game_start_time
         remaining_ms = max(0, rot_time_ms - elapsed_total)
         remaining_sec = remaining_ms // 1000
         mins = remaining_sec // 60
@@ -478,8 +1150,68 @@ def run_dog_minigame(level: int) -> str:
 
             prompt = font.render("Press ENTER to return to the lobby", True, (255, 255, 255))
             screen.blit(prompt, prompt.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50)))
-            waiting = True
 
         pygame.display.flip()
 
     return result if result else "lose"
+
+
+# ----------------------------------
+# BENCHMARK
+# ----------------------------------
+
+def benchmark_packs(agents=200, frames=600, width=1200, height=800):
+    """Time one frame of pack updates and the catch test, half dogs and half thieves, with obstacles."""
+    if np is None:
+        print("numpy is not installed, packs use the Dog / ThiefCat lists")
+    dogs, gang = make_packs(agents // 2, agents - agents // 2, width, height,
+                            BASE_DOG_SPEED_BASE, MAX_EXTRA_SPEED_BASE, 0, make_arena(2, width, height))
+    cat = pygame.Rect(100, 100, CAT_SIZE, CAT_SIZE)
+    # Solid masks: every rect overlap goes on to a mask test (the worst case)
+    cat_mask = pygame.mask.Mask((CAT_SIZE, CAT_SIZE), fill=True)
+    dog_mask = pygame.mask.Mask((DOG_SIZE, DOG_SIZE), fill=True)
+    t = time.perf_counter()
+    for frame in range(frames):
+        now = frame * 16
+        cat.x = (cat.x + 7) % width
+        dogs.update(cat, width, height, now, 1 / 60)
+        gang.update(width, height, now, 1 / 60)
+        dogs.catches(cat, cat_mask, dog_mask)
+    per_frame = (time.perf_counter() - t) / frames
+    print(f"{agents} agents: {per_frame * 1000:.3f} ms per frame")
+
+
+def simulate_dog_games(level, games=200, step_ms=1000 / 60):
+    """
+    Play games headless with BotInput on a SimClock and print how they end,
+    for tuning TIME_TO_MAX, CHASE_RADIUS and the rot times per level. Runs
+    at roughly 30-60x real time (slower on the levels with obstacles, where
+    flow fields are built as targets move).
+    """
+    results = {}
+    game_ms = 0
+    t = time.perf_counter()
+    for game in range(games):
+        random.seed(game)
+        clock = SimClock(step_ms)
+        result = run_dog_minigame(level, clock=clock, controls=BotInput(random.Random(game)), render=False)
+        results[result] = results.get(result, 0) + 1
+        game_ms += clock.now()
+    wall = time.perf_counter() - t
+    summary = ", ".join(f"{r} {n / games:.0%}" for r, n in sorted(results.items()))
+    print(f"level {level}, {games} games: {summary}; mean game {game_ms / games / 1000:.1f} s, "
+          f"simulated {game_ms / 1000 / wall:.0f}x real time")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark_packs()
+    if "--sim" in sys.argv:
+        import os
+
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+        pygame.display.set_mode((1200, 800))
+        for level in (1, 4, 7, 10):
+            simulate_dog_games(level)
@@ -0,0 +1,184 @@
+# flow_grid.py
+#
+# Flow fields over an open arena with rectangular obstacles, for chasers
+# that steer around them.
+#
+# The arena is cut into square cells; a cell is blocked when its centre is
+# inside a wall rect, or outside bounds (where the chaser's centre can be,
+# if it is kept on screen). Walls are the obstacles already grown by the
+# chaser's body radius, so a chaser is only ever tracked by its centre
+# point.
+#
+# For a target cell, one breadth-first search gives every free cell the
+# direction of its next step toward the target (8 directions, no cutting
+# past a blocked corner). The search starts from the target and, in every
+# part of the arena walled off from it, from that part's cell closest to
+# the target, so a chaser that can't reach the target still gets as close
+# as it can. Fields are cached by target cell: a field is only built when
+# the target moves into a cell not seen before, and a lookup is an index.
+#
+#   grid = FlowGrid(width, height, cell, walls, bounds=None)
+#   grid.cell_of(x, y)                   cell index (clamped to the arena)
+#   grid.field(target_cell)              bytearray: direction code per cell
+#   grid.direction(x, y, tx, ty)         unit (dx, dy) toward the centre of the next
+#                                        cell on the way to (tx, ty), or None in
+#                                        the closest cell or with no free cells
+#
+# Heading for the next cell's centre (rather than along the step) keeps a
+# chaser on the cells the field was built on, so it also gets through gaps
+# narrower than a cell. A chaser's centre can still be in a blocked cell
+# (the part of it outside the wall); it is then steered as if in snap[cell],
+# a free cell next to it. STEPS[code] is the cell step for a direction code;
+# NO_STEP marks blocked cells and where a search started.
+
+import math
+import sys
+import time
+from array import array
+from collections import deque
+
+# Orthogonal steps first, so they win ties; code ^ 1 is the opposite step
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1))
+NO_STEP = 255
+
+
+class FlowGrid:
+    def __init__(self, width, height, cell, walls, bounds=None):
+        self.cell = cell
+        self.cols = max(1, math.ceil(width / cell))
+        self.rows = max(1, math.ceil(height / cell))
+        self.walls = list(walls)
+        self.blocked = bytearray(self.cols * self.rows)
+        for i in range(len(self.blocked)):
+            y, x = divmod(i, self.cols)
+            cx, cy = (x + 0.5) * cell, (y + 0.5) * cell
+            if self.is_wall(cx, cy) or (bounds and not bounds.collidepoint(cx, cy)):
+                self.blocked[i] = 1
+        # Blocked cells -> a free neighbour (orthogonal first), free cells -> themselves
+        self.snap = array("i", range(len(self.blocked)))
+        for i in range(len(self.blocked)):
+            if self.blocked[i]:
+                y, x = divmod(i, self.cols)
+                for dx, dy in STEPS:
+                    nx, ny = x + dx, y + dy
+                    n = ny * self.cols + nx
+                    if 0 <= nx < self.cols and 0 <= ny < self.rows and not self.blocked[n]:
+                        self.snap[i] = n
+                        break
+        self.fields = {}  # target cell -> bytearray
+        self.regions = None  # lists of free cells, found on the first build
+        self.builds = 0
+
+    def is_wall(self, x, y):
+        for r in self.walls:
+            if r.left < x < r.right and r.top < y < r.bottom:
+                return True
+        return False
+
+    def cell_of(self, x, y):
+        cx = min(self.cols - 1, max(0, int(x // self.cell)))
+        cy = min(self.rows - 1, max(0, int(y // self.cell)))
+        return cy * self.cols + cx
+
+    def _search(self, sources, flow=None):
+        """Breadth-first search over free cells from sources; returns (cells reached in order, flow)."""
+        cols, rows = self.cols, self.rows
+        blocked = self.blocked
+        seen = bytearray(blocked)
+        for i in sources:
+            seen[i] = 1
+        queue = deque(sources)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            y, x = divmod(i, cols)
+            for k, (dx, dy) in enumerate(STEPS):
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < cols and 0 <= ny < rows):
+                    continue
+                n = ny * cols + nx
+                if seen[n]:
+                    continue
+                # Diagonals only when both orthogonal cells are open
+                if dx and dy and (blocked[y * cols + nx] or blocked[ny * cols + x]):
+                    continue
+                seen[n] = 1
+                if flow is not None:
+                    # From n, the step toward the source is back to i
+                    flow[n] = k ^ 1
+                queue.append(n)
+        return order, flow
+
+    def _find_regions(self):
+        """Free cells split into the parts of the arena walls separate, each a list of cells."""
+        regions = []
+        done = bytearray(self.blocked)
+        for i in range(len(done)):
+            if not done[i]:
+                region, _ = self._search([i])
+                for j in region:
+                    done[j] = 1
+                regions.append(region)
+        return regions
+
+    def _build(self, target):
+        if self.regions is None:
+            self.regions = self._find_regions()
+        ty, tx = divmod(target, self.cols)
+
+        def dist2(i):
+            y, x = divmod(i, self.cols)
+            return (x - tx) ** 2 + (y - ty) ** 2
+
+        sources = [min(region, key=dist2) for region in self.regions]
+        _, flow = self._search(sources, bytearray([NO_STEP]) * len(self.blocked))
+        self.builds += 1
+        return flow
+
+    def field(self, target_cell):
+        flow = self.fields.get(target_cell)
+        if flow is None:
+            flow = self.fields[target_cell] = self._build(target_cell)
+        return flow
+
+    def direction(self, x, y, tx, ty):
+        i = self.snap[self.cell_of(x, y)]
+        k = self.field(self.cell_of(tx, ty))[i]
+        if k == NO_STEP:
+            return None
+        cy, cx = divmod(i, self.cols)
+        dx = (cx + STEPS[k][0] + 0.5) * self.cell - x
+        dy = (cy + STEPS[k][1] + 0.5) * self.cell - y
+        d = math.hypot(dx, dy)
+        return dx / d, dy / d
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(width=1200, height=800, cell=25, lookups=10000):
+    import random
+
+    import pygame
+
+    rng = random.Random(1)
+    walls = [pygame.Rect(rng.randint(0, width - 200), rng.randint(0, height - 200), 200, 160)
+             for _ in range(6)]
+    grid = FlowGrid(width, height, cell, walls)
+    t = time.perf_counter()
+    for y in range(grid.rows):
+        grid.field(y * grid.cols + grid.cols // 2)
+    t_build = (time.perf_counter() - t) / grid.rows
+    points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(lookups)]
+    t = time.perf_counter()
+    for x, y in points:
+        grid.direction(x, y, width / 2, height / 2)
+    t_lookup = (time.perf_counter() - t) / lookups
+    print(f"{grid.cols}x{grid.rows} cells: field {t_build * 1000:.2f} ms, "
+          f"lookup {t_lookup * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
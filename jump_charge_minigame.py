@@ -10,14 +10,34 @@
 # - If you miss a platform: cat falls down fully, then game ends ("lose").
 # - Win: land on the final platform, show win message, return "win".
 #
+# Endless mode (run_jump_minigame(endless=True), or --endless):
+# - Platforms are generated just ahead of the camera and recycled (rect and
+#   cached surface) once they are left behind, so only a screenful or so
+#   ever exists however far you get.
+# - The minimap shows a window sliding along with the camera.
+# - Falling ends the run; returns the distance reached in metres.
+#
 # Controls:
 #   Hold SPACE / Left Mouse = aim (45° line oscillates)
 #   Release = jump
 #   ESC = quit (lose)
+#
+# Drawing allocates nothing per frame once a level is running: platforms
+# and the minimap are pre-rendered, text goes through text_cache, and the
+# end overlay is kept. In endless mode new surfaces are only made until the
+# spare pool covers the most platforms alive at once. `--bench` checks this
+# with a scripted clock that plays through a level and an endless run.
 
-import pygame
-import random
+import bisect
 import math
+import random
+import sys
+import time
+
+import pygame
+
+import text_cache
+from text_cache import get_font, render_text
 
 WIDTH, HEIGHT = 1200, 800
 FPS = 60
@@ -69,12 +89,20 @@ PLAT_W_BIG_MAX = 340
 PLAT_W_MIN_CAP = 90
 PLAT_W_DECAY_PER_TIER = 28
 PLAT_H = 34
+# Stains reach this far past a platform's rect, so its cached surface is padded by it
+PLAT_PAD = 12
 
 # Gap control
 REACH_MARGIN = 55
 GAP_MIN = 120
 GAP_MAX_CAP = 520
 
+# Endless mode: platforms live from ENDLESS_BEHIND px behind the camera to
+# ENDLESS_AHEAD px past its right edge, which is also the minimap's window
+ENDLESS_BEHIND = 400
+ENDLESS_AHEAD = 1800
+PX_PER_METRE = 100
+
 # Minimap
 MINIMAP_H = 70
 MINIMAP_MARGIN = 14
@@ -93,6 +121,17 @@ END_MSG_SECONDS = 1.2
 FALL_GRAVITY = 1800.0  # px/s^2
 FALL_DRAG_X = 0.0      # keep 0 unless you want drift
 
+# Surfaces made by this module (platforms, minimap, overlay), platform
+# redraws and minimap refreshes, for the benchmark
+stats = {"surfaces": 0, "platform_renders": 0, "minimap_refreshes": 0}
+
+_end_overlay = None  # kept between end messages
+
+
+def new_surface(size):
+    stats["surfaces"] += 1
+    return pygame.Surface(size, pygame.SRCALPHA)
+
 
 def clamp(v, lo, hi):
     return lo if v < lo else hi if v > hi else v
@@ -130,15 +169,101 @@ def length_to_jump_duration(line_length):
     return lerp(JUMP_DUR_MIN, JUMP_DUR_MAX, t)
 
 
-def landing_platform_index(platforms, px_world):
+class PlatformRow:
     """
-    EDGES ARE SAFE:
-    Any x in [left, right] counts as landed.
+    The platforms of a run with their cached surfaces, in increasing x (as
+    generated, never overlapping). Left and right edges are kept in sorted
+    lists, so every lookup is a bisection.
+
+    Indices count platforms since the start of the run, so they stay valid
+    when endless mode drops platforms off the front (row.first moves on).
+    Indexing a dropped platform raises IndexError.
+
+      row.add(rect, surface)
+      row.drop_first()            -> (rect, surface) of the first platform
+      row[i], row.surface(i)
+      row.left, row.right         world bounds of the platforms alive
+      row.landing_at(x)           platform under x, or None
+      row.visible_between(x0, x1) range of the platforms overlapping x0..x1
+      row.nearest_ahead(x)        first platform starting right of x, or None
     """
-    for i, r in enumerate(platforms):
-        if r.left <= px_world <= r.right:
-            return i
-    return None
+
+    def __init__(self):
+        self.rects = []
+        self.surfaces = []
+        self.lefts = []
+        self.rights = []
+        self.start = 0   # list position of the first platform alive
+        self.offset = 0  # platforms already cut off the front of the lists
+
+    def __len__(self):
+        return len(self.rects) - self.start
+
+    def _pos(self, i):
+        if i < self.first:
+            raise IndexError(f"platform {i} was dropped, the first alive is {self.first}")
+        return i - self.offset
+
+    def __getitem__(self, i):
+        return self.rects[self._pos(i)]
+
+    def surface(self, i):
+        return self.surfaces[self._pos(i)]
+
+    @property
+    def first(self):
+        return self.offset + self.start
+
+    @property
+    def end(self):
+        """Index the next platform added gets."""
+        return self.offset + len(self.rects)
+
+    @property
+    def last(self):
+        return self.rects[-1]
+
+    @property
+    def left(self):
+        return self.lefts[self.start]
+
+    @property
+    def right(self):
+        return self.rights[-1]
+
+    def add(self, rect, surface):
+        self.rects.append(rect)
+        self.surfaces.append(surface)
+        self.lefts.append(rect.left)
+        self.rights.append(rect.right)
+
+    def drop_first(self):
+        dropped = self.rects[self.start], self.surfaces[self.start]
+        self.start += 1
+        # Cut the dead front off once it's most of the lists: O(1) per drop on average
+        if self.start * 2 > len(self.rects):
+            for lst in (self.rects, self.surfaces, self.lefts, self.rights):
+                del lst[:self.start]
+            self.offset += self.start
+            self.start = 0
+        return dropped
+
+    def landing_at(self, x):
+        """EDGES ARE SAFE: any x in [left, right] counts as landed."""
+        i = bisect.bisect_right(self.lefts, x, self.start) - 1
+        if i >= self.start and x <= self.rights[i]:
+            return i + self.offset
+        return None
+
+    def visible_between(self, x0, x1):
+        # Platforms don't overlap, so rights are sorted too
+        lo = bisect.bisect_left(self.rights, x0, self.start)
+        hi = bisect.bisect_right(self.lefts, x1, self.start)
+        return range(lo + self.offset, max(lo, hi) + self.offset)
+
+    def nearest_ahead(self, x):
+        i = bisect.bisect_right(self.lefts, x, self.start)
+        return i + self.offset if i < len(self.lefts) else None
 
 
 def platform_count_for_level(level):
@@ -155,7 +280,8 @@ def width_range_for_index(i):
     return int(w_min), int(w_max)
 
 
-def generate_next_platform(rng, prev_rect, i):
+def generate_next_platform(rng, prev_rect, i, rect=None):
+    """Platform i, after prev_rect. Reuses rect if given."""
     d_min = length_to_jump_distance(PREVIEW_MIN)
     d_max = length_to_jump_distance(PREVIEW_MAX)
 
@@ -184,7 +310,10 @@ def generate_next_platform(rng, prev_rect, i):
     if left > max_left:
         left = max_left
 
-    return pygame.Rect(left, GROUND_Y, w, PLAT_H)
+    if rect is None:
+        return pygame.Rect(left, GROUND_Y, w, PLAT_H)
+    rect.update(left, GROUND_Y, w, PLAT_H)
+    return rect
 
 
 def draw_trashy_platform(screen, rr, seed_key):
@@ -242,54 +371,91 @@ def draw_trashy_platform(screen, rr, seed_key):
             pygame.draw.polygon(screen, ROAD_LIGHT, tri)
 
 
-def draw_platforms_main_view(screen, platforms, camera_x, goal_i):
-    for i, r in enumerate(platforms):
-        rr = pygame.Rect(r.x - camera_x, r.y, r.w, r.h)
-        draw_trashy_platform(screen, rr, seed_key=(r.x * 92821 + r.w * 193 + i * 991))
+def render_platform(r, i, surf=None):
+    """
+    Platform i's decorated surface, drawn once. Blit it at (r.x - PLAT_PAD, r.y - PLAT_PAD).
+    Redraws into surf if given (it must be big enough).
+    """
+    stats["platform_renders"] += 1
+    if surf is None:
+        surf = new_surface((r.w + PLAT_PAD * 2, r.h + PLAT_PAD * 2))
+    else:
+        surf.fill((0, 0, 0, 0))
+    # Same seed as always, so a platform looks the same wherever it's drawn
+    draw_trashy_platform(surf, pygame.Rect(PLAT_PAD, PLAT_PAD, r.w, r.h),
+                         seed_key=(r.x * 92821 + r.w * 193 + i * 991))
+    return surf
+
+
+def draw_platforms_main_view(screen, row, camera_x, goal_i):
+    for i in row.visible_between(camera_x - PLAT_PAD, camera_x + WIDTH + PLAT_PAD):
+        r = row[i]
+        x = int(r.x - camera_x)
+        screen.blit(row.surface(i), (x - PLAT_PAD, r.y - PLAT_PAD))
 
         if i == goal_i:
-            gx, gy = rr.centerx, rr.y - 16
+            gx, gy = x + r.w // 2, r.y - 16
             pygame.draw.circle(screen, MINIMAP_GOAL, (gx, gy), 9)
-            pygame.draw.line(screen, MINIMAP_GOAL, (gx, gy + 9), (gx, rr.y + 3), 4)
-
+            pygame.draw.line(screen, MINIMAP_GOAL, (gx, gy + 9), (gx, r.y + 3), 4)
 
-def draw_minimap(screen, platforms, px_world, goal_i):
-    world_left = platforms[0].left
-    world_right = max(r.right for r in platforms)
-    world_w = max(1, world_right - world_left)
 
-    mm_x = MINIMAP_MARGIN
-    mm_y = MINIMAP_MARGIN
-    mm_w = WIDTH - MINIMAP_MARGIN * 2
-    mm_h = MINIMAP_H
+class Minimap:
+    """
+    The minimap panel and platform bars, pre-rendered. refresh() redraws the
+    bars when the platforms change; draw() only blits them and adds the player.
 
-    panel = pygame.Surface((mm_w, mm_h), pygame.SRCALPHA)
-    panel.fill(MINIMAP_BG)
-    screen.blit(panel, (mm_x, mm_y))
-    pygame.draw.rect(screen, (255, 255, 255), (mm_x, mm_y, mm_w, mm_h), 1, border_radius=10)
+    The scale is fixed by window_w, the world width the panel shows. The bars
+    can be wider than the panel (strip_w), so a window sliding along them
+    (endless mode) is just a different blit area.
+    """
 
-    def wx_to_mx(wx):
-        t = (wx - world_left) / world_w
-        return mm_x + int(t * mm_w)
+    def __init__(self, window_w, strip_w=None):
+        self.rect = pygame.Rect(MINIMAP_MARGIN, MINIMAP_MARGIN, WIDTH - MINIMAP_MARGIN * 2, MINIMAP_H)
+        self.scale = self.rect.w / max(1, window_w)  # minimap px per world px
+
+        self.panel = new_surface(self.rect.size)
+        self.panel.fill(MINIMAP_BG)
+        pygame.draw.rect(self.panel, (255, 255, 255), self.panel.get_rect(), 1, border_radius=10)
+
+        self.bars = new_surface((strip_w or self.rect.w, self.rect.h))
+        self.bars_left = 0.0  # world x of the bars' left edge
+
+    def refresh(self, row, goal_i, world_left):
+        stats["minimap_refreshes"] += 1
+        self.bars.fill((0, 0, 0, 0))
+        self.bars_left = world_left
+        for i in range(row.first, row.end):
+            r = row[i]
+            x1 = int((r.left - world_left) * self.scale)
+            x2 = int((r.right - world_left) * self.scale)
+            col = MINIMAP_GOAL if i == goal_i else MINIMAP_PLATFORM
+            pygame.draw.rect(self.bars, col, (x1, 22, max(3, x2 - x1), 22), border_radius=6)
+
+    def draw(self, screen, px_world, world_left):
+        """Show the window from world_left (not left of the bars' left edge)."""
+        mm_x, mm_y = self.rect.topleft
+        screen.blit(self.panel, self.rect)
+        area_x = int((world_left - self.bars_left) * self.scale)
+        screen.blit(self.bars, self.rect, (area_x, 0, self.rect.w, self.rect.h))
+
+        p_mx = mm_x + int((px_world - world_left) * self.scale)
+        base_y = mm_y + 54
+        pygame.draw.polygon(
+            screen,
+            MINIMAP_PLAYER,
+            [(p_mx, base_y - 12), (p_mx - 8, base_y), (p_mx + 8, base_y)],
+        )
 
-    for i, r in enumerate(platforms):
-        x1 = wx_to_mx(r.left)
-        x2 = wx_to_mx(r.right)
-        y = mm_y + 22
-        h = 22
-        col = MINIMAP_GOAL if i == goal_i else MINIMAP_PLATFORM
-        pygame.draw.rect(screen, col, (x1, y, max(3, x2 - x1), h), border_radius=6)
 
-    p_mx = wx_to_mx(px_world)
-    base_y = mm_y + 54
-    pygame.draw.polygon(
-        screen,
-        MINIMAP_PLAYER,
-        [(p_mx, base_y - 12), (p_mx - 8, base_y), (p_mx + 8, base_y)],
-    )
+def show_end_message(screen, clock, big_font, msg, color):
+    global _end_overlay
+    if _end_overlay is None:
+        _end_overlay = new_surface((WIDTH, HEIGHT))
+        _end_overlay.fill((0, 0, 0, 170))
 
+    text_surf = render_text(big_font, msg, color)
+    rect = text_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2))
 
-def show_end_message(screen, clock, big_font, msg, color):
     end_start = pygame.time.get_ticks()
     while True:
         clock.tick(FPS)
@@ -299,12 +465,7 @@ def show_end_message(screen, clock, big_font, msg, color):
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 return
 
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 170))
-        screen.blit(overlay, (0, 0))
-
-        text_surf = big_font.render(msg, True, color)
-        rect = text_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+        screen.blit(_end_overlay, (0, 0))
         screen.blit(text_surf, rect)
 
         pygame.display.flip()
@@ -313,29 +474,55 @@ def show_end_message(screen, clock, big_font, msg, color):
             return
 
 
-def run_jump_minigame(level=1):
+def start_platform():
+    return pygame.Rect(120, GROUND_Y, 320, PLAT_H)
+
+
+def run_jump_minigame(level=1, endless=False, clock=None, seed=None):
+    """
+    Returns "win" / "lose", or in endless mode the distance reached in metres.
+    clock: anything with pygame.time.Clock's tick(fps) -> ms (the benchmark's is scripted).
+    seed: fixes the platforms, so the benchmark's bot can know them too.
+    """
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption(f"Jumpers (Level {level})")
-    clock = pygame.time.Clock()
+    pygame.display.set_caption("Jumpers (Endless)" if endless else f"Jumpers (Level {level})")
+    clock = clock or pygame.time.Clock()
 
     cat_img = pygame.image.load("cathead.png").convert_alpha()
     cat_img = pygame.transform.smoothscale(cat_img, (CAT_SIZE, CAT_SIZE))
 
-    font = pygame.font.SysFont(None, 28)
-    big = pygame.font.SysFont(None, 48)
-
-    rng = random.Random()
-
-    total_platforms = platform_count_for_level(level)
-    goal_i = total_platforms - 1
-
-    platforms = []
-    start_rect = pygame.Rect(120, GROUND_Y, 320, PLAT_H)
-    platforms.append(start_rect)
-
-    while len(platforms) < total_platforms:
-        platforms.append(generate_next_platform(rng, platforms[-1], len(platforms)))
+    font = get_font(None, 28)
+    big = get_font(None, 48)
+
+    rng = random.Random(seed)
+
+    start_rect = start_platform()
+    row = PlatformRow()
+
+    if endless:
+        total_platforms = goal_i = None
+        # Every surface fits the widest platform, so any one can be reused for any platform
+        surf_size = (max(PLAT_W_BIG_MAX, start_rect.w) + PLAT_PAD * 2, PLAT_H + PLAT_PAD * 2)
+        row.add(start_rect, render_platform(start_rect, 0, new_surface(surf_size)))
+    else:
+        total_platforms = platform_count_for_level(level)
+        goal_i = total_platforms - 1
+        row.add(start_rect, render_platform(start_rect, 0))
+        while len(row) < total_platforms:
+            i = row.end
+            r = generate_next_platform(rng, row.last, i)
+            row.add(r, render_platform(r, i))
+
+    spare = []   # (rect, surface) pairs left behind, for reuse
+
+    if endless:
+        # Bars for everything alive, which spans less than two windows
+        window_w = WIDTH + ENDLESS_BEHIND + ENDLESS_AHEAD
+        minimap = Minimap(window_w, strip_w=(WIDTH - MINIMAP_MARGIN * 2) * 2)
+    else:
+        minimap = Minimap(row.right - row.left)
+        minimap.refresh(row, goal_i, row.left)
 
     px = start_rect.right - 60
     py = start_rect.y - CAT_SIZE
@@ -354,12 +541,24 @@ def run_jump_minigame(level=1):
     fall_vx = 0.0
 
     landed_index = 0
+    best_x = start_x = px
+    distance = 0
 
     t_osc = 0.0
     line_len = PREVIEW_MIN
 
     msg = "Hold SPACE to aim. Release to jump."
-    tip = f"Level {int(level)}: {total_platforms} platforms. Falling ends the run."
+    if endless:
+        tip = "Endless: see how far you get. Falling ends the run."
+    else:
+        tip = f"Level {int(level)}: {total_platforms} platforms. Falling ends the run."
+
+    def end_run():
+        if endless:
+            show_end_message(screen, clock, big, f"You've fallen. {distance} m", (255, 140, 140))
+            return distance
+        show_end_message(screen, clock, big, "You've fallen.", (255, 140, 140))
+        return "lose"
 
     while True:
         dt = clock.tick(FPS) / 1000.0
@@ -370,13 +569,11 @@ def run_jump_minigame(level=1):
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                show_end_message(screen, clock, big, "You've fallen.", (255, 140, 140))
-                return "lose"
+                return end_run()
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    show_end_message(screen, clock, big, "You've fallen.", (255, 140, 140))
-                    return "lose"
+                    return end_run()
                 if event.key == pygame.K_SPACE and state == "idle":
                     state = "aiming"
 
@@ -424,20 +621,22 @@ def run_jump_minigame(level=1):
             py = (GROUND_Y - CAT_SIZE) - arc_h * arc
 
             if t >= 1.0:
-                idx = landing_platform_index(platforms, px)
+                idx = row.landing_at(px)
                 if idx is None:
                     # Start falling (do NOT show message yet)
                     state = "falling"
                     fall_vy = 0.0
                     fall_vx = 0.0
                 else:
-                    r = platforms[idx]
+                    r = row[idx]
                     # edges still safe, but keep player inside visually
                     px = clamp(px, r.left, r.right)
                     py = r.y - CAT_SIZE
                     landed_index = max(landed_index, idx)
+                    best_x = max(best_x, px)
+                    distance = int((best_x - start_x) / PX_PER_METRE)
 
-                    if landed_index >= goal_i:
+                    if goal_i is not None and landed_index >= goal_i:
                         show_end_message(screen, clock, big, "You made it!", (140, 255, 160))
                         return "win"
 
@@ -454,25 +653,46 @@ def run_jump_minigame(level=1):
                 px += fall_vx * dt
 
             if py > HEIGHT + CAT_SIZE + 40:
-                show_end_message(screen, clock, big, "You've fallen.", (255, 140, 140))
-                return "lose"
+                return end_run()
 
         cam_target = max(0.0, px - CAM_TARGET_LEFT_PADDING)
         camera_x = exp_smooth(camera_x, cam_target, dt, CAM_SMOOTH)
 
+        if endless:
+            # Platforms left behind go to spare, and are reused for the ones ahead
+            changed = False
+            while len(row) > 1 and row[row.first].right < camera_x - ENDLESS_BEHIND:
+                changed = True
+                spare.append(row.drop_first())
+            while row.right < camera_x + WIDTH + ENDLESS_AHEAD:
+                i = row.end
+                changed = True
+                rect, surf = spare.pop() if spare else (None, new_surface(surf_size))
+                r = generate_next_platform(rng, row.last, i, rect)
+                row.add(r, render_platform(r, i, surf))
+            mm_left = camera_x - ENDLESS_BEHIND
+            if changed:
+                # The camera only moves right, so later windows stay on the bars
+                minimap.refresh(row, None, min(row.left, mm_left))
+        else:
+            mm_left = row.left
+
         # DRAW
         screen.fill(BG)
 
-        draw_minimap(screen, platforms, px, goal_i)
+        minimap.draw(screen, px, mm_left)
 
-        screen.blit(big.render("Jumpers", True, TEXT), (18, 96))
-        screen.blit(font.render(msg, True, SUBTEXT), (20, 150))
-        screen.blit(font.render(tip, True, (180, 180, 180)), (20, 176))
+        screen.blit(render_text(big, "Jumpers", TEXT), (18, 96))
+        screen.blit(render_text(font, msg, SUBTEXT), (20, 150))
+        screen.blit(render_text(font, tip, (180, 180, 180)), (20, 176))
 
-        prog = f"Platform: {min(landed_index + 1, total_platforms)}/{total_platforms}"
-        screen.blit(font.render(prog, True, (210, 210, 210)), (20, 206))
+        if endless:
+            prog = f"Distance: {distance} m"
+        else:
+            prog = f"Platform: {min(landed_index + 1, total_platforms)}/{total_platforms}"
+        screen.blit(render_text(font, prog, (210, 210, 210)), (20, 206))
 
-        draw_platforms_main_view(screen, platforms, camera_x, goal_i)
+        draw_platforms_main_view(screen, row, camera_x, goal_i)
 
         if state == "aiming":
             length = line_len
@@ -497,5 +717,147 @@ def run_jump_minigame(level=1):
         pygame.display.flip()
 
 
+# -----------------------------
+# Benchmark
+# -----------------------------
+class BenchClock:
+    """
+    Stands in for pygame.time.Clock: fixed 1/FPS steps, no waiting. It also
+    plays, like a bot: it rebuilds the run's platforms from the same seed and,
+    whenever the cat is standing, holds SPACE and lets go when the aim line
+    would land it as far along the nearest platform ahead as reach allows
+    (or further along its own, when that one is out of reach).
+
+    After warmup frames it counts, for `frames` frames, the surfaces made
+    (per half, to show they level off), text renders, platform redraws and
+    minimap refreshes, and times each frame; then it quits.
+    """
+
+    def __init__(self, seed, warmup, frames):
+        self.warmup = warmup
+        self.frames = frames
+        self.dt = (1000 // FPS) / 1000.0
+        self.n = 0
+        self.last = None
+        self.frame_ms = []
+        self.counts = []  # stats and text renders at the start, middle and end
+
+        # The bot's copy of the platforms, made the way the run makes them
+        self.rng = random.Random(seed)
+        self.row = PlatformRow()
+        self.row.add(start_platform(), None)
+        self.px = self.row[0].right - 60
+        self.aiming = False
+        self.stand_at = warmup  # frame from which the cat is standing again
+        self.jumps = 0
+
+    def snapshot(self):
+        self.counts.append((stats["surfaces"], text_cache.stats["renders"],
+                            stats["platform_renders"], stats["minimap_refreshes"]))
+
+    def play(self):
+        if not self.aiming:
+            if self.n >= self.stand_at:
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+                self.aiming = True
+            return
+        # As far along as reach allows; a hop along this platform if the next is too far
+        reach = self.px + length_to_jump_distance(PREVIEW_MAX) - 30
+        while self.row.right < reach:
+            self.row.add(generate_next_platform(self.rng, self.row.last, self.row.end), None)
+        ahead = self.row.nearest_ahead(self.px)
+        if ahead is None or min(self.row[ahead].right - 24, reach) < self.row[ahead].left + 16:
+            ahead = self.row.landing_at(self.px)
+        r = self.row[ahead]
+        aim = min(r.right - 24, reach)
+
+        # The run's aim line this frame (its t_osc is n steps of dt)
+        osc01 = (math.sin(self.n * self.dt * PREVIEW_SPEED * math.pi * 2) + 1.0) / 2.0
+        length = lerp(PREVIEW_MIN, PREVIEW_MAX, osc01)
+        land_x = self.px + length_to_jump_distance(length)
+        if max(r.left + 8, aim - 16) <= land_x <= min(r.right - 8, aim + 16):
+            pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_SPACE))
+            self.aiming = False
+            self.px = land_x
+            self.jumps += 1
+            self.stand_at = self.n + math.ceil(length_to_jump_duration(length) / self.dt) + 2
+
+    def tick(self, fps=0):
+        self.n += 1
+        now = time.perf_counter()
+        end = self.warmup + self.frames
+        if self.warmup < self.n <= end:
+            self.frame_ms.append((now - self.last) * 1000.0)
+        self.last = now
+        if self.n in (self.warmup, self.warmup + self.frames // 2, end):
+            self.snapshot()
+        if self.n < end:
+            self.play()
+        else:
+            # Ends the run, then the end message
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        return 1000 // FPS
+
+
+def benchmark_lookups(count=10000, lookups=10000, checks=1000):
+    """
+    PlatformRow lookups against a linear scan, over one long row of platforms
+    with its first third dropped (as endless mode would).
+    """
+    rng = random.Random(1)
+    row = PlatformRow()
+    row.add(start_platform(), None)
+    while len(row) < count:
+        row.add(generate_next_platform(rng, row.last, row.end), None)
+    for _ in range(count // 3):
+        row.drop_first()
+    try:
+        row[row.first - 1]
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("a dropped platform was still indexable")
+    alive = [(i, row[i]) for i in range(row.first, row.end)]
+    xs = [rng.uniform(row.left - 50, row.right + 50) for _ in range(lookups)]
+
+    t = time.perf_counter()
+    found = [row.landing_at(x) for x in xs]
+    t_row = (time.perf_counter() - t) / lookups
+    t = time.perf_counter()
+    scanned = [next((i for i, r in alive if r.left <= x <= r.right), None) for x in xs]
+    t_scan = (time.perf_counter() - t) / lookups
+    assert found == scanned
+
+    for x in xs[:checks]:
+        assert row.nearest_ahead(x) == next((i for i, r in alive if r.left > x), None)
+        assert list(row.visible_between(x, x + WIDTH)) == \
+            [i for i, r in alive if r.right >= x and r.left <= x + WIDTH]
+    print(f"{len(row)} platforms: landing_at {t_row * 1e6:.2f} us, linear scan {t_scan * 1e6:.1f} us")
+
+
+def benchmark(warmup=60):
+    benchmark_lookups()
+    # Level 5 is won at about 5500 frames, so its window stops short of that. In
+    # endless mode the spare pool grows until the most platforms alive at once
+    # have been (19 surfaces by frame 12000 for this seed), then stays put.
+    for label, frames, kwargs in (("level 5", 3000, {"level": 5}), ("endless", 24000, {"endless": True})):
+        clock = BenchClock(1, warmup, frames)
+        run_jump_minigame(clock=clock, seed=1, **kwargs)
+        assert len(clock.counts) == 3, f"{label}: the bot fell or won before the end"
+        start, mid, end = clock.counts
+        print(f"{label}: {len(clock.frame_ms)} frames, {clock.jumps} jumps, "
+              f"surfaces {mid[0] - start[0]} + {end[0] - mid[0]} (first + second half), "
+              f"{end[1] - start[1]} text renders, {end[2] - start[2]} platform redraws, "
+              f"{end[3] - start[3]} minimap refreshes, "
+              f"{sum(clock.frame_ms) / len(clock.frame_ms):.2f} ms/frame "
+              f"(worst {max(clock.frame_ms):.2f})")
+        assert end[0] == mid[0], f"{label}: surfaces still being made"
+
+
 if __name__ == "__main__":
-    print(run_jump_minigame(level=1))
+    if "--bench" in sys.argv:
+        benchmark()
+    elif "--endless" in sys.argv:
+        print(run_jump_minigame(endless=True))
+    else:
+        print(run_jump_minigame(level=1))
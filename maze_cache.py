@@ -0,0 +1,134 @@
+# maze_cache.py
+#
+# On-disk cache of seeded maze levels, so a fixed maze (a daily maze, a
+# reported bug, a benchmark layout) is generated once and then loaded.
+#
+# One file per (seed, size, generator):
+#
+#   header   "MZL1", w, h, exit x, exit y        (little-endian uint32s)
+#   payload  zlib( tiles as a bitfield, 1 = wall, 8 tiles per byte, LSB first
+#                + distance field from (1, 1) as little-endian int32 )
+#
+#   level_path(cache_dir, seed, w, h, generator) -> path
+#   save_level(path, maze, exit_pos, distance)
+#   load_level(path) -> (maze, exit_pos, distance), or None if missing / unreadable
+#   cached_level(seed, w, h, generator) -> (maze, exit_pos, distance), generating on a miss
+#
+# The start tile is always (1, 1), as in maze_minigame.
+
+import hashlib
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+import maze_core
+
+LEVEL_CACHE_DIR = "maze_cache"
+
+_MAGIC = b"MZL1"
+_HEADER = struct.Struct("<4sIIII")
+START = (1, 1)
+
+# Byte <-> its 8 tiles, LSB first (tiles are 0 or 1, so a tile is its bit)
+_UNPACK = [bytes((b >> k) & 1 for k in range(8)) for b in range(256)]
+_PACK = {tiles: b for b, tiles in enumerate(_UNPACK)}
+
+
+def pack_tiles(tiles):
+    data = bytes(tiles) + bytes(-len(tiles) % 8)
+    return bytes(_PACK[data[i:i + 8]] for i in range(0, len(data), 8))
+
+
+def unpack_tiles(packed, count):
+    return bytearray(b"".join(map(_UNPACK.__getitem__, packed))[:count])
+
+
+def level_path(cache_dir, seed, w, h, generator):
+    # Int seeds stay readable in the name; anything else is hashed
+    if isinstance(seed, int):
+        tag = str(seed)
+    else:
+        tag = "s" + hashlib.sha1(repr(seed).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{generator}-{w}x{h}-{tag}.maze")
+
+
+def save_level(path, maze, exit_pos, distance):
+    dist = array("i", distance)
+    if sys.byteorder == "big":
+        dist.byteswap()
+    payload = zlib.compress(pack_tiles(maze.tiles) + dist.tobytes(), 6)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Write then rename, so a reader never sees half a file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, maze.w, maze.h, *exit_pos))
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def load_level(path):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, w, h, ex, ey = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            return None
+        payload = zlib.decompress(data[_HEADER.size:])
+    except (OSError, struct.error, zlib.error):
+        return None
+
+    count = w * h
+    packed_len = (count + 7) // 8
+    if len(payload) != packed_len + 4 * count:
+        return None
+    maze = maze_core.Maze(w, h, unpack_tiles(payload[:packed_len], count))
+    distance = array("i")
+    distance.frombytes(payload[packed_len:])
+    if sys.byteorder == "big":
+        distance.byteswap()
+    return maze, (ex, ey), distance
+
+
+def cached_level(seed, w, h, generator="backtracker", cache_dir=LEVEL_CACHE_DIR):
+    """The level for seed: loaded from cache_dir, or generated and saved there."""
+    path = level_path(cache_dir, seed, w, h, generator)
+    level = load_level(path)
+    if level is not None:
+        return level
+
+    maze = maze_core.generate(w, h, random.Random(seed), generator)
+    exit_pos, distance = maze_core.farthest_floor(maze, START)
+    try:
+        save_level(path, maze, exit_pos, distance)
+    except OSError as e:
+        print(f"could not cache maze level {path}: {e}")
+    return maze, exit_pos, distance
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(sizes=(45, 135, 1001), seed=1):
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for size in sizes:
+            t = time.perf_counter()
+            maze, exit_pos, _ = cached_level(seed, size, size, cache_dir=cache_dir)
+            t_miss = time.perf_counter() - t
+            t = time.perf_counter()
+            loaded, loaded_exit, _ = cached_level(seed, size, size, cache_dir=cache_dir)
+            t_hit = time.perf_counter() - t
+            assert loaded.tiles == maze.tiles and loaded_exit == exit_pos
+            size_kb = os.path.getsize(level_path(cache_dir, seed, size, size, "backtracker")) / 1024
+            print(f"{size}x{size}: generate + save {t_miss * 1000:.1f} ms, "
+                  f"load {t_hit * 1000:.2f} ms, file {size_kb:.1f} KiB")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,308 @@
+# maze_core.py
+#
+# Maze generation and solving on flat buffers, fast enough for very large
+# mazes (1001x1001 tiles and up).
+#
+# Tiles live in one bytearray, row-major, index = y * w + x. Sizes are odd:
+# cells sit on odd coordinates and the outer ring is always wall, so
+# neighbour lookups (i +- 1, i +- w) never need bounds checks.
+#
+#   generate(w, h, rng, generator="backtracker") -> Maze
+#   distance_field(maze, start) -> array('i') of steps from start (negative = no path)
+#   farthest_floor(maze, start) -> ((x, y), distance field)
+#
+# Generators (all make perfect mazes, one path between any two cells):
+#   "backtracker"  iterative depth-first search, long winding corridors
+#   "kruskal"      random spanning tree with union-find, many short dead ends
+#   "wilson"       loop-erased random walks, uniform over all mazes
+#
+# Only the backtracker generates and solves a 1001x1001 maze well under a
+# second (see --bench). Kruskal's union-find is about 3x slower, and the
+# time Wilson's walks take varies a lot from maze to maze. So past
+# LARGE_MAZE_TILES, generator_for_size() picks the backtracker.
+
+import itertools
+import sys
+import time
+from array import array
+
+WALL = 1
+FLOOR = 0
+
+GENERATORS = ("backtracker", "kruskal", "wilson")
+
+# Up to here (501x501) every generator plus a solve takes about 0.2 s
+LARGE_MAZE_TILES = 501 * 501
+
+# For a 4-bit mask of open directions (right, left, down, up), the tuple of
+# direction numbers to choose from. Saves building a neighbour list per step.
+_CHOICES = tuple(tuple(d for d in range(4) if m & (1 << d)) for m in range(16))
+
+# Random bytes -> direction numbers, for drawing walk directions in bulk
+_DIRECTIONS = bytes(b & 3 for b in range(256))
+
+
+class Maze:
+    __slots__ = ("w", "h", "tiles")
+
+    def __init__(self, w, h, tiles=None):
+        self.w = w
+        self.h = h
+        self.tiles = tiles if tiles is not None else bytearray([WALL]) * (w * h)
+
+    def index(self, x, y):
+        return y * self.w + x
+
+    def xy(self, i):
+        y, x = divmod(i, self.w)
+        return x, y
+
+    def is_floor(self, x, y):
+        return 0 <= x < self.w and 0 <= y < self.h and self.tiles[y * self.w + x] == FLOOR
+
+
+# -----------------------------
+# Generators
+# -----------------------------
+# The backtracker and Wilson's walk work on a copy of the tiles padded by one
+# PAD tile on every side: cells are two tiles apart, so a step off the edge
+# lands on padding and needs no bounds check. "tile & 1" is then 1 only for
+# uncarved walls (PAD & 1 == 0).
+PAD = 2
+
+
+def _padded(w, h):
+    if w < 3 or h < 3 or w % 2 == 0 or h % 2 == 0:
+        raise ValueError(f"maze size must be odd and at least 3x3, got {w}x{h}")
+    pw = w + 2
+    buf = bytearray([PAD]) * (pw * (h + 2))
+    wall_row = bytes([WALL]) * w
+    for y in range(h):
+        row = (y + 1) * pw + 1
+        buf[row:row + w] = wall_row
+    return pw, buf
+
+
+def _unpad(buf, pw, w, h, tiles):
+    for y in range(h):
+        row = (y + 1) * pw + 1
+        tiles[y * w:(y + 1) * w] = buf[row:row + w]
+
+
+def _backtracker(w, h, rng, tiles):
+    pw, t = _padded(w, h)
+    steps = (2, -2, 2 * pw, -2 * pw)
+    rand = rng.random
+
+    c = 2 * pw + 2  # tile (1, 1)
+    t[c] = FLOOR
+    stack = [c]
+    push = stack.append
+    while stack:
+        c = stack[-1]
+        m = (t[c + 2] & 1) | (t[c - 2] & 1) << 1 | (t[c + steps[2]] & 1) << 2 | (t[c + steps[3]] & 1) << 3
+        if not m:
+            stack.pop()
+            continue
+        opts = _CHOICES[m]
+        s = steps[opts[int(rand() * len(opts))]]
+        t[c + (s >> 1)] = FLOOR
+        t[c + s] = FLOOR
+        push(c + s)
+
+    _unpad(t, pw, w, h, tiles)
+
+
+def _kruskal(w, h, rng, tiles):
+    if w < 3 or h < 3 or w % 2 == 0 or h % 2 == 0:
+        raise ValueError(f"maze size must be odd and at least 3x3, got {w}x{h}")
+    # Every cell is floor; the edges are the wall tiles between two cells.
+    # Union-find runs over tile indices. Edges between upper and lower cells
+    # are stored negated, so the sign says which neighbours an edge joins.
+    edges = []
+    for y in range(1, h - 1):
+        row = y * w
+        if y & 1:
+            tiles[row + 1:row + w - 1:2] = bytes((w - 1) // 2)
+            edges.extend(range(row + 2, row + w - 2, 2))   # between left and right cells
+        else:
+            edges.extend(range(-row - 1, -row - w + 1, -2))  # between upper and lower cells
+    rng.shuffle(edges)
+
+    parent = list(range(w * h))
+    remaining = ((w - 1) // 2) * ((h - 1) // 2) - 1
+    for e in edges:
+        if e > 0:
+            a = e - 1
+            b = e + 1
+        else:
+            e = -e
+            a = e - w
+            b = e + w
+        while parent[a] != a:
+            parent[a] = a = parent[parent[a]]
+        while parent[b] != b:
+            parent[b] = b = parent[parent[b]]
+        if a == b:
+            continue
+        parent[a] = b
+        tiles[e] = FLOOR
+        remaining -= 1
+        if not remaining:
+            break
+
+
+def _wilson(w, h, rng, tiles):
+    pw, t = _padded(w, h)
+    steps = (2, -2, 2 * pw, -2 * pw)
+    heading = bytearray(len(t))
+    # Directions come from random bytes, 64 KB at a time; a step onto the
+    # padding is drawn again, so each open direction stays equally likely
+    directions = itertools.chain.from_iterable(
+        iter(lambda: rng.randbytes(1 << 16).translate(_DIRECTIONS), None))
+
+    # A cell is in the tree once it is carved (FLOOR)
+    cells = [c for y in range(1, h, 2) for c in range((y + 1) * pw + 2, (y + 1) * pw + w, 2)]
+    t[cells[rng.randrange(len(cells))]] = FLOOR
+
+    for c in cells:
+        if t[c] == FLOOR:
+            continue
+        # Random walk until it hits the tree, remembering the last exit
+        # direction from each cell (that erases loops for free).
+        n = c
+        for d in directions:
+            m = n + steps[d]
+            v = t[m]
+            if v == PAD:
+                continue
+            heading[n] = d
+            n = m
+            if v == FLOOR:
+                break
+        # Retrace the loop-erased path and add it to the tree
+        n = c
+        while t[n] != FLOOR:
+            s = steps[heading[n]]
+            t[n] = FLOOR
+            t[n + (s >> 1)] = FLOOR
+            n += s
+
+    _unpad(t, pw, w, h, tiles)
+
+
+_GENERATOR_FUNCS = {
+    "backtracker": _backtracker,
+    "kruskal": _kruskal,
+    "wilson": _wilson,
+}
+
+
+def generator_for_size(w, h, generator):
+    """generator, or "backtracker" for mazes over LARGE_MAZE_TILES."""
+    return generator if w * h <= LARGE_MAZE_TILES else "backtracker"
+
+
+def generate(w, h, rng, generator="backtracker"):
+    """A w x h perfect maze (odd sizes). Tile (1, 1) is always floor."""
+    func = _GENERATOR_FUNCS.get(generator)
+    if func is None:
+        raise ValueError(f"unknown maze generator {generator!r}, expected one of {GENERATORS}")
+    maze = Maze(w, h)
+    func(w, h, rng, maze.tiles)
+    return maze
+
+
+# -----------------------------
+# Solving
+# -----------------------------
+# Walls start at -2 and unvisited floor at -1, so the BFS needs one check
+# per neighbour.
+_DIST_INIT = bytes.maketrans(bytes([FLOOR, WALL]), bytes([0xFF, 0xFE]))
+
+
+def _bfs(maze, start):
+    """
+    BFS from start; returns (distance field, last tile reached).
+
+    Floor tiles are cells (odd x and y) or the corridor between two cells,
+    so the search steps cell to cell, two tiles at a time, and fills in the
+    corridor tile on the way: half the queue of a tile-by-tile search.
+    """
+    w = maze.w
+    dist = array("i", array("b", maze.tiles.translate(_DIST_INIT)))
+    s = maze.index(*start)
+    if dist[s] != -1:
+        return dist, s
+
+    dist[s] = 0
+    if start[0] & 1 and start[1] & 1:
+        queue = [s]
+    else:
+        # Starting in a corridor: its two cells are one step away
+        queue = []
+        for n in (s + 1, s - 1, s + w, s - w):
+            if dist[n] == -1:
+                dist[n] = 1
+                queue.append(n)
+    push = queue.append
+    w2 = 2 * w
+    # The outer ring is wall, so corridor lookups (i +- 1, i +- w) are always
+    # in range, and an open corridor always has a cell behind it.
+    # Iterating a list while appending to it walks the whole queue.
+    for i in queue:
+        d = dist[i] + 1
+        if dist[i + 1] == -1:
+            dist[i + 1] = d
+            dist[i + 2] = d + 1
+            push(i + 2)
+        if dist[i - 1] == -1:
+            dist[i - 1] = d
+            dist[i - 2] = d + 1
+            push(i - 2)
+        if dist[i + w] == -1:
+            dist[i + w] = d
+            dist[i + w2] = d + 1
+            push(i + w2)
+        if dist[i - w] == -1:
+            dist[i - w] = d
+            dist[i - w2] = d + 1
+            push(i - w2)
+    return dist, (queue[-1] if queue else s)
+
+
+def distance_field(maze, start):
+    """BFS steps from start to every tile as int32: -1 unreachable floor, -2 wall."""
+    return _bfs(maze, start)[0]
+
+
+def farthest_floor(maze, start):
+    """The floor tile farthest from start (by path), and the distance field."""
+    dist, last = _bfs(maze, start)
+    return maze.xy(last), dist
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(sizes=(501, 1001), seed=1):
+    """Generate and solve with every generator, up to LARGE_MAZE_TILES and past it."""
+    import random
+
+    for size in sizes:
+        for name in GENERATORS:
+            rng = random.Random(seed)
+            t = time.perf_counter()
+            maze = generate(size, size, rng, name)
+            t_gen = time.perf_counter() - t
+            t = time.perf_counter()
+            far, dist = farthest_floor(maze, (1, 1))
+            t_bfs = time.perf_counter() - t
+            used = "" if generator_for_size(size, size, name) == name else " (games use backtracker)"
+            print(f"{name:>11} {size}x{size}: generate {t_gen * 1000:.0f} ms, "
+                  f"solve {t_bfs * 1000:.0f} ms, farthest {far} at {dist[maze.index(*far)]} steps{used}")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,130 @@
+# maze_fov.py
+#
+# Field of view for the maze light: which tiles the player's light reaches,
+# with walls casting shadows (recursive shadowcasting, 8 octants).
+#
+# A field of view is stored as an int bitmask over the (2R+1) x (2R+1) tiles
+# around the origin, bit (dy + R) * (2R + 1) + (dx + R). That keeps the
+# per-cell memo small on big mazes and makes a handy cache key.
+#
+#   shadowcast(maze, x, y, radius) -> bitmask
+#   fov_offsets(mask, radius) -> [(dx, dy), ...]
+#   FovCache(maze, radius)        memoized per cell; warm() fills in the
+#                                 cells around the player within a time budget
+
+import time
+
+from maze_core import WALL
+
+# (xx, xy, yx, yy) transforms from octant-local (col, row) to grid offsets
+_OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+
+def shadowcast(maze, ox, oy, radius):
+    """Tiles lit from (ox, oy) within radius tiles. Walls that catch light are lit too."""
+    tiles, w, h = maze.tiles, maze.w, maze.h
+    side = 2 * radius + 1
+    limit = (radius + 0.5) ** 2
+    mask = 1 << (radius * side + radius)
+
+    def cast(row, start, end, xx, xy, yx, yy):
+        nonlocal mask
+        if start < end:
+            return
+        for j in range(row, radius + 1):
+            dx, dy = -j - 1, -j
+            blocked = False
+            new_start = start
+            while dx <= 0:
+                dx += 1
+                l_slope = (dx - 0.5) / (dy + 0.5)
+                r_slope = (dx + 0.5) / (dy - 0.5)
+                if start < r_slope:
+                    continue
+                if end > l_slope:
+                    break
+                ox_ = dx * xx + dy * xy
+                oy_ = dx * yx + dy * yy
+                x, y = ox + ox_, oy + oy_
+                inside = 0 <= x < w and 0 <= y < h
+                if inside and dx * dx + dy * dy <= limit:
+                    mask |= 1 << ((oy_ + radius) * side + ox_ + radius)
+                opaque = not inside or tiles[y * w + x] == WALL
+                if blocked:
+                    if opaque:
+                        new_start = r_slope
+                        continue
+                    blocked = False
+                    start = new_start
+                elif opaque and j < radius:
+                    blocked = True
+                    cast(j + 1, start, l_slope, xx, xy, yx, yy)
+                    new_start = r_slope
+            if blocked:
+                break
+
+    for octant in _OCTANTS:
+        cast(1, 1.0, 0.0, *octant)
+    return mask
+
+
+def fov_offsets(mask, radius):
+    side = 2 * radius + 1
+    out = []
+    while mask:
+        low = mask & -mask
+        bit = low.bit_length() - 1
+        dy, dx = divmod(bit, side)
+        out.append((dx - radius, dy - radius))
+        mask ^= low
+    return out
+
+
+class FovCache:
+    """
+    Shadowcast results per floor cell. The maze is static and the player
+    moves tile to tile, so each cell is computed at most once. warm() is
+    meant to run every frame: it computes the cells the player can reach in
+    the next few steps, nearest first, until the time budget is used up, so
+    a move almost never has to wait for a shadowcast.
+    """
+
+    def __init__(self, maze, radius, warm_steps=None):
+        self.maze = maze
+        self.radius = radius
+        self.warm_steps = warm_steps if warm_steps is not None else 2 * radius
+        self.masks = {}  # tile index -> bitmask
+        self.misses = 0
+
+    def get(self, x, y):
+        i = y * self.maze.w + x
+        mask = self.masks.get(i)
+        if mask is None:
+            mask = self.masks[i] = shadowcast(self.maze, x, y, self.radius)
+            self.misses += 1
+        return mask
+
+    def warm(self, x, y, budget_s):
+        deadline = time.perf_counter() + budget_s
+        maze = self.maze
+        w = maze.w
+        tiles = maze.tiles
+        start = y * w + x
+        seen = {start: 0}
+        queue = [start]
+        for i in queue:
+            if i not in self.masks:
+                if time.perf_counter() > deadline:
+                    return
+                cy, cx = divmod(i, w)
+                self.masks[i] = shadowcast(maze, cx, cy, self.radius)
+            d = seen[i] + 1
+            if d > self.warm_steps:
+                continue
+            for n in (i + 1, i - 1, i + w, i - w):
+                if n not in seen and tiles[n] != WALL:
+                    seen[n] = d
+                    queue.append(n)
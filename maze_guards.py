@@ -0,0 +1,326 @@
+# maze_guards.py
+#
+# Patrol guards for the higher maze levels.
+#
+# Guards walk tile to tile toward waypoints by following flow fields: for a
+# waypoint, the BFS distance field (maze_core.distance_field) turned into
+# the direction of the next step from every tile. A field is shared by every
+# guard heading to that waypoint, so the cost depends on the number of
+# waypoints, not guards.
+#
+# Guard state lives in parallel flat arrays, and guards are bucketed in a
+# coarse grid so the sight test only looks at guards near the player and
+# drawing only at guards on screen. With numpy the arrays are numpy arrays
+# and a frame's steps are done together: the flow fields are stacked into
+# one table, so every stepping guard's direction is one fancy-indexing
+# lookup. Without numpy, guards step one at a time.
+#
+#   FlowFields(maze)                        .get(target) -> bytearray of step directions
+#   GuardPatrol(maze, fields, waypoints, spawns, count, rng, ...)
+#       update(dt)                          advance every guard
+#       spots(px, py, fov_mask)             True if a guard sees tile (px, py)
+#       draw(screen, camera)
+
+import math
+import sys
+import time
+from array import array
+
+import pygame
+
+from maze_core import distance_field
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Step directions, in maze_core's order: right, left, down, up
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+NO_STEP = 255
+
+GRID_TILES = 8  # spatial grid bucket size, in tiles
+
+
+class FlowFields:
+    """Flow field per target tile index, built on first use and kept for the level."""
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.fields = {}  # target tile index -> bytearray
+        self.builds = 0
+
+    def _build(self, target):
+        maze = self.maze
+        w = maze.w
+        dist = distance_field(maze, maze.xy(target))
+        flow = bytearray([NO_STEP]) * len(dist)
+        steps = (1, -1, w, -w)
+        for i, d in enumerate(dist):
+            # Walls (-2), unreachable floor (-1) and the target (0) have no step;
+            # the outer ring is wall, so i +- 1 / i +- w are in range here.
+            if d > 0:
+                d -= 1
+                for k in range(4):
+                    if dist[i + steps[k]] == d:
+                        flow[i] = k
+                        break
+        self.builds += 1
+        return flow
+
+    def get(self, target):
+        flow = self.fields.get(target)
+        if flow is None:
+            flow = self.fields[target] = self._build(target)
+        return flow
+
+
+def make_cone_sprite(heading, range_px, half_angle_rad, color, alpha):
+    """View cone pointing along DIRECTIONS[heading]; returns (surface, offset from the guard's centre)."""
+    angle = math.atan2(DIRECTIONS[heading][1], DIRECTIONS[heading][0])
+    points = [(0.0, 0.0)]
+    for s in range(17):
+        a = angle - half_angle_rad + 2 * half_angle_rad * s / 16
+        points.append((math.cos(a) * range_px, math.sin(a) * range_px))
+    x0 = int(min(p[0] for p in points)) - 1
+    y0 = int(min(p[1] for p in points)) - 1
+    x1 = int(max(p[0] for p in points)) + 2
+    y1 = int(max(p[1] for p in points)) + 2
+    surf = pygame.Surface((x1 - x0, y1 - y0), pygame.SRCALPHA)
+    surf.fill((0, 0, 0, 0))
+    pygame.draw.polygon(surf, (*color, alpha), [(x - x0, y - y0) for x, y in points])
+    return surf, (x0, y0)
+
+
+class GuardPatrol:
+    """
+    count guards starting on spawns (tile indices), each walking to a random
+    waypoint (tile index) and picking another when it gets there; target
+    holds the waypoint's slot in waypoints. A guard
+    sees the player within sight_tiles, inside its view cone and in line of
+    sight; line of sight comes from the player's field of view mask
+    (maze_fov), so sight_tiles must not exceed fov_radius.
+    """
+
+    def __init__(self, maze, fields, waypoints, spawns, count, rng, *,
+                 cell_size, step_s, sight_tiles, half_angle_deg, fov_radius,
+                 body_color, cone_color, cone_alpha):
+        self.maze = maze
+        self.fields = fields
+        self.waypoints = list(waypoints)
+        self.rng = rng
+        self.count = count
+        self.cell_size = cell_size
+        self.step_s = step_s
+        self.sight_tiles = min(sight_tiles, fov_radius)
+        self.fov_radius = fov_radius
+        self.steps = (1, -1, maze.w, -maze.w)
+
+        # Cone test on integer tile offsets: in front of the guard and
+        # within the half-angle, compared squared (no sqrt or atan2)
+        self.cos2 = math.cos(math.radians(half_angle_deg)) ** 2
+
+        # Guard state, one slot per guard
+        pos = [rng.choice(spawns) for _ in range(count)]
+        target = [rng.randrange(len(self.waypoints)) for _ in range(count)]
+        progress = [rng.random() for _ in range(count)]
+        if np is not None:
+            self.pos = np.array(pos, dtype=np.int64)
+            self.prev = self.pos.copy()
+            self.target = np.array(target, dtype=np.int64)
+            self.heading = np.zeros(count, dtype=np.uint8)
+            self.progress = np.array(progress, dtype=np.float64)
+            # Flow field per waypoint slot, as rows of one table
+            self.flows = np.stack([np.frombuffer(fields.get(t), dtype=np.uint8) for t in self.waypoints])
+            self.waypoint_tiles = np.array(self.waypoints, dtype=np.int64)
+            self.step_offsets = np.array(self.steps, dtype=np.int64)
+        else:
+            self.pos = array("i", pos)
+            self.prev = array("i", pos)
+            self.target = array("i", target)
+            self.heading = bytearray(count)
+            self.progress = array("d", progress)
+
+        # Spatial grid: bucket index -> set of guard slots
+        self.grid_w = (maze.w + GRID_TILES - 1) // GRID_TILES
+        self.grid_h = (maze.h + GRID_TILES - 1) // GRID_TILES
+        self.buckets = [set() for _ in range(self.grid_w * self.grid_h)]
+        self.bucket = array("i", bytes(4 * count))
+        for g in range(count):
+            b = self.bucket[g] = self._bucket_of(pos[g])
+            self.buckets[b].add(g)
+
+        self.body = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+        self.body.fill((0, 0, 0, 0))
+        pygame.draw.circle(self.body, body_color, (cell_size // 2, cell_size // 2), cell_size * 2 // 5)
+        self.cones = [make_cone_sprite(h, (self.sight_tiles + 0.5) * cell_size,
+                                       math.radians(half_angle_deg), cone_color, cone_alpha)
+                      for h in range(4)]
+
+    def _bucket_of(self, i):
+        y, x = divmod(i, self.maze.w)
+        return (y // GRID_TILES) * self.grid_w + x // GRID_TILES
+
+    def _buckets_around(self, x0, y0, x1, y1):
+        """Guard slots in the buckets overlapping tiles x0..x1, y0..y1."""
+        gw = self.grid_w
+        bx0 = max(0, x0 // GRID_TILES)
+        by0 = max(0, y0 // GRID_TILES)
+        bx1 = min(gw - 1, x1 // GRID_TILES)
+        by1 = min(self.grid_h - 1, y1 // GRID_TILES)
+        for by in range(by0, by1 + 1):
+            for b in range(by * gw + bx0, by * gw + bx1 + 1):
+                yield from self.buckets[b]
+
+    def _retarget(self, g):
+        """Guard g is at its waypoint: pick another."""
+        i = self.pos[g]
+        slot = self.target[g]
+        while self.waypoints[slot] == i and len(self.waypoints) > 1:
+            slot = self.rng.randrange(len(self.waypoints))
+        self.target[g] = slot
+
+    def _rebucket(self, g, b):
+        if b != self.bucket[g]:
+            self.buckets[self.bucket[g]].discard(g)
+            self.buckets[b].add(g)
+            self.bucket[g] = b
+
+    def _step(self, g):
+        i = self.pos[g]
+        if i == self.waypoints[self.target[g]]:
+            self._retarget(g)
+        k = self.fields.get(self.waypoints[self.target[g]])[i]
+        self.prev[g] = i
+        if k == NO_STEP:
+            return
+        n = i + self.steps[k]
+        self.pos[g] = n
+        self.heading[g] = k
+        self._rebucket(g, self._bucket_of(n))
+
+    def update(self, dt):
+        advance = dt / self.step_s
+        if np is not None:
+            self._update_batched(advance)
+            return
+        progress = self.progress
+        for g in range(self.count):
+            p = progress[g] + advance
+            if p >= 1.0:
+                p = (p - 1.0) % 1.0
+                self._step(g)
+            progress[g] = p
+
+    def _update_batched(self, advance):
+        """update() for every guard at once, over the numpy state arrays."""
+        progress = self.progress
+        progress += advance
+        moving = np.flatnonzero(progress >= 1.0)
+        if not len(moving):
+            return
+        progress[moving] = (progress[moving] - 1.0) % 1.0
+
+        pos = self.pos[moving]
+        # Arriving at a waypoint is rare, so those pick their next one singly
+        for g in moving[pos == self.waypoint_tiles[self.target[moving]]].tolist():
+            self._retarget(g)
+
+        k = self.flows[self.target[moving], pos]
+        self.prev[moving] = pos
+        go = k != NO_STEP
+        moving, k = moving[go], k[go]
+        new = pos[go] + self.step_offsets[k]
+        self.pos[moving] = new
+        self.heading[moving] = k
+
+        y, x = np.divmod(new, self.maze.w)
+        bucket = (y // GRID_TILES) * self.grid_w + x // GRID_TILES
+        changed = bucket != np.frombuffer(self.bucket, dtype=np.int32)[moving]
+        for g, b in zip(moving[changed].tolist(), bucket[changed].tolist()):
+            self._rebucket(g, b)
+
+    def spots(self, px, py, fov_mask):
+        """True if a guard sees tile (px, py); fov_mask is the player's field of view there."""
+        r = self.sight_tiles
+        fr = self.fov_radius
+        side = 2 * fr + 1
+        r2 = r * r
+        w = self.maze.w
+        for g in self._buckets_around(px - r, py - r, px + r, py + r):
+            gy, gx = divmod(int(self.pos[g]), w)
+            dx, dy = px - gx, py - gy
+            d2 = dx * dx + dy * dy
+            if d2 > r2:
+                continue
+            if d2:
+                hx, hy = DIRECTIONS[self.heading[g]]
+                dot = dx * hx + dy * hy
+                if dot <= 0 or dot * dot < d2 * self.cos2:
+                    continue
+            # Visibility is symmetric: the guard sees the player if the
+            # player's light reaches the guard's tile
+            if fov_mask >> ((fr - dy) * side + fr - dx) & 1:
+                return True
+        return False
+
+    def draw(self, screen, camera):
+        cell = self.cell_size
+        half = cell // 2
+        w = self.maze.w
+        r = self.sight_tiles + 1
+        view = camera.rect
+        tiles = self._buckets_around(view.left // cell - r, view.top // cell - r,
+                                     view.right // cell + r, view.bottom // cell + r)
+        for g in tiles:
+            t = float(self.progress[g])
+            y0, x0 = divmod(int(self.prev[g]), w)
+            y1, x1 = divmod(int(self.pos[g]), w)
+            cx = int((x0 + (x1 - x0) * t + 0.5) * cell) - camera.x
+            cy = int((y0 + (y1 - y0) * t + 0.5) * cell) - camera.y
+            cone, (ox, oy) = self.cones[self.heading[g]]
+            screen.blit(cone, (cx + ox, cy + oy))
+            screen.blit(self.body, (cx - half, cy - half))
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(size=201, counts=(64, 1024), frames=600, seed=1):
+    import random
+
+    import maze_core
+    from maze_fov import FovCache
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    rng = random.Random(seed)
+    maze = maze_core.generate(size, size, rng)
+    cells = [maze.index(x, y) for y in range(1, size, 2) for x in range(1, size, 2)]
+    fields = FlowFields(maze)
+    waypoints = rng.sample(cells, 12)
+    t = time.perf_counter()
+    for wp in waypoints:
+        fields.get(wp)
+    t_fields = time.perf_counter() - t
+
+    print(f"{size}x{size}: {len(waypoints)} flow fields {t_fields * 1000:.0f} ms "
+          f"({'numpy' if np is not None else 'no numpy'})")
+
+    fov = FovCache(maze, 6)
+    px, py = 1, 1
+    for count in counts:
+        patrol = GuardPatrol(maze, fields, waypoints, cells, count, rng,
+                             cell_size=26, step_s=0.3, sight_tiles=4, half_angle_deg=35, fov_radius=6,
+                             body_color=(200, 60, 60), cone_color=(220, 60, 60), cone_alpha=55)
+        t = time.perf_counter()
+        for _ in range(frames):
+            patrol.update(1 / 60)
+            patrol.spots(px, py, fov.get(px, py))
+        t_frame = (time.perf_counter() - t) / frames
+        print(f"  {count} guards: update + sight test {t_frame * 1e6:.0f} us per frame")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
@@ -0,0 +1,700 @@
+# maze_lighting.py
+#
+# Lighting for the maze minigame, in screen space. Everything here is built
+# once per level and reused every frame, so the frame itself only blits:
+#   - one darkness mask, with pre-combined light "stamps" for the player
+#     light and the exit beacon (no full-window fills)
+#   - bloom sprites for the player and the exit
+#   - the surveillance spotlight, from cone sprites quantized to
+#     SPOTLIGHT_ANGLE_STEP_DEG (the cone only changes shape with level), all
+#     rendered when the level is prepared
+#
+# The exit (and the spotlight on it) can move on screen when the camera
+# scrolls, so its centre is passed in every frame like the player's.
+#
+# With fov_radius and cell_size set, render() also takes the player's field
+# of view (a maze_fov bitmask) and the player light only reaches the tiles
+# in it: the light's stamp and bloom are cut up per tile and re-assembled
+# from the visible tiles, cached per field of view.
+# spotlight_bounds is where the cone can ever be seen, relative to the exit
+# (the maze, or the window if that is larger); cones are cropped to it.
+#
+# There are two compositors with the same render() call:
+#   "blit"   MazeLighting       stacked blend-mode blits of the masks above
+#   "numpy"  NumpyMazeLighting  one light map per frame over surfarray views,
+#                               smooth radial/angular falloff (needs numpy)
+# make_maze_lighting(mode, ...) picks one; "numpy" falls back to "blit" when
+# numpy is not installed. `python maze_lighting.py --bench` times both.
+
+import math
+import sys
+import time
+from collections import OrderedDict
+
+import pygame
+
+from maze_fov import fov_offsets
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LIGHTING_MODES = ("blit", "numpy")
+
+SPOTLIGHT_ANGLE_STEP_DEG = 2
+SPOTLIGHT_POLY_STEPS = 22
+
+# Cone sprites are one byte per pixel. A level keeps its whole turn of them
+# when that fits the budget; wider cones over bigger areas are drawn into a
+# window-sized scratch surface every frame instead (nothing is ever evicted,
+# since the beam sweeps in order and would miss an LRU cache every time).
+SPOTLIGHT_CACHE_BUDGET_BYTES = 96 * 1024 * 1024
+
+# Occluded player lights kept around, one per field of view
+FOV_LIGHT_CACHE_SIZE = 48
+
+
+def make_subtractive_light_mask(radius_px, softness_steps):
+    size = radius_px * 2
+    s = pygame.Surface((size, size), pygame.SRCALPHA)
+    cx, cy = radius_px, radius_px
+    for i in range(softness_steps):
+        t = i / max(1, softness_steps - 1)
+        r = int(radius_px * (0.35 + 0.65 * t))
+        alpha = int(255 * (1.0 - t))
+        pygame.draw.circle(s, (0, 0, 0, alpha), (cx, cy), r)
+    return s
+
+
+def make_additive_bloom_mask(radius_px, softness_steps, color, max_alpha):
+    size = radius_px * 2
+    s = pygame.Surface((size, size), pygame.SRCALPHA)
+    cx, cy = radius_px, radius_px
+    for i in range(softness_steps):
+        t = i / max(1, softness_steps - 1)
+        r = int(radius_px * (0.30 + 0.70 * t))
+        alpha = int(max_alpha * (1.0 - t))
+        pygame.draw.circle(s, (*color, alpha), (cx, cy), r)
+    return s
+
+
+def make_light_stamp(radius_px, softness_steps, darkness_alpha, inside_alpha):
+    """
+    Darkness around one light, ready to be MIN-blended into the mask.
+
+    Same result as the old two passes (darkness minus the subtractive mask,
+    then a faint dark disc over the lit area): the disc is alpha-composited
+    onto the stamp here, once, instead of onto a second full-window surface.
+    Outside the light the stamp is darkness_alpha, so MIN leaves it alone.
+    """
+    size = radius_px * 2
+    stamp = pygame.Surface((size, size), pygame.SRCALPHA)
+    stamp.fill((0, 0, 0, darkness_alpha))
+    stamp.blit(make_subtractive_light_mask(radius_px, softness_steps), (0, 0),
+               special_flags=pygame.BLEND_RGBA_SUB)
+
+    inside = pygame.Surface((size, size), pygame.SRCALPHA)
+    inside.fill((0, 0, 0, 0))
+    pygame.draw.circle(inside, (0, 0, 0, inside_alpha), (radius_px, radius_px), radius_px)
+    stamp.blit(inside, (0, 0))
+    return stamp
+
+
+def fov_tile_rects(fov, fov_radius, cell_size, radius_px):
+    """Rects of the visible tiles inside a (2r, 2r) stamp centred on the player's tile."""
+    bounds = pygame.Rect(0, 0, radius_px * 2, radius_px * 2)
+    half = cell_size // 2
+    rects = []
+    for dx, dy in fov_offsets(fov, fov_radius):
+        r = pygame.Rect(radius_px + dx * cell_size - half, radius_px + dy * cell_size - half,
+                        cell_size, cell_size).clip(bounds)
+        if r.w > 0 and r.h > 0:
+            rects.append(r)
+    return rects
+
+
+class SpotlightConeCache:
+    """
+    Spotlight cones, one per quantized angle, relative to the beam origin and
+    cropped to bounds (a rect relative to the origin). The range and
+    half-angle are fixed for a level, so a cone drawn once is valid for the
+    rest of the level wherever the origin is on screen.
+
+    The cone is added to the screen with BLEND_ADD, which ignores alpha, so
+    of the soft layers only the widest one's shape shows, in the full colour.
+    A cone is that shape in an 8-bit surface (palette: black, colour). If a
+    full turn of them fits budget_bytes they are all kept (prewarm renders
+    them); otherwise draw() fills the shape into the scratch surface itself.
+    Either way the cone reaches the screen through the window-sized scratch,
+    clipped to what is on screen: an 8-bit blit is slow with BLEND_ADD, a
+    plain one is not.
+    """
+
+    def __init__(self, window_size, bounds, range_px, half_angle_deg, color, soft_steps,
+                 step_deg=SPOTLIGHT_ANGLE_STEP_DEG, budget_bytes=SPOTLIGHT_CACHE_BUDGET_BYTES):
+        self.bounds = pygame.Rect(bounds)
+        self.range_px = range_px
+        widest = 1.55 if soft_steps > 1 else 1.0
+        self.half_angle = math.radians(half_angle_deg) * widest
+        self.color = color
+        self.steps = max(1, int(round(360 / step_deg)))
+
+        # Outline and crop of every step's cone, relative to the origin
+        self.points = [self._points(step / self.steps * math.tau) for step in range(self.steps)]
+        self.rects = [self._bounds(points) for points in self.points]
+        self.turn_bytes = sum(r.w * r.h for r in self.rects)
+        self.cached = self.turn_bytes <= budget_bytes
+        self.cones = [None] * self.steps
+        self.renders = 0
+
+        self.scratch = pygame.Surface(window_size, 0, 32)
+
+    def step_for_angle(self, angle_rad):
+        return int(round(angle_rad / math.tau * self.steps)) % self.steps
+
+    def _points(self, angle_rad):
+        points = [(0, 0)]
+        start_ang = angle_rad - self.half_angle
+        end_ang = angle_rad + self.half_angle
+        for s in range(SPOTLIGHT_POLY_STEPS + 1):
+            u = s / SPOTLIGHT_POLY_STEPS
+            a = start_ang + (end_ang - start_ang) * u
+            points.append((math.cos(a) * self.range_px, math.sin(a) * self.range_px))
+        return points
+
+    def _bounds(self, points):
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        rect = pygame.Rect(int(min(xs)) - 1, int(min(ys)) - 1,
+                           int(max(xs) - min(xs)) + 3, int(max(ys) - min(ys)) + 3)
+        return rect.clip(self.bounds)
+
+    def _render(self, step):
+        rect = self.rects[step]
+        surf = pygame.Surface(rect.size, 0, 8)
+        surf.set_palette([(0, 0, 0), self.color])
+        surf.fill(0)
+        pygame.draw.polygon(surf, 1, [(x - rect.x, y - rect.y) for x, y in self.points[step]])
+        self.renders += 1
+        return surf
+
+    def get(self, step):
+        cone = self.cones[step]
+        if cone is None:
+            cone = self.cones[step] = self._render(step)
+        return cone
+
+    def prewarm(self):
+        """Render the whole turn up front, when it is kept."""
+        if self.cached:
+            for step in range(self.steps):
+                if self.rects[step].w > 0 and self.rects[step].h > 0:
+                    self.get(step)
+
+    def draw(self, surface, origin, angle_rad):
+        step = self.step_for_angle(angle_rad)
+        rect = self.rects[step].move(origin)
+        view = rect.clip(surface.get_clip())
+        if view.w <= 0 or view.h <= 0:
+            return
+        area = pygame.Rect((0, 0), view.size)
+        if self.cached:
+            self.scratch.blit(self.get(step), area, view.move(-rect.x, -rect.y))
+        else:
+            ox, oy = origin[0] - view.x, origin[1] - view.y
+            self.scratch.fill((0, 0, 0), area)
+            self.scratch.set_clip(area)
+            pygame.draw.polygon(self.scratch, self.color, [(x + ox, y + oy) for x, y in self.points[step]])
+            self.scratch.set_clip(None)
+        surface.blit(self.scratch, view, area, special_flags=pygame.BLEND_ADD)
+
+
+class MazeLighting:
+    """
+    All per-level lighting state. The loop calls, in order:
+      draw_darkness(screen, player_center, exit_center, player_fov)
+      (player sprite)
+      draw_spotlight(screen, exit_center, angle)
+      draw_blooms(screen, player_center, exit_center, player_fov)
+    or render(), which does all of that.
+    """
+
+    def __init__(self, window_size, *, spotlight_bounds,
+                 darkness_alpha, inside_alpha,
+                 light_radius, light_softness, player_bloom_color,
+                 exit_radius, exit_softness, exit_bloom_color,
+                 spotlight_range, spotlight_half_angle_deg, spotlight_color,
+                 spotlight_max_alpha, spotlight_soft_steps,
+                 fov_radius=None, cell_size=None):
+        self.window_size = window_size
+        self.fov_radius = fov_radius
+        self.cell_size = cell_size
+        self.fov_lights = OrderedDict()  # fov bitmask -> (stamp, bloom)
+        self.darkness_alpha = darkness_alpha
+        self.light_radius = light_radius
+        self.exit_radius = exit_radius
+
+        self.player_stamp = make_light_stamp(light_radius, light_softness, darkness_alpha, inside_alpha)
+        self.exit_stamp = make_light_stamp(exit_radius, exit_softness, darkness_alpha, inside_alpha)
+
+        self.player_bloom = make_additive_bloom_mask(
+            light_radius, light_softness, color=player_bloom_color, max_alpha=95
+        )
+        self.exit_bloom = make_additive_bloom_mask(
+            exit_radius, exit_softness, color=exit_bloom_color, max_alpha=170
+        )
+
+        # Bloom dominance: the exit bloom replaces the player's in overlap
+        self.exit_erase = pygame.Surface((exit_radius * 2, exit_radius * 2), pygame.SRCALPHA)
+        self.exit_erase.fill((0, 0, 0, 0))
+        pygame.draw.circle(self.exit_erase, (0, 0, 0, 255), (exit_radius, exit_radius), exit_radius)
+
+        # Persistent darkness mask: filled once, then only the areas under
+        # the previous stamps are restored when a light moves.
+        self.darkness = pygame.Surface(window_size, pygame.SRCALPHA)
+        self.darkness.fill((0, 0, 0, darkness_alpha))
+        self.prev_key = ()
+
+        self.cones = SpotlightConeCache(
+            window_size, spotlight_bounds, spotlight_range, spotlight_half_angle_deg,
+            spotlight_color, spotlight_soft_steps
+        )
+
+    def player_topleft(self, player_center):
+        return player_center[0] - self.light_radius, player_center[1] - self.light_radius
+
+    def exit_topleft(self, exit_center):
+        return exit_center[0] - self.exit_radius, exit_center[1] - self.exit_radius
+
+    def player_light(self, player_fov):
+        """Player darkness stamp and bloom, cut down to the field of view if given."""
+        if player_fov is None or self.fov_radius is None:
+            return self.player_stamp, self.player_bloom
+        entry = self.fov_lights.get(player_fov)
+        if entry is not None:
+            self.fov_lights.move_to_end(player_fov)
+            return entry
+
+        size = self.player_stamp.get_size()
+        stamp = pygame.Surface(size, pygame.SRCALPHA)
+        stamp.fill((0, 0, 0, self.darkness_alpha))
+        bloom = pygame.Surface(size, pygame.SRCALPHA)
+        bloom.fill((0, 0, 0, 0))
+        for r in fov_tile_rects(player_fov, self.fov_radius, self.cell_size, self.light_radius):
+            stamp.blit(self.player_stamp, r, r, special_flags=pygame.BLEND_RGBA_MIN)
+            bloom.blit(self.player_bloom, r, r, special_flags=pygame.BLEND_RGBA_MAX)
+
+        entry = self.fov_lights[player_fov] = (stamp, bloom)
+        if len(self.fov_lights) > FOV_LIGHT_CACHE_SIZE:
+            self.fov_lights.popitem(last=False)
+        return entry
+
+    def draw_darkness(self, screen, player_center, exit_center, player_fov=None):
+        player_rect = pygame.Rect(self.player_topleft(player_center), self.player_stamp.get_size())
+        exit_rect = pygame.Rect(self.exit_topleft(exit_center), self.exit_stamp.get_size())
+
+        key = (player_rect, exit_rect, player_fov)
+        if key != self.prev_key:
+            for old in self.prev_key[:2]:
+                self.darkness.fill((0, 0, 0, self.darkness_alpha), old)
+            # MIN is idempotent, so re-stamping both lights covers any overlap
+            self.darkness.blit(self.exit_stamp, exit_rect, special_flags=pygame.BLEND_RGBA_MIN)
+            self.darkness.blit(self.player_light(player_fov)[0], player_rect, special_flags=pygame.BLEND_RGBA_MIN)
+            self.prev_key = key
+
+        screen.blit(self.darkness, (0, 0))
+
+    def warm(self, spotlight_angle, ahead_rad=0.0):
+        """Pre-render the whole turn of cones (safe off the main thread); the angles don't matter here."""
+        self.cones.prewarm()
+
+    def draw_spotlight(self, screen, exit_center, angle_rad):
+        self.cones.draw(screen, exit_center, angle_rad)
+
+    def draw_blooms(self, screen, player_center, exit_center, player_fov=None):
+        exit_topleft = self.exit_topleft(exit_center)
+        bloom = self.player_light(player_fov)[1]
+        screen.blit(bloom, self.player_topleft(player_center), special_flags=pygame.BLEND_RGBA_ADD)
+        screen.blit(self.exit_erase, exit_topleft, special_flags=pygame.BLEND_RGBA_SUB)
+        screen.blit(self.exit_bloom, exit_topleft, special_flags=pygame.BLEND_RGBA_ADD)
+
+    def render(self, screen, player_center, exit_center, spotlight_angle, player_sprite, player_fov=None):
+        """Lighting and the player sprite over the world already drawn on screen."""
+        self.draw_darkness(screen, player_center, exit_center, player_fov)
+        # Player AFTER darkness so it doesn't get greyed out
+        screen.blit(player_sprite, player_sprite.get_rect(center=player_center))
+        self.draw_spotlight(screen, exit_center, spotlight_angle)
+        self.draw_blooms(screen, player_center, exit_center, player_fov)
+
+
+# -----------------------------
+# NumPy compositor
+# -----------------------------
+# Works on packed 32-bit pixels (surfarray.pixels2d), two byte lanes at a
+# time, so every op touches one uint32 per pixel instead of three strided
+# channels. Any 32-bit format with 8-bit channels works.
+SPOTLIGHT_ANGLE_BINS = 1024  # power of two; angle differences wrap with a mask
+LIGHT_ONE = 256              # fixed-point 1.0 for the light map
+LANES = 0x00FF00FF
+HIGH_LANES = 0xFF00FF00
+LANE_CARRY = 0x01000100
+
+
+def smoothstep(edge0, edge1, x):
+    t = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+
+def radial_distance(radius_px):
+    """Distance from the centre of a (2r, 2r) stamp, indexed [x, y] like surfarray."""
+    c = np.arange(radius_px * 2, dtype=np.float32) - radius_px + 0.5
+    return np.sqrt(c[:, None] ** 2 + c[None, :] ** 2)
+
+
+def light_tables(radius_px, darkness_alpha, inside_alpha, color):
+    """
+    Falloff tables for one light: how much of the maze shows through
+    (0..LIGHT_ONE) and the additive glow as (2r, 2r, 3) RGB.
+
+    Same recipe as the blit masks (darkness removed from 0.35r outwards, a
+    faint inside disc, bloom fading from 0.30r), as continuous curves.
+    """
+    d = radial_distance(radius_px) / radius_px
+    alpha = darkness_alpha * smoothstep(0.35, 1.0, d)
+    alpha = np.where(d < 1.0, alpha + inside_alpha * (1.0 - alpha / 255.0), darkness_alpha)
+    keep = np.rint((255.0 - alpha) * LIGHT_ONE / 255.0).astype(np.uint32)
+
+    bloom = 1.0 - smoothstep(0.30, 1.0, d)
+    glow = np.rint(bloom[..., None] * np.array(color, dtype=np.float32))
+    return keep, glow
+
+
+def pack_rgb(rgb, surface):
+    """(..., 3) RGB values -> packed uint32 in surface's pixel format."""
+    rgb = np.asarray(rgb).astype(np.uint32)
+    rs, gs, bs, _ = surface.get_shifts()
+    return (rgb[..., 0] << rs) | (rgb[..., 1] << gs) | (rgb[..., 2] << bs)
+
+
+def scale_packed(p, k):
+    """Every channel of packed pixels p times k / LIGHT_ONE (k <= LIGHT_ONE)."""
+    lo = ((p & LANES) * k >> 8) & LANES
+    hi = ((p >> 8) & LANES) * k & HIGH_LANES
+    return lo | hi
+
+
+def add_packed(a, b):
+    """Per-channel saturating add of packed pixels."""
+    lo = (a & LANES) + (b & LANES)
+    hi = ((a >> 8) & LANES) + ((b >> 8) & LANES)
+    c = lo & LANE_CARRY
+    lo = (lo | (c - (c >> 8))) & LANES
+    c = hi & LANE_CARRY
+    hi = (hi | (c - (c >> 8))) & LANES
+    return lo | (hi << 8)
+
+
+def clip_stamp(window_rect, topleft, size):
+    """Clipped window rect and matching stamp slices for a stamp at topleft, or None."""
+    rect = pygame.Rect(topleft, size).clip(window_rect)
+    if rect.w <= 0 or rect.h <= 0:
+        return None
+    sx, sy = rect.x - topleft[0], rect.y - topleft[1]
+    return rect, (slice(sx, sx + rect.w), slice(sy, sy + rect.h))
+
+
+def rect_slices(rect):
+    return slice(rect.left, rect.right), slice(rect.top, rect.bottom)
+
+
+class NumpyMazeLighting:
+    """
+    Lighting as a light map: a per-pixel keep factor (how much of the maze
+    shows through) and an additive glow, applied in one multiply-add pass:
+
+        out = min(base * keep / 256 + glow, 255)
+
+    The part that does not move with the player (darkness, exit light) is
+    kept as window-sized keep/glow maps, updated only around the exit when
+    the camera moves it, and baked into a static frame: the keep map as the
+    alpha of one black overlay blit, plus the exit glow. Each frame blits
+    that frame, adds the spotlight over the cone's bounding box, and runs the
+    full multiply-add only under the player light.
+
+    The spotlight is a table lookup: the angle bin of every pixel around the
+    exit is precomputed, so the cone is lut[(angle_bin - beam_bin) & mask].
+    """
+
+    def __init__(self, window_size, *, spotlight_bounds,
+                 darkness_alpha, inside_alpha,
+                 light_radius, light_softness, player_bloom_color,
+                 exit_radius, exit_softness, exit_bloom_color,
+                 spotlight_range, spotlight_half_angle_deg, spotlight_color,
+                 spotlight_max_alpha, spotlight_soft_steps,
+                 fov_radius=None, cell_size=None):
+        self.window_rect = pygame.Rect((0, 0), window_size)
+        self.light_radius = light_radius
+        self.fov_radius = fov_radius
+        self.cell_size = cell_size
+        self.fov_lights = OrderedDict()  # fov bitmask -> (keep, packed glow)
+        self.exit_radius = exit_radius
+        self.spotlight_range = spotlight_range
+        self.spotlight_half_angle = math.radians(spotlight_half_angle_deg)
+        self.spotlight_bounds = pygame.Rect(spotlight_bounds)
+        self.spotlight_color = spotlight_color
+
+        self.player_keep, self.player_glow_rgb = light_tables(
+            light_radius, darkness_alpha, inside_alpha, player_bloom_color
+        )
+        self.exit_keep, self.exit_glow_rgb = light_tables(
+            exit_radius, darkness_alpha, inside_alpha, exit_bloom_color
+        )
+        # Bloom dominance: no player bloom inside the exit bloom
+        self.exit_disc = radial_distance(exit_radius) < exit_radius
+        self.darkness_alpha = darkness_alpha
+        self.dark_keep = int(round((255 - darkness_alpha) * LIGHT_ONE / 255))
+        self.exit_alpha = (255 - (self.exit_keep * 255 >> 8)).astype(np.uint8)
+
+        w, h = window_size
+        self.static_keep = np.full((w, h), self.dark_keep, dtype=np.uint32)
+        self.static_glow = np.zeros((w, h), dtype=np.uint32)
+        self.player_glow_allowed = np.ones((w, h), dtype=bool)
+        self.darkness = pygame.Surface(window_size, pygame.SRCALPHA)
+        self.darkness.fill((0, 0, 0, darkness_alpha))
+        self.static_frame = pygame.Surface(window_size)
+        self.exit_clip = None
+
+        # Spotlight angle bins, relative to the exit, over the part of the
+        # range square the cone can be seen in. In range: [0, BINS). Out of
+        # range: shifted up by 2 * BINS, so (bin - beam) & (4 * BINS - 1)
+        # lands in the zero middle of the lookup table for any beam.
+        r = spotlight_range
+        self.bins_rect = pygame.Rect(-r, -r, 2 * r, 2 * r).clip(self.spotlight_bounds)
+        xs = np.arange(self.bins_rect.left, self.bins_rect.right, dtype=np.float32) + 0.5
+        ys = np.arange(self.bins_rect.top, self.bins_rect.bottom, dtype=np.float32) + 0.5
+        ang = np.arctan2(ys[None, :], xs[:, None])
+        bins = np.rint(ang / math.tau * SPOTLIGHT_ANGLE_BINS).astype(np.int32) & (SPOTLIGHT_ANGLE_BINS - 1)
+        out_of_range = (xs[:, None] ** 2 + ys[None, :] ** 2) > r * r
+        self.angle_bins = (bins + out_of_range * (2 * SPOTLIGHT_ANGLE_BINS)).astype(np.uint16)
+        self.bin_mask = 4 * SPOTLIGHT_ANGLE_BINS - 1
+
+        # Full intensity inside the half-angle, fading out by the widest of
+        # the blit path's soft layers (1.55x).
+        diff = np.arange(SPOTLIGHT_ANGLE_BINS, dtype=np.float32) / SPOTLIGHT_ANGLE_BINS * math.tau
+        diff = np.abs((diff + math.pi) % math.tau - math.pi)
+        half = self.spotlight_half_angle
+        self.cone = 1.0 - smoothstep(half, half * 1.55, diff)
+        self.cone_rects = {}
+
+        self.spot_lut = None    # packed tables need the screen's pixel format
+        self.exit_center = None
+
+    def pack_tables(self, screen):
+        self.player_glow = pack_rgb(self.player_glow_rgb, screen)
+        self.exit_glow = pack_rgb(self.exit_glow_rgb, screen)
+        n = SPOTLIGHT_ANGLE_BINS
+        lut_rgb = np.zeros((4 * n, 3), dtype=np.float32)
+        lut_rgb[:n] = self.cone[:, None] * np.array(self.spotlight_color, dtype=np.float32)
+        lut_rgb[3 * n:] = lut_rgb[:n]  # negative differences wrap to the top quarter
+        self.spot_lut = pack_rgb(np.rint(lut_rgb), screen)
+
+    def player_light(self, player_fov):
+        """Player keep and glow tables, cut down to the field of view if given."""
+        if player_fov is None or self.fov_radius is None:
+            return self.player_keep, self.player_glow
+        entry = self.fov_lights.get(player_fov)
+        if entry is not None:
+            self.fov_lights.move_to_end(player_fov)
+            return entry
+
+        visible = np.zeros(self.player_keep.shape, dtype=bool)
+        for r in fov_tile_rects(player_fov, self.fov_radius, self.cell_size, self.light_radius):
+            visible[rect_slices(r)] = True
+        entry = self.fov_lights[player_fov] = (
+            np.where(visible, self.player_keep, self.dark_keep).astype(np.uint32),
+            np.where(visible, self.player_glow, 0).astype(np.uint32),
+        )
+        if len(self.fov_lights) > FOV_LIGHT_CACHE_SIZE:
+            self.fov_lights.popitem(last=False)
+        return entry
+
+    def move_exit(self, exit_center):
+        """Move the exit light in the keep/glow maps and the darkness overlay."""
+        self.exit_center = exit_center
+        alpha = pygame.surfarray.pixels_alpha(self.darkness)
+        if self.exit_clip is not None:
+            dst = rect_slices(self.exit_clip[0])
+            self.static_keep[dst] = self.dark_keep
+            self.static_glow[dst] = 0
+            self.player_glow_allowed[dst] = True
+            alpha[dst] = self.darkness_alpha
+
+        r = self.exit_radius
+        self.exit_clip = clip_stamp(self.window_rect, (exit_center[0] - r, exit_center[1] - r),
+                                    self.exit_keep.shape)
+        if self.exit_clip is not None:
+            rect, src = self.exit_clip
+            dst = rect_slices(rect)
+            self.static_keep[dst] = self.exit_keep[src]
+            self.static_glow[dst] = self.exit_glow[src]
+            self.player_glow_allowed[dst] = ~self.exit_disc[src]
+            alpha[dst] = self.exit_alpha[src]
+        del alpha  # unlock
+
+    def bake(self, screen, exit_center):
+        """Static frame from the world currently on screen, with the exit at exit_center."""
+        self.move_exit(exit_center)
+        screen.blit(self.darkness, (0, 0))
+        if self.exit_clip is not None:
+            view = rect_slices(self.exit_clip[0])
+            pixels = pygame.surfarray.pixels2d(screen)
+            pixels[view] = add_packed(pixels[view], self.static_glow[view])
+            del pixels
+        self.static_frame.blit(screen, (0, 0))
+
+    def warm(self, spotlight_angle, ahead_rad=0.0):
+        """Cone bounding boxes for the first beam angles; the tables are built in __init__."""
+        first = self.beam_bin(spotlight_angle)
+        for i in range(int(ahead_rad / math.tau * SPOTLIGHT_ANGLE_BINS) + 1):
+            self.cone_rect((first + i) & (SPOTLIGHT_ANGLE_BINS - 1))
+
+    def beam_bin(self, angle_rad):
+        return int(round(angle_rad / math.tau * SPOTLIGHT_ANGLE_BINS)) & (SPOTLIGHT_ANGLE_BINS - 1)
+
+    def cone_rect(self, beam):
+        """Bounding box of the cone for a beam bin, relative to the exit."""
+        rect = self.cone_rects.get(beam)
+        if rect is None:
+            angle = beam / SPOTLIGHT_ANGLE_BINS * math.tau
+            spread = self.spotlight_half_angle * 1.55
+            points = [(0, 0)]
+            for s in range(SPOTLIGHT_POLY_STEPS + 1):
+                a = angle - spread + 2 * spread * s / SPOTLIGHT_POLY_STEPS
+                points.append((math.cos(a) * self.spotlight_range, math.sin(a) * self.spotlight_range))
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            rect = pygame.Rect(int(min(xs)) - 1, int(min(ys)) - 1,
+                               int(max(xs) - min(xs)) + 3, int(max(ys) - min(ys)) + 3)
+            rect = rect.clip(self.bins_rect)
+            self.cone_rects[beam] = rect
+        return rect
+
+    def spot_glow(self, rect, beam):
+        """Packed spotlight glow over a screen rect (zero outside the bins table)."""
+        ex, ey = self.exit_center
+        table_rect = self.bins_rect.move(ex, ey)
+        inside = rect.clip(table_rect)
+        if inside == rect:
+            glow = None
+        else:
+            glow = np.zeros(rect.size, dtype=np.uint32)
+            if inside.w <= 0 or inside.h <= 0:
+                return glow
+        local = inside.move(-table_rect.x, -table_rect.y)
+        idx = (self.angle_bins[rect_slices(local)] - np.uint16(beam)) & np.uint16(self.bin_mask)
+        spot = np.take(self.spot_lut, idx)
+        if glow is None:
+            return spot
+        glow[rect_slices(inside.move(-rect.x, -rect.y))] = spot
+        return glow
+
+    def render(self, screen, player_center, exit_center, spotlight_angle, player_sprite, player_fov=None):
+        """Lighting and the player sprite over the world already drawn on screen."""
+        if self.spot_lut is None:
+            self.pack_tables(screen)
+        player_keep, player_glow = self.player_light(player_fov)
+
+        r = self.light_radius
+        player = clip_stamp(self.window_rect, (player_center[0] - r, player_center[1] - r), self.player_keep.shape)
+        if player is not None:
+            # The world under the player light, before it is darkened
+            pixels = pygame.surfarray.pixels2d(screen)
+            player_base = pixels[rect_slices(player[0])].astype(np.uint32)
+            del pixels  # unlock the screen before blitting to it
+
+        if exit_center != self.exit_center:
+            self.bake(screen, exit_center)
+        else:
+            screen.blit(self.static_frame, (0, 0))
+
+        beam = self.beam_bin(spotlight_angle)
+        cone = self.cone_rect(beam).move(exit_center).clip(self.window_rect)
+
+        pixels = pygame.surfarray.pixels2d(screen)
+        if cone.w > 0 and cone.h > 0:
+            view = rect_slices(cone)
+            pixels[view] = add_packed(pixels[view], self.spot_glow(cone, beam))
+
+        if player is not None:
+            pr, src = player
+            view = rect_slices(pr)
+            keep = np.minimum(self.static_keep[view], player_keep[src])
+            glow = np.where(self.player_glow_allowed[view], player_glow[src], 0)
+            glow = add_packed(add_packed(glow, self.static_glow[view]), self.spot_glow(pr, beam))
+            pixels[view] = add_packed(scale_packed(player_base, keep), glow)
+        del pixels
+
+        screen.blit(player_sprite, player_sprite.get_rect(center=player_center))
+
+
+def make_maze_lighting(mode, window_size, **params):
+    """Lighting compositor for mode "blit" or "numpy" (blit if numpy is missing)."""
+    if mode not in LIGHTING_MODES:
+        raise ValueError(f"unknown lighting mode {mode!r}, expected one of {LIGHTING_MODES}")
+    if mode == "numpy":
+        if np is not None:
+            return NumpyMazeLighting(window_size, **params)
+        print("numpy is not installed, using blit lighting")
+    return MazeLighting(window_size, **params)
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+BENCH_PARAMS = dict(
+    darkness_alpha=245, inside_alpha=35,
+    light_radius=135, light_softness=10, player_bloom_color=(148, 148, 142),
+    exit_radius=52, exit_softness=6, exit_bloom_color=(119, 145, 121),
+    spotlight_range=720, spotlight_half_angle_deg=12, spotlight_color=(230, 230, 200),
+    spotlight_max_alpha=70, spotlight_soft_steps=4,
+)
+
+
+def benchmark_compositors(window_size=(1200, 800), frames=600):
+    """Time a frame (world blit + render()) for each mode with a moving player and a turning beam."""
+    screen = pygame.display.set_mode(window_size)
+    base = pygame.Surface(window_size).convert()
+    base.fill((20, 15, 15))
+    for x in range(0, window_size[0], 52):
+        pygame.draw.rect(base, (242, 235, 235), (x, 0, 26, window_size[1]))
+    sprite = pygame.Surface((31, 31), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (255, 255, 255), (15, 15), 15)
+
+    exit_center = (window_size[0] - 90, window_size[1] - 90)
+    bounds = pygame.Rect((0, 0), window_size).move(-exit_center[0], -exit_center[1])
+    for mode in LIGHTING_MODES:
+        if mode == "numpy" and np is None:
+            print("numpy: not installed")
+            continue
+        lighting = make_maze_lighting(mode, window_size, spotlight_bounds=bounds, **BENCH_PARAMS)
+        screen.blit(base, (0, 0))
+        lighting.render(screen, (100, 100), exit_center, 0.0, sprite)  # warm-up / static frame
+        times = []
+        for i in range(frames):
+            player = (100 + (i * 7) % (window_size[0] - 200), 100 + (i * 3) % (window_size[1] - 200))
+            angle = i * math.radians(20) / 60
+            t = time.perf_counter()
+            screen.blit(base, (0, 0))
+            lighting.render(screen, player, exit_center, angle, sprite)
+            times.append(time.perf_counter() - t)
+        times.sort()
+        print(f"{mode:>6}: median {times[len(times) // 2] * 1000:.2f} ms  "
+              f"p95 {times[int(len(times) * 0.95)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        pygame.init()
+        benchmark_compositors()
+        pygame.quit()
@@ -1,165 +1,386 @@
 # maze_minigame.py
+#
+# A level is prepared in two steps so the lobby can hide the setup cost:
+#
+#   start_maze_preparation(...)  runs prepare_maze() on a worker thread while
+#                                the lobby plays the zoom animation
+#   run_maze_minigame(bundle=preparation.result())
+#                                starts on the first frame with the maze,
+#                                distance field, first screen of chunks,
+#                                lighting masks and field of view ready
+#
+# Without a bundle (or with one for other settings) run_maze_minigame
+# prepares the level itself, as before.
+#
+# With a seed, the level is reproducible: the maze comes from the on-disk
+# level cache (maze_cache.py), and the spotlight and guards from an rng
+# seeded with it too.
 import random
+import threading
 import pygame
 import math
 
+import maze_cache
+import maze_core
+from maze_core import WALL
+from maze_fov import FovCache
+from maze_guards import FlowFields, GuardPatrol
+from maze_lighting import make_maze_lighting
+from maze_view import Camera, ChunkCache
+from text_cache import get_font, render_text
+
+# =========================
+# Config
+# =========================
+CELL_SIZE = 26
+FPS = 60
+
+# Mazes bigger than the window scroll; the world is drawn from chunks
+# of CHUNK_CELLS x CHUNK_CELLS tiles, built when first seen.
+CHUNK_CELLS = 16
+
+# Player light (walls cast shadows: it only reaches tiles in the
+# player's field of view, precomputed for nearby cells each frame)
+LIGHT_RADIUS_PX = 135
+LIGHT_SOFTNESS = 10
+LIGHT_FOV_RADIUS = math.ceil(LIGHT_RADIUS_PX / CELL_SIZE)
+FOV_WARM_BUDGET_S = 0.001
+FOV_PREPARE_BUDGET_S = 0.02
+
+DARKNESS_ALPHA = 245
+
+# Exit beacon
+EXIT_LIGHT_RADIUS_TILES = 2
+EXIT_LIGHT_RADIUS_PX = EXIT_LIGHT_RADIUS_TILES * CELL_SIZE
+EXIT_LIGHT_SOFTNESS = 6
+
+INSIDE_LIGHT_DARKNESS_ALPHA = 35
+
+FLOOR_BORDER = True
+FLOOR_BORDER_ALPHA = 80
+WALL_INNER_SHADE = True
+
+# Colors
+BG_COLOR = (12, 12, 14)
+
+FLOOR_COLOR = (20, 15, 15)
+FLOOR_BORDER_COLOR = (20, 15, 15)
+
+WALL_COLOR = (242, 235, 235)
+WALL_INNER_COLOR = (242, 235, 235)
+
+PLAYER_LIGHT_BLOOM_COLOR = (148, 148, 142)
+EXIT_LIGHT_BLOOM_COLOR = (119, 145, 121)
+
+EXIT_COLOR = (99, 97, 85)
+
+HUD_COLOR = (235, 235, 235)
+HUD_INSTRUCTIONS = ("Get to the center of the beacon to exit. "
+                    "Avoid the surveillance beacon, stop moving when it hits you.")
+
+PLAYER_SPRITE_PATH = "cathead maze.png"
+PLAYER_SPRITE_SIZE = int(CELL_SIZE * 1.2)  # roughly matches old circle diameter
+
+# =========================
+# Surveillance spotlight (lighthouse beam)
+# =========================
+SPOTLIGHT_RANGE_PX = 720
+SPOTLIGHT_SPEED_DEG_PER_SEC = 20
+SPOTLIGHT_COLOR = (230, 230, 200)
+SPOTLIGHT_MAX_ALPHA = 70
+SPOTLIGHT_SOFT_STEPS = 4
+SPOTLIGHT_PREPARE_AHEAD_S = 2.0  # cones rendered up front: the first seconds of sweep
+
+# =========================
+# Patrol guards (from GUARDS_FROM_LEVEL on)
+# =========================
+GUARDS_FROM_LEVEL = 3
+GUARDS_PER_LEVEL = 4
+MAX_GUARDS = 64
+GUARD_WAYPOINTS = 12               # shared targets; one flow field each
+GUARD_STEP_S = 0.3                 # seconds per tile
+GUARD_SIGHT_TILES = 4              # at most LIGHT_FOV_RADIUS (line of sight comes from the player's FOV)
+GUARD_HALF_ANGLE_DEG = 35
+GUARD_SPAWN_MIN_STEPS = 24         # path distance from the player's start
+GUARD_COLOR = (196, 58, 52)
+GUARD_CONE_COLOR = (230, 70, 60)
+GUARD_CONE_ALPHA = 55
+
+# =========================
+# Level scaling
+# =========================
+# Maze size: level 1 fits the window, then each side grows by half the
+# window's worth per level (the camera scrolls). The timer is scaled by
+# the area so bigger mazes stay finishable.
+MAZE_GROWTH_PER_LEVEL = 0.5
+
+# Beacon width: smaller at level 1 (about 2/3 smaller than before),
+# then increases per level, capped to stay passable.
+# This controls the surveillance cone half-angle (wider cone = harder).
+BASE_HALF_ANGLE_DEG = 6            # was 18; now ~2/3 smaller at level 1
+HALF_ANGLE_GROW_PER_LEVEL = 3
+MAX_HALF_ANGLE_DEG = 45
+
+
+def largest_odd_that_fits(pixels, cell):
+    n = pixels // cell
+    if n % 2 == 0:
+        n -= 1
+    return max(3, n)
+
+
+def level_settings(window_size, level, maze_size=None):
+    """(maze_w, maze_h, time limit in seconds, spotlight half-angle in degrees, guard count) for a level."""
+    level = max(1, int(level))
+    fit_w = largest_odd_that_fits(window_size[0], CELL_SIZE)
+    fit_h = largest_odd_that_fits(window_size[1], CELL_SIZE)
 
-def run_maze_minigame(window_size=(1200, 800), caption="Maze Minigame", level=1):
-    WINDOW_W, WINDOW_H = window_size
-    screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
-    pygame.display.set_caption(caption)
-    clock = pygame.time.Clock()
-
-    # =========================
-    # Config
-    # =========================
-    CELL_SIZE = 26
-    FPS = 60
-
-    def largest_odd_that_fits(pixels, cell):
-        n = pixels // cell
-        if n % 2 == 0:
-            n -= 1
-        return max(3, n)
-
-    MAZE_W = largest_odd_that_fits(WINDOW_W, CELL_SIZE)
-    MAZE_H = largest_odd_that_fits(WINDOW_H, CELL_SIZE)
-
-    # Player light
-    LIGHT_RADIUS_PX = 135
-    LIGHT_SOFTNESS = 10
-
-    DARKNESS_ALPHA = 245
-
-    # Exit beacon
-    EXIT_LIGHT_RADIUS_TILES = 2
-    EXIT_LIGHT_RADIUS_PX = EXIT_LIGHT_RADIUS_TILES * CELL_SIZE
-    EXIT_LIGHT_SOFTNESS = 6
-
-    INSIDE_LIGHT_DARKNESS_ALPHA = 35
+    # Timer: level 1 is 90s (1 min 30s), +15s each level
+    time_limit_s = 90 + (level - 1) * 15
 
-    FLOOR_BORDER = True
-    FLOOR_BORDER_ALPHA = 80
-    WALL_INNER_SHADE = True
+    growth = 1 + (level - 1) * MAZE_GROWTH_PER_LEVEL
+    if maze_size is not None:
+        maze_w, maze_h = maze_size
+    else:
+        maze_w = int(fit_w * growth) | 1
+        maze_h = int(fit_h * growth) | 1
+    time_limit_s *= max(1.0, (maze_w * maze_h) / (fit_w * fit_h))
 
-    # Colors
-    BG_COLOR = (12, 12, 14)
+    half_angle_deg = BASE_HALF_ANGLE_DEG + (level - 1) * HALF_ANGLE_GROW_PER_LEVEL
+    half_angle_deg = min(MAX_HALF_ANGLE_DEG, half_angle_deg)
 
-    FLOOR_COLOR = (20, 15, 15)
-    FLOOR_BORDER_COLOR = (20, 15, 15)
+    guard_count = 0
+    if level >= GUARDS_FROM_LEVEL:
+        guard_count = min(MAX_GUARDS, (level - GUARDS_FROM_LEVEL + 1) * GUARDS_PER_LEVEL)
+    return maze_w, maze_h, time_limit_s, half_angle_deg, guard_count
 
-    WALL_COLOR = (242, 235, 235)
-    WALL_INNER_COLOR = (242, 235, 235)
 
-    PLAYER_LIGHT_BLOOM_COLOR = (148, 148, 142)
-    EXIT_LIGHT_BLOOM_COLOR = (119, 145, 121)
+def tile_center(x, y):
+    return int((x + 0.5) * CELL_SIZE), int((y + 0.5) * CELL_SIZE)
 
-    EXIT_COLOR = (99, 97, 85)
 
-    WALL = 1
-    FLOOR = 0
+def make_chunk_renderer(maze, exit_pos):
+    """render_chunk(cx, cy) for a ChunkCache over this maze."""
+    floor_border = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+    if FLOOR_BORDER:
+        floor_border.fill((0, 0, 0, 0))
+        pygame.draw.rect(
+            floor_border,
+            (*FLOOR_BORDER_COLOR, FLOOR_BORDER_ALPHA),
+            pygame.Rect(0, 0, CELL_SIZE, CELL_SIZE),
+            width=1
+        )
 
-    # =========================
-    # Level scaling
-    # =========================
-    # Timer: level 1 is 90s (1 min 30s), +15s each level
-    level_time_limit_s = 90 + (max(1, int(level)) - 1) * 15
+    def render_chunk(cx, cy):
+        """
+        Walls, floor borders and the exit tile for one chunk. The maze never
+        changes, so a chunk is drawn once and then blitted while on screen.
+        """
+        chunk_px = CHUNK_CELLS * CELL_SIZE
+        layer = pygame.Surface((chunk_px, chunk_px)).convert()
+        layer.fill(BG_COLOR)
+        x0, y0 = cx * CHUNK_CELLS, cy * CHUNK_CELLS
+        for y in range(max(0, y0), min(maze.h, y0 + CHUNK_CELLS)):
+            for x in range(max(0, x0), min(maze.w, x0 + CHUNK_CELLS)):
+                r = pygame.Rect((x - x0) * CELL_SIZE, (y - y0) * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+                if maze.tiles[y * maze.w + x] == WALL:
+                    pygame.draw.rect(layer, WALL_COLOR, r)
+                    if WALL_INNER_SHADE:
+                        pygame.draw.rect(layer, WALL_INNER_COLOR, r.inflate(-3, -3), border_radius=6)
+                else:
+                    pygame.draw.rect(layer, FLOOR_COLOR, r)
+                    if FLOOR_BORDER:
+                        layer.blit(floor_border, r.topleft)
+                    if (x, y) == exit_pos:
+                        pygame.draw.rect(layer, EXIT_COLOR, r.inflate(-10, -10), border_radius=7)
+        return layer
+
+    return render_chunk
+
+
+# =========================
+# Level preparation
+# =========================
+class MazeBundle:
+    """Everything a level needs before its first frame. Built by prepare_maze()."""
+
+    def __init__(self, window_size, level, generator, lighting_mode, maze_size, seed):
+        self.window_size = tuple(window_size)
+        self.level = level
+        self.generator = generator
+        self.lighting_mode = lighting_mode
+        self.maze_size = maze_size
+        self.seed = seed
+
+    def matches(self, window_size, level, generator, lighting_mode, maze_size, seed):
+        return (self.window_size, self.level, self.generator, self.lighting_mode, self.maze_size, self.seed) == \
+            (tuple(window_size), level, generator, lighting_mode, maze_size, seed)
+
+
+def prepare_maze(window_size=(1200, 800), level=1, generator="backtracker", lighting_mode="blit",
+                 maze_size=None, seed=None, cache_dir=maze_cache.LEVEL_CACHE_DIR):
+    """
+    Generate and pre-render a level. Needs pygame.display set up (the chunks
+    are converted to the display format) but nothing else, so it can run on
+    a worker thread while the main thread keeps drawing.
+
+    seed: None for a new maze every time; anything else gives the same
+    level every time, loaded from cache_dir when it has been made before
+    (cache_dir=None: always generate).
+    """
+    b = MazeBundle(window_size, level, generator, lighting_mode, maze_size, seed)
+    window_w, window_h = b.window_size
+    maze_w, maze_h, b.time_limit_s, b.spotlight_half_angle_deg, guard_count = \
+        level_settings(b.window_size, level, maze_size)
+
+    # Large mazes always use the backtracker, the only one fast enough there
+    generator = maze_core.generator_for_size(maze_w, maze_h, generator)
+    b.start = maze_cache.START
+    if seed is None:
+        rng = random.Random()
+        b.maze = maze_core.generate(maze_w, maze_h, rng, generator)
+        b.exit_pos, b.distance = maze_core.farthest_floor(b.maze, b.start)
+    else:
+        # The maze is seeded on its own, so it is the same whether it is
+        # generated or loaded; this rng is for everything after it
+        rng = random.Random(f"level:{seed}")
+        if cache_dir is None:
+            b.maze = maze_core.generate(maze_w, maze_h, random.Random(seed), generator)
+            b.exit_pos, b.distance = maze_core.farthest_floor(b.maze, b.start)
+        else:
+            b.maze, b.exit_pos, b.distance = maze_cache.cached_level(seed, maze_w, maze_h, generator, cache_dir)
+    b.exit_center = tile_center(*b.exit_pos)
+
+    # World coordinates: pixels, with the maze's top-left tile at (0, 0)
+    maze_px_w = maze_w * CELL_SIZE
+    maze_px_h = maze_h * CELL_SIZE
+    b.camera = Camera(b.window_size, (maze_px_w, maze_px_h))
+    b.camera.follow(*tile_center(*b.start))
+
+    # Keep about two screens' worth of chunks; the first screen is built now
+    chunk_px = CHUNK_CELLS * CELL_SIZE
+    visible_chunks = (window_w // chunk_px + 2) * (window_h // chunk_px + 2)
+    b.chunks = ChunkCache(chunk_px, make_chunk_renderer(b.maze, b.exit_pos), max_chunks=2 * visible_chunks)
+    b.chunks.warm(b.camera)
+
+    b.fov = FovCache(b.maze, LIGHT_FOV_RADIUS)
+    b.fov.warm(*b.start, FOV_PREPARE_BUDGET_S)
+
+    # Guards start well away from the player and walk between shared
+    # waypoints; every waypoint's flow field is built here, not mid-level.
+    b.guards = None
+    if guard_count:
+        maze = b.maze
+        cells = [maze.index(x, y) for y in range(1, maze_h, 2) for x in range(1, maze_w, 2)]
+        spawns = [i for i in cells if b.distance[i] >= GUARD_SPAWN_MIN_STEPS] or cells
+        waypoints = rng.sample(cells, min(GUARD_WAYPOINTS, len(cells)))
+        fields = FlowFields(maze)
+        for target in waypoints:
+            fields.get(target)
+        b.guards = GuardPatrol(
+            maze, fields, waypoints, spawns, guard_count, rng,
+            cell_size=CELL_SIZE,
+            step_s=GUARD_STEP_S,
+            sight_tiles=GUARD_SIGHT_TILES,
+            half_angle_deg=GUARD_HALF_ANGLE_DEG,
+            fov_radius=LIGHT_FOV_RADIUS,
+            body_color=GUARD_COLOR,
+            cone_color=GUARD_CONE_COLOR,
+            cone_alpha=GUARD_CONE_ALPHA,
+        )
 
-    # Beacon width: smaller at level 1 (about 2/3 smaller than before),
-    # then increases per level, capped to stay passable.
-    # This controls the surveillance cone half-angle (wider cone = harder).
-    BASE_HALF_ANGLE_DEG = 6            # was 18; now ~2/3 smaller at level 1
-    HALF_ANGLE_GROW_PER_LEVEL = 3
-    MAX_HALF_ANGLE_DEG = 45
+    # Where the spotlight can ever be seen: the part of the beam's reach the
+    # camera can show (the maze, or the window around it when the maze is
+    # smaller). Cones are cropped to it; draw time clips them to the view.
+    exit_cx, exit_cy = b.exit_center
+    reach = pygame.Rect(exit_cx - SPOTLIGHT_RANGE_PX, exit_cy - SPOTLIGHT_RANGE_PX,
+                        2 * SPOTLIGHT_RANGE_PX, 2 * SPOTLIGHT_RANGE_PX)
+    seen_rect = pygame.Rect(0, 0, maze_px_w, maze_px_h).union(b.camera.rect).clip(reach)
+    b.spotlight_angle = rng.random() * math.tau
+    b.lighting = make_maze_lighting(
+        lighting_mode, b.window_size,
+        spotlight_bounds=seen_rect.move(-exit_cx, -exit_cy),
+        fov_radius=LIGHT_FOV_RADIUS,
+        cell_size=CELL_SIZE,
+        darkness_alpha=DARKNESS_ALPHA,
+        inside_alpha=INSIDE_LIGHT_DARKNESS_ALPHA,
+        light_radius=LIGHT_RADIUS_PX,
+        light_softness=LIGHT_SOFTNESS,
+        player_bloom_color=PLAYER_LIGHT_BLOOM_COLOR,
+        exit_radius=EXIT_LIGHT_RADIUS_PX,
+        exit_softness=EXIT_LIGHT_SOFTNESS,
+        exit_bloom_color=EXIT_LIGHT_BLOOM_COLOR,
+        spotlight_range=SPOTLIGHT_RANGE_PX,
+        spotlight_half_angle_deg=b.spotlight_half_angle_deg,
+        spotlight_color=SPOTLIGHT_COLOR,
+        spotlight_max_alpha=SPOTLIGHT_MAX_ALPHA,
+        spotlight_soft_steps=SPOTLIGHT_SOFT_STEPS,
+    )
+    b.lighting.warm(b.spotlight_angle, math.radians(SPOTLIGHT_SPEED_DEG_PER_SEC) * SPOTLIGHT_PREPARE_AHEAD_S)
 
-    scaled_half_angle_deg = BASE_HALF_ANGLE_DEG + (max(1, int(level)) - 1) * HALF_ANGLE_GROW_PER_LEVEL
-    scaled_half_angle_deg = min(MAX_HALF_ANGLE_DEG, scaled_half_angle_deg)
+    # Load + scale player sprite (cat head) to match old circle size
+    cat_img_raw = pygame.image.load(PLAYER_SPRITE_PATH).convert_alpha()
+    b.player_sprite = pygame.transform.smoothscale(cat_img_raw, (PLAYER_SPRITE_SIZE, PLAYER_SPRITE_SIZE))
+    return b
+
+
+class MazePreparation:
+    """prepare_maze() running on a daemon thread."""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self.bundle = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="maze-prepare", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            self.bundle = prepare_maze(**self.settings)
+        except Exception as e:  # handed to the main thread by result()
+            self.error = e
+
+    def ready(self):
+        return not self.thread.is_alive()
+
+    def result(self):
+        """The bundle, waiting for the worker if it is not done yet."""
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.bundle
+
+
+def start_maze_preparation(window_size=(1200, 800), level=1, generator="backtracker", lighting_mode="blit",
+                           maze_size=None, seed=None):
+    """Start preparing a level in the background; pass .result() to run_maze_minigame."""
+    return MazePreparation(window_size=window_size, level=level, generator=generator,
+                           lighting_mode=lighting_mode, maze_size=maze_size, seed=seed)
+
+
+def run_maze_minigame(window_size=(1200, 800), caption="Maze Minigame", level=1, lighting_mode="blit",
+                      generator="backtracker", maze_size=None, bundle=None, seed=None):
+    """
+    lighting_mode: "blit" (blend-mode blits) or "numpy" (surfarray light map).
+    generator: one of maze_core.GENERATORS (mazes over maze_core.LARGE_MAZE_TILES
+        always use the backtracker).
+    maze_size: (w, h) in tiles, both odd, to override the level's size.
+    seed: replay a fixed level (see prepare_maze); None for a new one.
+    bundle: a MazeBundle from prepare_maze() / start_maze_preparation() for
+        these same settings; anything else is ignored and the level is
+        prepared here.
+    """
+    WINDOW_W, WINDOW_H = window_size
+    screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
+    pygame.display.set_caption(caption)
+    clock = pygame.time.Clock()
 
-    # =========================
-    # Surveillance spotlight (lighthouse beam)
-    # =========================
-    SPOTLIGHT_RANGE_PX = 720
-    SPOTLIGHT_HALF_ANGLE_DEG = scaled_half_angle_deg
-    SPOTLIGHT_SPEED_DEG_PER_SEC = 20
-    SPOTLIGHT_COLOR = (230, 230, 200)
-    SPOTLIGHT_MAX_ALPHA = 70
-    SPOTLIGHT_SOFT_STEPS = 4
+    if bundle is None or not bundle.matches(window_size, level, generator, lighting_mode, maze_size, seed):
+        bundle = prepare_maze(window_size, level, generator, lighting_mode, maze_size, seed)
 
     # =========================
     # Helpers
     # =========================
-    def in_bounds(x, y, w, h):
-        return 0 <= x < w and 0 <= y < h
-
-    def generate_maze(w, h, rng):
-        grid = [[WALL for _ in range(w)] for _ in range(h)]
-        sx, sy = 1, 1
-        grid[sy][sx] = FLOOR
-
-        stack = [(sx, sy)]
-        dirs = [(2, 0), (-2, 0), (0, 2), (0, -2)]
-
-        while stack:
-            cx, cy = stack[-1]
-            neighbors = []
-            for dx, dy in dirs:
-                nx, ny = cx + dx, cy + dy
-                if in_bounds(nx, ny, w, h) and grid[ny][nx] == WALL:
-                    neighbors.append((nx, ny, dx, dy))
-
-            if neighbors:
-                nx, ny, dx, dy = rng.choice(neighbors)
-                grid[cy + dy // 2][cx + dx // 2] = FLOOR
-                grid[ny][nx] = FLOOR
-                stack.append((nx, ny))
-            else:
-                stack.pop()
-
-        return grid
-
-    def find_farthest_floor(grid, start):
-        from collections import deque
-        h = len(grid)
-        w = len(grid[0])
-        sx, sy = start
-
-        q = deque([(sx, sy)])
-        dist = {(sx, sy): 0}
-        far = (sx, sy)
-
-        while q:
-            x, y = q.popleft()
-            if dist[(x, y)] > dist[far]:
-                far = (x, y)
-            for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                nx, ny = x + dx, y + dy
-                if in_bounds(nx, ny, w, h) and grid[ny][nx] == FLOOR and (nx, ny) not in dist:
-                    dist[(nx, ny)] = dist[(x, y)] + 1
-                    q.append((nx, ny))
-        return far
-
-    def make_subtractive_light_mask(radius_px, softness_steps):
-        size = radius_px * 2
-        s = pygame.Surface((size, size), pygame.SRCALPHA)
-        cx, cy = radius_px, radius_px
-        for i in range(softness_steps):
-            t = i / max(1, softness_steps - 1)
-            r = int(radius_px * (0.35 + 0.65 * t))
-            alpha = int(255 * (1.0 - t))
-            pygame.draw.circle(s, (0, 0, 0, alpha), (cx, cy), r)
-        return s
-
-    def make_additive_bloom_mask(radius_px, softness_steps, color, max_alpha):
-        size = radius_px * 2
-        s = pygame.Surface((size, size), pygame.SRCALPHA)
-        cx, cy = radius_px, radius_px
-        for i in range(softness_steps):
-            t = i / max(1, softness_steps - 1)
-            r = int(radius_px * (0.30 + 0.70 * t))
-            alpha = int(max_alpha * (1.0 - t))
-            pygame.draw.circle(s, (*color, alpha), (cx, cy), r)
-        return s
-
     def angle_wrap_pi(a):
         while a <= -math.pi:
             a += 2 * math.pi
@@ -178,85 +399,7 @@ def run_maze_minigame(window_size=(1200, 800), caption="Maze Minigame", level=1)
         diff = angle_wrap_pi(point_ang - angle_rad)
         return abs(diff) <= half_angle_rad
 
-    def draw_spotlight(surface, origin, angle_rad):
-        cone_surf = pygame.Surface((WINDOW_W, WINDOW_H), pygame.SRCALPHA)
-
-        half_angle_base = math.radians(SPOTLIGHT_HALF_ANGLE_DEG)
-        layers = SPOTLIGHT_SOFT_STEPS
-
-        for i in range(layers):
-            t = i / max(1, layers - 1)
-            half_angle = half_angle_base * (1.0 + 0.55 * t)
-            alpha = int(SPOTLIGHT_MAX_ALPHA * (1.0 - 0.75 * t))
-
-            points = [origin]
-            steps = 22
-            start_ang = angle_rad - half_angle
-            end_ang = angle_rad + half_angle
-
-            for s in range(steps + 1):
-                u = s / steps
-                a = start_ang + (end_ang - start_ang) * u
-                x = origin[0] + math.cos(a) * SPOTLIGHT_RANGE_PX
-                y = origin[1] + math.sin(a) * SPOTLIGHT_RANGE_PX
-                points.append((x, y))
-
-            pygame.draw.polygon(cone_surf, (*SPOTLIGHT_COLOR, alpha), points)
-
-        surface.blit(cone_surf, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-
-    # Setup
-    rng = random.Random()
-    grid = generate_maze(MAZE_W, MAZE_H, rng)
-    start = (1, 1)
-    exit_pos = find_farthest_floor(grid, start)
-
-    MAZE_PIXEL_W = MAZE_W * CELL_SIZE
-    MAZE_PIXEL_H = MAZE_H * CELL_SIZE
-    OFFSET_X = (WINDOW_W - MAZE_PIXEL_W) // 2
-    OFFSET_Y = (WINDOW_H - MAZE_PIXEL_H) // 2
-
-    def tile_rect(x, y):
-        return pygame.Rect(
-            x * CELL_SIZE + OFFSET_X,
-            y * CELL_SIZE + OFFSET_Y,
-            CELL_SIZE,
-            CELL_SIZE
-        )
-
-    px, py = start
-    move_cooldown = 0.0
-    MOVE_DELAY = 0.09
-
-    outside_darkness = pygame.Surface((WINDOW_W, WINDOW_H), pygame.SRCALPHA)
-    inside_darkness = pygame.Surface((WINDOW_W, WINDOW_H), pygame.SRCALPHA)
-
-    player_light_mask = make_subtractive_light_mask(LIGHT_RADIUS_PX, LIGHT_SOFTNESS)
-    exit_light_mask = make_subtractive_light_mask(EXIT_LIGHT_RADIUS_PX, EXIT_LIGHT_SOFTNESS)
-
-    player_bloom_mask = make_additive_bloom_mask(
-        LIGHT_RADIUS_PX, LIGHT_SOFTNESS, color=PLAYER_LIGHT_BLOOM_COLOR, max_alpha=95
-    )
-    exit_bloom_mask = make_additive_bloom_mask(
-        EXIT_LIGHT_RADIUS_PX, EXIT_LIGHT_SOFTNESS, color=EXIT_LIGHT_BLOOM_COLOR, max_alpha=170
-    )
-
-    floor_border = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-    if FLOOR_BORDER:
-        floor_border.fill((0, 0, 0, 0))
-        pygame.draw.rect(
-            floor_border,
-            (*FLOOR_BORDER_COLOR, FLOOR_BORDER_ALPHA),
-            pygame.Rect(0, 0, CELL_SIZE, CELL_SIZE),
-            width=1
-        )
-
-    font = pygame.font.SysFont(None, 34)
-
-    # Load + scale player sprite (cat head) to match old circle size
-    cat_img_raw = pygame.image.load("cathead maze.png").convert_alpha()
-    PLAYER_SPRITE_SIZE = int(CELL_SIZE * 1.2)  # roughly matches old circle diameter
-    cat_img = pygame.transform.smoothscale(cat_img_raw, (PLAYER_SPRITE_SIZE, PLAYER_SPRITE_SIZE))
+    font = get_font(None, 34)
 
     def show_result_screen(lines, delay_ms=900):
         overlay = pygame.Surface((WINDOW_W, WINDOW_H))
@@ -273,14 +416,32 @@ def run_maze_minigame(window_size=(1200, 800), caption="Maze Minigame", level=1)
         pygame.display.flip()
         pygame.time.delay(delay_ms)
 
-    ex, ey = exit_pos
-    exit_cx = int((ex + 0.5) * CELL_SIZE + OFFSET_X)
-    exit_cy = int((ey + 0.5) * CELL_SIZE + OFFSET_Y)
+    # Setup (all prepared in the bundle)
+    maze = bundle.maze
+    exit_pos = bundle.exit_pos
+    exit_cx, exit_cy = bundle.exit_center
+    camera = bundle.camera
+    chunks = bundle.chunks
+    fov = bundle.fov
+    lighting = bundle.lighting
+    guards = bundle.guards
+    cat_img = bundle.player_sprite
+    level_time_limit_s = bundle.time_limit_s
+
+    px, py = bundle.start
+    move_cooldown = 0.0
+    MOVE_DELAY = 0.09
 
     spotlight_origin = (exit_cx, exit_cy)
-    spotlight_angle = rng.random() * math.tau
+    spotlight_angle = bundle.spotlight_angle
     spotlight_speed = math.radians(SPOTLIGHT_SPEED_DEG_PER_SEC)
-    spotlight_half_angle = math.radians(SPOTLIGHT_HALF_ANGLE_DEG)
+    spotlight_half_angle = math.radians(bundle.spotlight_half_angle_deg)
+
+    # HUD
+    ui_font = get_font(None, 28)
+    hud_msg = render_text(ui_font, HUD_INSTRUCTIONS, HUD_COLOR)
+    hud_info = None
+    hud_info_s = None
 
     # Timer start
     start_ms = pygame.time.get_ticks()
@@ -317,13 +478,12 @@ def run_maze_minigame(window_size=(1200, 800), caption="Maze Minigame", level=1)
 
             if dx or dy:
                 nx, ny = px + dx, py + dy
-                if in_bounds(nx, ny, MAZE_W, MAZE_H) and grid[ny][nx] == FLOOR:
+                if maze.is_floor(nx, ny):
                     px, py = nx, ny
                     move_cooldown = MOVE_DELAY
                     moved_this_tick = True
 
-        player_cx = int((px + 0.5) * CELL_SIZE + OFFSET_X)
-        player_cy = int((py + 0.5) * CELL_SIZE + OFFSET_Y)
+        player_cx, player_cy = tile_center(px, py)
 
         # Caught check: moved while in spotlight
         if moved_this_tick:
@@ -345,6 +505,20 @@ def run_maze_minigame(window_size=(1200, 800), caption="Maze Minigame", level=1)
                 )
                 return "lose_half"
 
+        # Caught check: in a patrol guard's view cone
+        if guards is not None:
+            guards.update(dt)
+            if guards.spots(px, py, fov.get(px, py)):
+                show_result_screen(
+                    [
+                        "SPOTTED BY A GUARD!",
+                        "Keep out of the red view cones.",
+                        "Returning to the lobby..."
+                    ],
+                    delay_ms=1100
+                )
+                return "lose_half"
+
         # Timer check
         elapsed_s = (pygame.time.get_ticks() - start_ms) / 1000.0
         remaining_s = int(math.ceil(level_time_limit_s - elapsed_s))
@@ -370,78 +544,22 @@ def run_maze_minigame(window_size=(1200, 800), caption="Maze Minigame", level=1)
             )
             return "win"
 
-        # Draw world
-        screen.fill(BG_COLOR)
-        for y in range(MAZE_H):
-            for x in range(MAZE_W):
-                r = tile_rect(x, y)
-                if grid[y][x] == WALL:
-                    pygame.draw.rect(screen, WALL_COLOR, r)
-                    if WALL_INNER_SHADE:
-                        pygame.draw.rect(screen, WALL_INNER_COLOR, r.inflate(-3, -3), border_radius=6)
-                else:
-                    pygame.draw.rect(screen, FLOOR_COLOR, r)
-                    if FLOOR_BORDER:
-                        screen.blit(floor_border, r.topleft)
-
-        pygame.draw.rect(screen, EXIT_COLOR, tile_rect(ex, ey).inflate(-10, -10), border_radius=7)
-
-        # Lighting base
-        outside_darkness.fill((0, 0, 0, DARKNESS_ALPHA))
-
-        p_mask_x = player_cx - LIGHT_RADIUS_PX
-        p_mask_y = player_cy - LIGHT_RADIUS_PX
-        outside_darkness.blit(player_light_mask, (p_mask_x, p_mask_y), special_flags=pygame.BLEND_RGBA_SUB)
-
-        e_mask_x = exit_cx - EXIT_LIGHT_RADIUS_PX
-        e_mask_y = exit_cy - EXIT_LIGHT_RADIUS_PX
-        outside_darkness.blit(exit_light_mask, (e_mask_x, e_mask_y), special_flags=pygame.BLEND_RGBA_SUB)
-
-        screen.blit(outside_darkness, (0, 0))
-
-        inside_darkness.fill((0, 0, 0, 0))
-        pygame.draw.circle(
-            inside_darkness, (0, 0, 0, INSIDE_LIGHT_DARKNESS_ALPHA),
-            (player_cx, player_cy), LIGHT_RADIUS_PX
-        )
-        pygame.draw.circle(
-            inside_darkness, (0, 0, 0, INSIDE_LIGHT_DARKNESS_ALPHA),
-            (exit_cx, exit_cy), EXIT_LIGHT_RADIUS_PX
-        )
-        screen.blit(inside_darkness, (0, 0))
-
-        # Draw player as cat sprite AFTER darkness so it doesn't get greyed out
-        cat_rect = cat_img.get_rect(center=(player_cx, player_cy))
-        screen.blit(cat_img, cat_rect)
-
-        # Spotlight beam
-        draw_spotlight(screen, spotlight_origin, spotlight_angle)
-
-        # Bloom dominance: exit overrides player in overlap
-        screen.blit(player_bloom_mask, (p_mask_x, p_mask_y), special_flags=pygame.BLEND_RGBA_ADD)
-
-        erase = pygame.Surface((EXIT_LIGHT_RADIUS_PX * 2, EXIT_LIGHT_RADIUS_PX * 2), pygame.SRCALPHA)
-        erase.fill((0, 0, 0, 0))
-        pygame.draw.circle(
-            erase, (0, 0, 0, 255),
-            (EXIT_LIGHT_RADIUS_PX, EXIT_LIGHT_RADIUS_PX), EXIT_LIGHT_RADIUS_PX
-        )
-        screen.blit(erase, (e_mask_x, e_mask_y), special_flags=pygame.BLEND_RGBA_SUB)
-
-        screen.blit(exit_bloom_mask, (e_mask_x, e_mask_y), special_flags=pygame.BLEND_RGBA_ADD)
-
-        # UI
-        ui_font = pygame.font.SysFont(None, 28)
-        msg = ui_font.render(
-            "Get to the center of the beacon to exit. Avoid the surveillance beacon, stop moving when it hits you.",
-            True, (235, 235, 235)
-        )
-        screen.blit(msg, (14, 14))
-
-        info = ui_font.render(
-            f"Level: {int(level)}    Time: {remaining_s}s",
-            True, (235, 235, 235)
+        # Draw world (pre-rendered chunks), lighting and the player
+        camera.follow(player_cx, player_cy)
+        chunks.draw(screen, camera)
+        lighting.render(
+            screen, camera.to_screen(player_cx, player_cy), camera.to_screen(exit_cx, exit_cy),
+            spotlight_angle, cat_img, player_fov=fov.get(px, py)
         )
-        screen.blit(info, (14, 14 + 28 + 6))
+        if guards is not None:
+            guards.draw(screen, camera)
+        fov.warm(px, py, FOV_WARM_BUDGET_S)
+
+        # UI: the time line is re-rendered only when the seconds change
+        if remaining_s != hud_info_s:
+            hud_info_s = remaining_s
+            hud_info = ui_font.render(f"Level: {int(level)}    Time: {remaining_s}s", True, HUD_COLOR)
+        screen.blit(hud_msg, (14, 14))
+        screen.blit(hud_info, (14, 14 + 28 + 6))
 
         pygame.display.flip()
@@ -0,0 +1,95 @@
+# maze_view.py
+#
+# Scrolling view for mazes larger than the window.
+#
+#   Camera      follows a world point, clamped to the world; when the world is
+#               smaller than the view it is centred instead
+#   ChunkCache  the world split into square chunks, each pre-rendered on first
+#               sight and kept in an LRU, so memory and per-frame cost depend
+#               on the window size, not the maze size
+#
+# World coordinates are pixels with the maze's top-left tile at (0, 0).
+
+from collections import OrderedDict
+
+import pygame
+
+
+class Camera:
+    def __init__(self, view_size, world_size):
+        self.view_w, self.view_h = view_size
+        self.world_w, self.world_h = world_size
+        self.x = 0
+        self.y = 0
+
+    def _axis(self, center, view, world):
+        if world <= view:
+            return -((view - world) // 2)
+        return max(0, min(world - view, int(center) - view // 2))
+
+    def follow(self, wx, wy):
+        """Centre the view on world point (wx, wy)."""
+        self.x = self._axis(wx, self.view_w, self.world_w)
+        self.y = self._axis(wy, self.view_h, self.world_h)
+
+    def to_screen(self, wx, wy):
+        return wx - self.x, wy - self.y
+
+    @property
+    def rect(self):
+        """The visible part of the world."""
+        return pygame.Rect(self.x, self.y, self.view_w, self.view_h)
+
+
+class ChunkCache:
+    """
+    render_chunk(cx, cy) -> Surface of chunk_px x chunk_px for the world area
+    starting at (cx * chunk_px, cy * chunk_px). Chunks are built the first
+    time they are on screen; the least recently drawn ones are dropped once
+    there are more than max_chunks.
+    """
+
+    def __init__(self, chunk_px, render_chunk, max_chunks):
+        self.chunk_px = chunk_px
+        self.render_chunk = render_chunk
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (cx, cy) -> Surface
+        self.builds = 0
+        self.evictions = 0
+
+    def get(self, cx, cy):
+        key = (cx, cy)
+        surf = self.chunks.get(key)
+        if surf is not None:
+            self.chunks.move_to_end(key)
+            return surf
+
+        surf = self.render_chunk(cx, cy)
+        self.builds += 1
+        self.chunks[key] = surf
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def visible(self, camera):
+        """(cx, cy) of every chunk the camera can see."""
+        size = self.chunk_px
+        cx0 = camera.x // size
+        cy0 = camera.y // size
+        cx1 = (camera.x + camera.view_w - 1) // size
+        cy1 = (camera.y + camera.view_h - 1) // size
+        return [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+
+    def warm(self, camera):
+        """Build the chunks for the camera's view without drawing them."""
+        for cx, cy in self.visible(camera):
+            self.get(cx, cy)
+
+    def draw(self, screen, camera):
+        size = self.chunk_px
+        for cx, cy in self.visible(camera):
+            screen.blit(self.get(cx, cy), (cx * size - camera.x, cy * size - camera.y))
+
+    def clear(self):
+        self.chunks.clear()
@@ -0,0 +1,72 @@
+# spatial_hash.py
+#
+# Uniform-grid spatial hash: items are bucketed by the grid cell of a point
+# (usually their centre), and a query only looks at the buckets a circle
+# overlaps, so "what is near me" costs the same with 10 items or 1000.
+#
+#   grid = SpatialHash(cell_size)
+#   grid.insert(item, x, y)    item must be hashable
+#   grid.move(item, x, y)      cheap when the item stays in its cell
+#   grid.remove(item)
+#   grid.query(x, y, radius)   list of the items in the buckets overlapping the
+#                              circle; callers still do their own exact test,
+#                              and may remove items while going through it
+#
+# Pick cell_size around the largest query radius: a query then touches at
+# most 3x3 buckets.
+
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.buckets = {}  # (cx, cy) -> set of items
+        self.cells = {}    # item -> (cx, cy)
+
+    def cell_of(self, x, y):
+        return int(x) // self.cell_size, int(y) // self.cell_size
+
+    def insert(self, item, x, y):
+        key = self.cell_of(x, y)
+        self.cells[item] = key
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = set()
+        bucket.add(item)
+
+    def remove(self, item):
+        key = self.cells.pop(item, None)
+        if key is None:
+            return
+        bucket = self.buckets[key]
+        bucket.discard(item)
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, item, x, y):
+        key = self.cell_of(x, y)
+        if self.cells.get(item) != key:
+            self.remove(item)
+            self.insert(item, x, y)
+
+    def query(self, x, y, radius):
+        size = self.cell_size
+        cx0, cy0 = int(x - radius) // size, int(y - radius) // size
+        cx1, cy1 = int(x + radius) // size, int(y + radius) // size
+        buckets = self.buckets
+        found = []
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+    def __contains__(self, item):
+        return item in self.cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    def clear(self):
+        self.buckets.clear()
+        self.cells.clear()
@@ -0,0 +1,148 @@
+# text_cache.py
+#
+# Shared text cache for the minigames.
+#
+# Rendering text with pygame rasterizes the glyphs every call, and most HUD
+# text (task lists, instructions, score) is the same from one frame to the
+# next. This keeps the finished surfaces around instead.
+#
+#   get_font(name=None, size=24) -> Font
+#   render_text(font, text, color, antialias=True) -> Surface
+#   wrap_text(text, max_width, font) -> tuple of lines
+#
+# get_font loads each (name, size) once per process, so every minigame (and
+# every run of one) gets the same Font objects, and their rendered text stays
+# in the cache between runs. render_text and wrap_text are LRU caches.
+# Surfaces returned by render_text are shared, so never draw on them.
+#
+# Counters:
+#   stats              totals since start (or reset_stats())
+#   last_frame_stats   counts for the previous frame, after end_frame()
+# "renders" is the number of real font rasterizations; on a frame where no
+# text changed it should be 0.
+
+from collections import OrderedDict
+
+import pygame
+
+TEXT_CACHE_SIZE = 256
+WRAP_CACHE_SIZE = 64
+
+STAT_KEYS = ("renders", "hits", "wrap_layouts", "wrap_hits", "evictions")
+
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store value. Returns True if something was evicted to make room."""
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+            return True
+        return False
+
+    def clear(self):
+        self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
+
+
+_fonts = {}  # (name, size) -> Font
+_surfaces = LRUCache(TEXT_CACHE_SIZE)
+_layouts = LRUCache(WRAP_CACHE_SIZE)
+
+stats = dict.fromkeys(STAT_KEYS, 0)
+last_frame_stats = dict.fromkeys(STAT_KEYS, 0)
+_frame = dict.fromkeys(STAT_KEYS, 0)
+
+
+def _count(key):
+    stats[key] += 1
+    _frame[key] += 1
+
+
+def get_font(name=None, size=24):
+    """SysFont(name, size), or Font(path, size) for a .ttf/.otf path. Loaded once."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if name and name.lower().endswith((".ttf", ".otf")):
+            font = pygame.font.Font(name, size)
+        else:
+            font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(font, text, color, antialias=True):
+    key = (font, text, tuple(color), antialias)
+    surf = _surfaces.get(key)
+    if surf is not None:
+        _count("hits")
+        return surf
+
+    surf = font.render(text, antialias, color)
+    _count("renders")
+    if _surfaces.put(key, surf):
+        _count("evictions")
+    return surf
+
+
+def wrap_text(text, max_width, font):
+    """Greedy word wrap, measured with font.size. Layout is cached."""
+    key = (text, max_width, font)
+    lines = _layouts.get(key)
+    if lines is not None:
+        _count("wrap_hits")
+        return lines
+
+    words = text.split(" ")
+    out = []
+    cur = ""
+    for w in words:
+        test = (cur + " " + w).strip()
+        if font.size(test)[0] <= max_width:
+            cur = test
+        else:
+            if cur:
+                out.append(cur)
+            cur = w
+    if cur:
+        out.append(cur)
+
+    lines = tuple(out)
+    _count("wrap_layouts")
+    _layouts.put(key, lines)
+    return lines
+
+
+def end_frame():
+    """Call once per frame (after drawing) to roll the per-frame counters."""
+    for k in STAT_KEYS:
+        last_frame_stats[k] = _frame[k]
+        _frame[k] = 0
+
+
+def reset_stats():
+    for k in STAT_KEYS:
+        stats[k] = 0
+        last_frame_stats[k] = 0
+        _frame[k] = 0
+
+
+def clear():
+    """Drop cached text. Also drops the fonts: call it after pygame.quit() + init()."""
+    _fonts.clear()
+    _surfaces.clear()
+    _layouts.clear()